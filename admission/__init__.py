@@ -0,0 +1,5 @@
+# Storage and data helpers for the admission portal.
+#
+# The Streamlit script ("streamlit admission_app.py") cannot be imported
+# because of the space in its file name, so everything that needs to be
+# shared lives in this package.
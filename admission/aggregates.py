@@ -0,0 +1,168 @@
+import threading
+from collections import Counter, deque
+
+import pandas as pd
+
+from admission.perf import span
+
+# Columns counted on their own and the (row, column) pairs behind the
+# dashboard pivots
+COUNTED_COLUMNS = ['Stream', 'Caste', 'Second_Language', 'Admission_Status']
+PIVOTS = [('Stream', 'Admission_Status'), ('Stream', 'Caste'),
+          ('Stream', 'Second_Language'), ('Date_of_Admission', 'Stream')]
+# add_frame counts frames up to this size row by row
+SMALL_FRAME = 20
+
+
+def _present(value):
+    return not pd.isna(value)
+
+
+class AdmissionAggregates:
+    """Dashboard counters maintained incrementally.
+
+    ``add`` and ``remove`` adjust the counters by one student, so keeping
+    them current costs O(1) per admission or TC.  The tables handed to the
+    dashboard are built from the counters and grow with the number of
+    categories (or days), not with the roster.  A bounded buffer keeps the
+    most recent admissions for the "Recent Admissions" panel.
+    """
+
+    def __init__(self, recent_size=50):
+        self._lock = threading.Lock()
+        self.total = 0
+        self._counts = {column: Counter() for column in COUNTED_COLUMNS}
+        self._pairs = {pivot: Counter() for pivot in PIVOTS}
+        self._recent = deque(maxlen=recent_size)
+        # Set when TCs drained the buffer below what the roster could fill
+        self.recent_incomplete = False
+
+    @classmethod
+    def from_frame(cls, students_df, recent_size=50):
+        aggregates = cls(recent_size)
+        aggregates.total = len(students_df)
+        for column in COUNTED_COLUMNS:
+            counts = students_df[column].value_counts()
+            aggregates._counts[column].update(counts[counts > 0].to_dict())
+        for pivot in PIVOTS:
+            sizes = students_df.groupby(list(pivot), observed=True).size()
+            aggregates._pairs[pivot].update(sizes[sizes > 0].to_dict())
+        aggregates.reset_recent(students_df)
+        return aggregates
+
+    def reset_recent(self, students_df):
+        recent = students_df.sort_values('Date_of_Admission', ascending=False,
+                                         kind='stable').head(self._recent.maxlen)
+        with self._lock:
+            self._recent = deque(recent.to_dict('records'), maxlen=self._recent.maxlen)
+            self.recent_incomplete = False
+
+    # Updates
+
+    def _apply(self, student, delta):
+        self.total += delta
+        for column in COUNTED_COLUMNS:
+            value = student.get(column)
+            if _present(value):
+                self._bump(self._counts[column], value, delta)
+        for pivot in PIVOTS:
+            row, col = student.get(pivot[0]), student.get(pivot[1])
+            if _present(row) and _present(col):
+                self._bump(self._pairs[pivot], (row, col), delta)
+
+    @staticmethod
+    def _bump(counter, key, delta):
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def add(self, student):
+        with self._lock:
+            self._apply(student, 1)
+            self._recent.appendleft(dict(student))
+
+    def add_frame(self, students_df):
+        # Bulk version of add: counts the new rows in one pass.  A few rows
+        # are cheaper to add one by one than to group.
+        if len(students_df) <= SMALL_FRAME:
+            for student in students_df.to_dict('records'):
+                self.add(student)
+            return
+        with self._lock:
+            self.total += len(students_df)
+            for column in COUNTED_COLUMNS:
+                counts = students_df[column].value_counts()
+                self._counts[column].update(counts[counts > 0].to_dict())
+            for pivot in PIVOTS:
+                sizes = students_df.groupby(list(pivot), observed=True).size()
+                self._pairs[pivot].update(sizes[sizes > 0].to_dict())
+            newest = students_df.sort_values('Date_of_Admission', ascending=False,
+                                              kind='stable').head(self._recent.maxlen)
+            merged = pd.DataFrame(newest.to_dict('records') + list(self._recent))
+            merged = merged.sort_values('Date_of_Admission', ascending=False, kind='stable')
+            self._recent = deque(merged.head(self._recent.maxlen).to_dict('records'),
+                                 maxlen=self._recent.maxlen)
+
+    def remove_frame(self, students_df):
+        # Bulk version of remove
+        with self._lock:
+            self.total -= len(students_df)
+            for column in COUNTED_COLUMNS:
+                for value, count in students_df[column].value_counts().items():
+                    if count:
+                        self._bump(self._counts[column], value, -count)
+            for pivot in PIVOTS:
+                sizes = students_df.groupby(list(pivot), observed=True).size()
+                for key, count in sizes[sizes > 0].items():
+                    self._bump(self._pairs[pivot], key, -count)
+            keys = set(zip(students_df['Name'], students_df['Stream'], students_df['Rank']))
+            before = len(self._recent)
+            self._recent = deque(
+                (s for s in self._recent if (s['Name'], s['Stream'], s['Rank']) not in keys),
+                maxlen=self._recent.maxlen)
+            if len(self._recent) < before and self.total >= self._recent.maxlen:
+                self.recent_incomplete = True
+
+    def remove(self, student):
+        key = (student['Name'], student['Stream'], student['Rank'])
+        with self._lock:
+            self._apply(student, -1)
+            before = len(self._recent)
+            self._recent = deque(
+                (s for s in self._recent if (s['Name'], s['Stream'], s['Rank']) != key),
+                maxlen=self._recent.maxlen)
+            if len(self._recent) < before and self.total >= self._recent.maxlen:
+                self.recent_incomplete = True
+
+    # Tables for the dashboard
+
+    def counts(self, column, label=None):
+        # Same shape and order as value_counts().reset_index()
+        with span(f'counts:{column}'):
+            with self._lock:
+                items = self._counts[column].most_common()
+            return pd.DataFrame(items, columns=[label or column, 'Count'])
+
+    def pivot(self, row, column):
+        # Same shape as pd.pivot_table(..., aggfunc='count', fill_value=0).reset_index()
+        with span(f'pivot:{row}x{column}'):
+            with self._lock:
+                items = list(self._pairs[(row, column)].items())
+            if not items:
+                return pd.DataFrame(columns=[row])
+            counts = pd.Series(dict(items)).unstack(fill_value=0).sort_index().sort_index(axis=1)
+            counts.index.name = row
+            counts.columns.name = column
+            return counts.astype(int).reset_index()
+
+    def pair_counts(self, row, column, label='Count'):
+        # Long format: one row per (row, column) pair
+        with span(f'pivot:{row}x{column}'):
+            with self._lock:
+                items = [(r, c, n) for (r, c), n in self._pairs[(row, column)].items()]
+            return pd.DataFrame(items, columns=[row, column, label]).sort_values(
+                [row, column], ignore_index=True)
+
+    def recent(self, limit=5):
+        with self._lock:
+            return pd.DataFrame(list(self._recent)[:limit])
@@ -0,0 +1,161 @@
+import heapq
+
+import pandas as pd
+
+from admission.constants import STREAMS
+
+# Quota name for the merit (unreserved) seats
+OPEN = 'OPEN'
+
+# Starting point for the reservation form, in percent of each stream's
+# seats.  GEN has no reservation and competes for open seats only.
+DEFAULT_RESERVATION = {
+    'SC': 12, 'ST': 8, 'ETB': 8, 'MUSLIM': 7, 'LSA': 3, 'OBH': 2,
+    'DV': 2, 'VK': 1, 'KN': 1, 'KU': 1, 'OBCHRISTIAN': 1,
+}
+
+# Reserved seats nobody of the community takes go to the partner community
+# first (if it is short of seats) and otherwise to open merit.
+SPILL_OVER = {'SC': 'ST', 'ST': 'SC'}
+
+
+# {stream: {quota: seats}}.  Every quota, open merit included, gets its
+# share of the stream's seats rounded down; the seats left over by the
+# rounding go to the largest fractions (largest remainder), so fractional
+# percentages count and the quotas always add up to the stream's seats.
+def seat_matrix(seats, reservation):
+    negative = [stream for stream, total in seats.items() if int(total) < 0]
+    if negative:
+        raise ValueError(f"Seats cannot be negative ({', '.join(map(str, negative))})")
+    if any(float(percent) < 0 for percent in reservation.values()):
+        raise ValueError("Reservation percentages cannot be negative")
+    if sum(float(percent) for percent in reservation.values()) > 100:
+        raise ValueError("Reservation percentages add up to more than 100")
+    matrix = {}
+    for stream, total in seats.items():
+        total = int(total)
+        # Rounded so float noise cannot reorder equal fractions
+        shares = {category: round(total * float(percent) / 100, 9)
+                  for category, percent in reservation.items() if float(percent)}
+        shares[OPEN] = round(total - sum(shares.values()), 9)
+        row = {category: int(share) for category, share in shares.items()}
+        # Ties go to the quota listed first, open merit last
+        by_remainder = sorted(shares, key=lambda category: row[category] - shares[category])
+        for category in by_remainder[:total - sum(row.values())]:
+            row[category] += 1
+        matrix[stream] = row
+    return matrix
+
+
+# Students already on the roster keep their seats: each is charged to an
+# open seat while there are any, then to their community's reserved seats.
+def charge_admitted(matrix, admitted_df):
+    admitted_df = admitted_df.sort_values('Rank', kind='stable')
+    for stream, caste in zip(admitted_df['Stream'], admitted_df['Caste']):
+        seats = matrix.get(stream)
+        if seats is None:
+            continue
+        if seats[OPEN] > 0:
+            seats[OPEN] -= 1
+        elif seats.get(caste, 0) > 0:
+            seats[caste] -= 1
+    return matrix
+
+
+# One pass over the applicants in rank order.  Each applicant gets the first
+# preference that still has an open seat or a seat reserved for their
+# community; open seats are taken first so a reserved seat is only used when
+# merit alone is not enough.
+def _allot(ranks, castes, preferences, matrix):
+    vacant = {stream: dict(quotas) for stream, quotas in matrix.items()}
+    streams = [None] * len(ranks)
+    quotas = [None] * len(ranks)
+    choices = [0] * len(ranks)
+
+    # (rank, position) keeps equal ranks in list order
+    heap = list(zip(ranks, range(len(ranks))))
+    heapq.heapify(heap)
+    while heap:
+        _, i = heapq.heappop(heap)
+        caste = castes[i]
+        for choice, stream in enumerate(preferences[i], 1):
+            seats = vacant.get(stream)
+            if seats is None:
+                continue
+            if seats[OPEN] > 0:
+                quota = OPEN
+            elif seats.get(caste, 0) > 0:
+                quota = caste
+            else:
+                continue
+            seats[quota] -= 1
+            streams[i], quotas[i], choices[i] = stream, quota, choice
+            break
+    return streams, quotas, choices, vacant
+
+
+# Moves reserved seats left vacant after a pass.  A vacancy at the end of a
+# pass means no unallotted applicant of that community wanted the seat, so
+# it can be released without taking it from anyone.  Returns True if any
+# seat moved.
+def _spill(matrix, vacant, received):
+    moved = False
+    for stream, seats in vacant.items():
+        for category, count in seats.items():
+            if category == OPEN or count <= 0:
+                continue
+            partner = SPILL_OVER.get(category)
+            if (partner in matrix[stream] and seats.get(partner, 0) == 0
+                    and (stream, category) not in received):
+                target = partner
+                received.add((stream, partner))
+            else:
+                target = OPEN
+            matrix[stream][category] -= count
+            matrix[stream][target] += count
+            moved = True
+    return moved
+
+
+# Allots seats to a validated applicant list (see
+# validation.validate_applicants).  seats maps stream -> seat count and
+# reservation maps community -> percent.  admitted_df, if given, holds the
+# students already on the roster, whose seats are not available.
+#
+# Passes are repeated until no reserved seat is left vacant that could
+# still be released, so every spilled seat goes to the best-ranked applicant
+# who wants it.
+#
+# Returns (allotment_df, summary_df): allotment_df is applicants_df with
+# Allotted_Stream, Quota and Choice columns (missing where nothing was
+# allotted); summary_df has per stream and quota the Sanctioned seats, the
+# seats Remaining for this round (after the admitted students and the
+# spill-over), and how many of those were Filled and left Vacant.
+def allot_seats(applicants_df, seats, reservation, admitted_df=None):
+    sanctioned = seat_matrix(seats, reservation)
+    matrix = {stream: dict(quotas) for stream, quotas in sanctioned.items()}
+    if admitted_df is not None and not admitted_df.empty:
+        charge_admitted(matrix, admitted_df)
+
+    ranks = applicants_df['Rank'].tolist()
+    castes = applicants_df['Caste'].astype(str).tolist()
+    preferences = applicants_df['Preferences'].tolist()
+    received = set()
+    while True:
+        streams, quotas, choices, vacant = _allot(ranks, castes, preferences, matrix)
+        if not _spill(matrix, vacant, received):
+            break
+
+    allotment_df = applicants_df.assign(
+        Allotted_Stream=pd.Series(streams, index=applicants_df.index, dtype='string'),
+        Quota=pd.Series(quotas, index=applicants_df.index, dtype='string'),
+        Choice=pd.Series(choices, index=applicants_df.index, dtype='Int32').replace(0, pd.NA),
+    )
+    summary_df = pd.DataFrame([
+        {'Stream': stream, 'Quota': quota, 'Sanctioned': sanctioned[stream][quota],
+         'Remaining': remaining, 'Filled': remaining - vacant[stream][quota],
+         'Vacant': vacant[stream][quota]}
+        for stream in (s for s in STREAMS if s in matrix)
+        for quota, remaining in matrix[stream].items() if remaining or sanctioned[stream][quota]
+    ], columns=['Stream', 'Quota', 'Sanctioned', 'Remaining', 'Filled', 'Vacant'])
+    return allotment_df, summary_df
@@ -0,0 +1,114 @@
+import threading
+import time
+from types import MappingProxyType
+
+import pandas as pd
+
+from admission.perf import span
+
+
+class AnalyticsSnapshot:
+    """Dashboard tables of one roster generation.
+
+    Published whole and never modified afterwards; treat the frames as
+    read-only.  ``snapshot[name]`` returns a table.
+    """
+
+    __slots__ = ('generation', 'built_at', 'tables')
+
+    def __init__(self, generation, tables):
+        self.generation = generation
+        self.built_at = time.time()
+        self.tables = MappingProxyType(tables)
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+
+def _long(pivot, row, name):
+    return pd.melt(pivot, id_vars=[row], var_name=name, value_name='Count')
+
+
+# Every table the Data Analysis page shows, from the incremental counters
+def build_tables(aggregates):
+    status = aggregates.pivot('Stream', 'Admission_Status')
+    language = aggregates.pivot('Stream', 'Second_Language')
+
+    # Daily series stay datetime64; the page buckets them (admission.timeseries)
+    daily = aggregates.pair_counts('Date_of_Admission', 'Stream')
+    daily['Date_of_Admission'] = pd.to_datetime(daily['Date_of_Admission'])
+
+    return {
+        'stream_counts': aggregates.counts('Stream'),
+        'status_by_stream': status,
+        'status_by_stream_long': _long(status, 'Stream', 'Status'),
+        'caste_counts': aggregates.counts('Caste'),
+        'caste_by_stream': aggregates.pivot('Stream', 'Caste'),
+        'language_counts': aggregates.counts('Second_Language', label='Second Language'),
+        'language_by_stream': language,
+        'language_by_stream_long': _long(language, 'Stream', 'Language'),
+        'daily_by_stream': daily,
+    }
+
+
+class AnalyticsWorker:
+    """Background thread keeping an ``AnalyticsSnapshot`` of the roster.
+
+    The roster notifies the worker after every commit.  The worker waits
+    until writes have paused for ``debounce`` seconds (but no longer than
+    ``max_delay`` after the first of a burst), rebuilds all tables and swaps
+    the new snapshot in with a single assignment.  ``snapshot`` only returns
+    the latest published snapshot, so readers never wait for a rebuild; they
+    may see data up to ``max_delay`` seconds old.
+    """
+
+    def __init__(self, roster, debounce=0.5, max_delay=2.0):
+        self._roster = roster
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._changed = threading.Event()
+        self._stopped = False
+        self._snapshot = self._build()
+        roster.add_listener(self._notify)
+        self._thread = threading.Thread(target=self._run, name='analytics-worker', daemon=True)
+        self._thread.start()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def _notify(self, datasets):
+        if 'students' in datasets:
+            self._changed.set()
+
+    def _build(self, attempts=3):
+        # Rebuild while writes slip in between the tables, so a snapshot
+        # does not mix two generations (a steady stream of writes gets the
+        # last attempt, and the next rebuild follows right after)
+        for _ in range(attempts):
+            generation = self._roster.generation('students')
+            with span('analytics:rebuild'):
+                tables = build_tables(self._roster.aggregates)
+            if self._roster.generation('students') == generation:
+                break
+        return AnalyticsSnapshot(generation, tables)
+
+    def _run(self):
+        while True:
+            self._changed.wait()
+            if self._stopped:
+                return
+            # Debounce a burst of writes
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                self._changed.clear()
+                remaining = min(self.debounce, deadline - time.monotonic())
+                if remaining <= 0 or not self._changed.wait(remaining):
+                    break
+            if self._stopped:
+                return
+            self._snapshot = self._build()
+
+    def stop(self):
+        self._stopped = True
+        self._changed.set()
+        self._thread.join()
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from admission.core import InvalidAdmissionError, records
+from admission.partitions import DEFAULT_SCHOOL, DEFAULT_YEAR, PartitionCatalog
+from admission.roster import DuplicateStudentError, RosterConflictError, StudentNotFoundError
+from admission.validation import validate_tc_list
+
+MAX_BODY = 10 * 1024 * 1024
+# Port on which the Streamlit app serves the API itself (unset: no API)
+API_PORT_ENV = 'ADMISSION_API_PORT'
+API_HOST_ENV = 'ADMISSION_API_HOST'
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.body = {'error': message, **details}
+
+
+class AdmissionAPI:
+    """Local HTTP/JSON API over an ``AdmissionService``.
+
+    A small asyncio server from the standard library: each connection is a
+    coroutine, and the roster work runs in worker threads so slow requests
+    do not hold up the others.  Routes:
+
+        GET  /health                          roster version
+        GET  /summary                         totals and students per stream
+        GET  /counts?column=Caste             students per value
+        GET  /counts?row=Stream&column=Caste  cross table
+        GET  /recent?limit=5                  latest admissions
+        GET  /students?stream=CS&offset=0&limit=100
+        GET  /students/lookup?name=..&stream=..&rank=..
+        GET  /students/search?name=..         typo-tolerant name search
+        GET  /changes?after=0&limit=1000      change events after a cursor
+        GET  /quarantine                      stored rows that failed validation on load
+        POST /admissions                      one student or a list (all or nothing)
+        POST /tc                              {Name, Stream, Rank, TC_Reason?} or a list
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/summary'): self.summary,
+            ('GET', '/counts'): self.counts,
+            ('GET', '/recent'): self.recent,
+            ('GET', '/students'): self.students,
+            ('GET', '/students/lookup'): self.lookup,
+            ('GET', '/students/search'): self.search,
+            ('GET', '/changes'): self.changes,
+            ('GET', '/quarantine'): self.quarantine,
+            ('POST', '/admissions'): self.admissions,
+            ('POST', '/tc'): self.tc,
+        }
+
+    # Handlers: (query, body) -> (status, payload); run in a worker thread
+
+    def health(self, query, body):
+        return HTTPStatus.OK, {'status': 'ok', 'version': self.service.version}
+
+    def summary(self, query, body):
+        return HTTPStatus.OK, self.service.summary()
+
+    def counts(self, query, body):
+        column = _param(query, 'column')
+        row = query.get('row', [None])[0]
+        try:
+            if row:
+                table = self.service.pivot(row, column).set_index(row)
+                return HTTPStatus.OK, {str(label): {str(c): int(n) for c, n in counts.items()}
+                                       for label, counts in table.iterrows()}
+            table = self.service.counts(column)
+        except KeyError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"No counts for {row or column}")
+        return HTTPStatus.OK, dict(zip(table[column].astype(str), table['Count'].tolist()))
+
+    def recent(self, query, body):
+        limit = _int_param(query, 'limit', 5)
+        return HTTPStatus.OK, records(self.service.recent_admissions(limit))
+
+    def students(self, query, body):
+        offset = _int_param(query, 'offset', 0)
+        limit = _int_param(query, 'limit', 100)
+        students_df = self.service.students()
+        stream = query.get('stream', [None])[0]
+        if stream:
+            students_df = students_df[students_df['Stream'] == stream.upper()]
+        return HTTPStatus.OK, {'total': len(students_df),
+                               'students': records(students_df.iloc[offset:offset + limit])}
+
+    def lookup(self, query, body):
+        student = self.service.find_student(_param(query, 'name'), _param(query, 'stream').upper(),
+                                            _int_param(query, 'rank'))
+        if student is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Student not found")
+        return HTTPStatus.OK, records(pd.DataFrame([student]))[0]
+
+    def search(self, query, body):
+        matches = self.service.search(_param(query, 'name'), limit=_int_param(query, 'limit', 5))
+        return HTTPStatus.OK, [
+            {'score': round(score, 3), 'name': name,
+             'students': [{'Name': n, 'Stream': s, 'Rank': r} for n, s, r in keys]}
+            for score, name, keys in matches]
+
+    def changes(self, query, body):
+        after = _int_param(query, 'after', 0)
+        changes_df = self.service.changes(after, _int_param(query, 'limit', 1000))
+        # Pass cursor as ?after= to fetch the next page
+        cursor = int(changes_df['seq'].iloc[-1]) if not changes_df.empty else after
+        return HTTPStatus.OK, {'cursor': cursor, 'latest': self.service.last_change(),
+                               'changes': records(changes_df)}
+
+    def quarantine(self, query, body):
+        return HTTPStatus.OK, records(self.service.quarantine())
+
+    def admissions(self, query, body):
+        rows = body if isinstance(body, list) else [body]
+        try:
+            version, admitted = self.service.admit_records(rows)
+        except InvalidAdmissionError as e:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, "Invalid admissions",
+                            rows=records(e.errors))
+        except DuplicateStudentError as e:
+            raise HTTPError(HTTPStatus.CONFLICT, f"Already admitted: {e}")
+        return HTTPStatus.CREATED, {'version': version, 'admitted': admitted}
+
+    def tc(self, query, body):
+        rows = body if isinstance(body, list) else [body]
+        requests_df, errors = validate_tc_list(pd.DataFrame(rows))
+        if not errors.empty:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, "Invalid TC requests",
+                            rows=records(errors))
+        try:
+            version = self.service.issue_tcs(requests_df)
+        except StudentNotFoundError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Not on the roster: {e}")
+        return HTTPStatus.OK, {'version': version, 'issued': len(requests_df)}
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, raw_body = request
+                status, payload = await self.dispatch(method, target, raw_body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            writer.write(_response(e.status, e.body, False))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, raw_body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path.rstrip('/') or '/'))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed"}
+            return HTTPStatus.NOT_FOUND, {'error': f"No such endpoint: {url.path}"}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': "Request body is not valid JSON"}
+        try:
+            return await asyncio.to_thread(handler, parse_qs(url.query), body)
+        except HTTPError as e:
+            return e.status, e.body
+        except RosterConflictError as e:
+            return HTTPStatus.CONFLICT, {'error': str(e)}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+
+    async def serve(self, host='127.0.0.1', port=8502, started=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if started is not None:
+            started.set()
+        async with server:
+            await server.serve_forever()
+
+
+# Serves the API from a daemon thread of this process, so it shares the
+# caller's roster: the app starts it this way and sees API writes at once,
+# and both check duplicates against the same students.
+# Raises OSError when the server cannot start (e.g. the port is taken).
+def serve_in_thread(api, host='127.0.0.1', port=8502):
+    started = threading.Event()
+    failed = []
+
+    def run():
+        try:
+            asyncio.run(api.serve(host, port, started))
+        except OSError as e:
+            failed.append(e)
+
+    thread = threading.Thread(target=run, name='admission-api', daemon=True)
+    thread.start()
+    while not started.wait(0.05):
+        if not thread.is_alive():
+            raise OSError(f"Could not serve the admission API on {host}:{port}: "
+                          f"{failed[0] if failed else 'the server stopped'}")
+    return thread
+
+
+def _param(query, name):
+    values = query.get(name)
+    if not values or not values[0]:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing parameter: {name}")
+    return values[0]
+
+
+def _int_param(query, name, default=None):
+    if default is not None and name not in query:
+        return default
+    try:
+        return int(_param(query, name))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a whole number")
+
+
+async def _read_request(reader):
+    # Returns (method, target, headers, body), or None when the client is done
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+if __name__ == '__main__':
+    # A separate process with a roster of its own: only for data the app is
+    # not serving, which sets ADMISSION_API_PORT instead
+    parser = argparse.ArgumentParser(description="Admission portal HTTP API")
+    parser.add_argument('--host', default=os.environ.get(API_HOST_ENV, '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get(API_PORT_ENV) or 8502))
+    parser.add_argument('--dir', default='.', help="Directory holding the data files")
+    parser.add_argument('--school', default=DEFAULT_SCHOOL)
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR)
+    args = parser.parse_args()
+
+    catalog = PartitionCatalog(args.dir)
+    if not catalog.exists(args.school, args.year):
+        parser.error(f"No data stored for {args.school} {args.year}")
+    api = AdmissionAPI(catalog.service(args.school, args.year))
+    print(f"Serving the {args.school} {args.year} admission API on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,46 @@
+import threading
+
+
+class VersionedCache:
+    """Values derived from a dataset, keyed by the dataset's generation.
+
+    An entry is served only while the dataset is still at the generation it
+    was built from.  Cached values are shared between sessions as-is (no
+    copy), so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, dataset, name, generation, build):
+        key = (dataset, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Build outside the lock; two sessions racing on the same miss both
+        # compute it, which is cheaper than serialising every reader.
+        value = build()
+        with self._lock:
+            self._entries[key] = (generation, value)
+        return value
+
+    def invalidate(self, dataset):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
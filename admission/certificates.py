@@ -0,0 +1,252 @@
+import concurrent.futures
+import functools
+import io
+import os
+import re
+import threading
+import zipfile
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+from admission.schema import plain_value
+
+# A4 at 150 dpi
+DPI = 150
+PAGE_SIZE = (1240, 1754)
+MARGIN = 90
+
+# Certificate formats: label -> (file extension, MIME type)
+FORMATS = {
+    'PDF': ('pdf', 'application/pdf'),
+    'PNG': ('png', 'image/png'),
+}
+
+# Lines of the certificate body: label -> TC record column
+FIELDS = [
+    ('Name of the student', 'Name'),
+    ('Stream', 'Stream'),
+    ('Rank', 'Rank'),
+    ('Second language', 'Second_Language'),
+    ('Category', 'Caste'),
+    ('Admission status', 'Admission_Status'),
+    ('Date of admission', 'Date_of_Admission'),
+    ('Date of leaving', 'TC_Date'),
+    ('Reason for leaving', 'TC_Reason'),
+]
+
+# Batches smaller than this are rendered in the batch's own thread
+POOL_THRESHOLD = 16
+CHUNK_SIZE = 20
+
+_REGULAR_FONTS = ['DejaVuSans.ttf', 'LiberationSans-Regular.ttf', 'Arial.ttf', 'arial.ttf']
+_BOLD_FONTS = ['DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf', 'Arial Bold.ttf', 'arialbd.ttf']
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size, bold=False):
+    for name in _BOLD_FONTS if bold else _REGULAR_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 has only the small bitmap font
+        return ImageFont.load_default()
+
+
+def _centered(draw, y, text, font):
+    width = draw.textlength(text, font=font)
+    draw.text(((PAGE_SIZE[0] - width) / 2, y), text, fill='black', font=font)
+
+
+def _logo_key(logo_path):
+    # (path, mtime) so a replaced logo file builds a new template
+    if logo_path and os.path.exists(logo_path):
+        return logo_path, os.path.getmtime(logo_path)
+    return None, None
+
+
+# Blank certificate with everything but the student's details: border,
+# logo, school name, title, field labels and signature lines.  Built once
+# per process and school and copied for every certificate.
+@functools.lru_cache(maxsize=8)
+def _template(school_name, year, logo_path, logo_mtime):
+    page = Image.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(page)
+    right, bottom = PAGE_SIZE[0] - MARGIN // 2, PAGE_SIZE[1] - MARGIN // 2
+    draw.rectangle([MARGIN // 2, MARGIN // 2, right, bottom], outline='black', width=4)
+    draw.rectangle([MARGIN // 2 + 12, MARGIN // 2 + 12, right - 12, bottom - 12],
+                   outline='black', width=1)
+
+    y = MARGIN + 20
+    if logo_path:
+        with Image.open(logo_path) as logo:
+            logo = logo.convert('RGBA')
+            logo.thumbnail((200, 200))
+            page.paste(logo, ((PAGE_SIZE[0] - logo.width) // 2, y), logo)
+            y += logo.height + 30
+    _centered(draw, y, school_name, _font(64, bold=True))
+    y += 110
+    _centered(draw, y, "TRANSFER CERTIFICATE", _font(48, bold=True))
+    y += 70
+    _centered(draw, y, f"Higher Secondary Course, {year}", _font(32))
+    y += 90
+    draw.line([MARGIN, y, PAGE_SIZE[0] - MARGIN, y], fill='black', width=2)
+
+    label_font = _font(34)
+    for i, (label, _) in enumerate(FIELDS):
+        draw.text((MARGIN + 20, _field_y(y, i)), f"{i + 1}. {label}", fill='black', font=label_font)
+        draw.text((MARGIN + 460, _field_y(y, i)), ":", fill='black', font=label_font)
+
+    sign_y = PAGE_SIZE[1] - MARGIN - 160
+    draw.text((MARGIN + 20, sign_y), "Place: " + school_name.split()[-1].title(), fill='black',
+              font=label_font)
+    draw.text((MARGIN + 20, sign_y + 60), "Date:", fill='black', font=label_font)
+    _centered(draw, sign_y + 60, "(Seal)", label_font)
+    draw.text((PAGE_SIZE[0] - MARGIN - 330, sign_y + 60), "Principal", fill='black', font=label_font)
+    return page, y
+
+
+def _field_y(top, i):
+    return top + 60 + i * 90
+
+
+def _value(record, column):
+    value = record.get(column)
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or str(value).strip() == '':
+        return '-'
+    # Dates as 2025-04-02, not the Timestamp's 2025-04-02 00:00:00
+    return str(plain_value(value))
+
+
+def _wrap(draw, text, font, width):
+    lines, line = [], ''
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if line and draw.textlength(candidate, font=font) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    return lines + [line]
+
+
+# One certificate (a TC record as a dict) as PNG or PDF bytes
+def render_certificate(record, fmt='PDF', school_name='', year='', logo_path=None):
+    template, top = _template(school_name, year, *_logo_key(logo_path))
+    page = template.copy()
+    draw = ImageDraw.Draw(page)
+    value_font = _font(34, bold=True)
+    x = MARGIN + 490
+    for i, (_, column) in enumerate(FIELDS):
+        lines = _wrap(draw, _value(record, column), value_font, PAGE_SIZE[0] - MARGIN - 20 - x)
+        # Only the reason, the last field, has room for more than one line
+        draw.multiline_text((x, _field_y(top, i)), '\n'.join(lines[:4]), fill='black',
+                            font=value_font, spacing=10)
+    draw.text((MARGIN + 120, PAGE_SIZE[1] - MARGIN - 100), _value(record, 'TC_Date'), fill='black',
+              font=_font(34))
+
+    buffer = io.BytesIO()
+    if fmt == 'PDF':
+        page.save(buffer, format='PDF', resolution=DPI)
+    elif fmt == 'PNG':
+        page.save(buffer, format='PNG', optimize=False)
+    else:
+        raise ValueError(f"Unknown certificate format: {fmt}")
+    return buffer.getvalue()
+
+
+# File name for a student's certificate, e.g. TC_ARJUN_SURESH_K_M_CS_12.pdf
+def certificate_name(record, fmt='PDF'):
+    name = re.sub(r'[^A-Za-z0-9]+', '_', str(record.get('Name', ''))).strip('_')
+    return f"TC_{name}_{record.get('Stream', '')}_{record.get('Rank', '')}.{FORMATS[fmt][0]}"
+
+
+def _render_chunk(rows, fmt, school_name, year, logo_path):
+    return [(certificate_name(row, fmt), render_certificate(row, fmt, school_name, year, logo_path))
+            for row in rows]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool():
+    # One pool of threads per server process, started on first use.  Not
+    # processes: forking the multithreaded server can deadlock a child on a
+    # lock held by another thread at the time.  Pillow releases the GIL
+    # while it encodes the pages, which is most of their cost.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(4, os.cpu_count() or 1)),
+                thread_name_prefix='certificate')
+        return _pool
+
+
+class CertificateBatch:
+    """Certificates for many TC records rendered into one zip file.
+
+    ``start`` returns at once: a background thread hands chunks of records
+    to the shared render pool and writes the pages into the zip as they
+    come back.  ``done``/``total`` report progress, and ``result`` waits for
+    and returns the zip bytes (or raises the rendering error).
+    """
+
+    def __init__(self, tc_df, fmt='PDF', school_name='', year='', logo_path=None):
+        self.rows = tc_df.to_dict('records')
+        self.fmt = fmt
+        self.args = (fmt, school_name, year, logo_path)
+        self.total = len(self.rows)
+        self.done = 0
+        self._future = concurrent.futures.Future()
+
+    def start(self):
+        threading.Thread(target=self._run, name='certificate-batch', daemon=True).start()
+        return self
+
+    def finished(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        return self._future.result(timeout)
+
+    def _chunks(self):
+        pool = _render_pool() if self.total >= POOL_THRESHOLD else None
+        if pool is None:
+            for i in range(0, self.total, CHUNK_SIZE):
+                yield _render_chunk(self.rows[i:i + CHUNK_SIZE], *self.args)
+            return
+        futures = [pool.submit(_render_chunk, self.rows[i:i + CHUNK_SIZE], *self.args)
+                   for i in range(0, self.total, CHUNK_SIZE)]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+    def _run(self):
+        try:
+            buffer = io.BytesIO()
+            names = set()
+            # PNG and PDF pages are already compressed; store them as they are
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+                for chunk in self._chunks():
+                    for name, data in chunk:
+                        name = _unique(name, names)
+                        archive.writestr(name, data)
+                    self.done += len(chunk)
+            self._future.set_result(buffer.getvalue())
+        except Exception as e:
+            self._future.set_exception(e)
+
+
+def _unique(name, taken):
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem}_{n}{ext}"
+    taken.add(candidate)
+    return candidate
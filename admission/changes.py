@@ -0,0 +1,129 @@
+import argparse
+import datetime
+import io
+import json
+import os
+
+import pandas as pd
+
+from admission.constants import DATA_FILE, STUDENT_COLUMNS, TC_COLUMNS, TC_FILE
+from admission.journal import OP_ADMIT, OP_TC, AdmissionJournal, _json_default
+
+# Every write to the roster is recorded as a numbered change event:
+#   {"seq": 41, "time": "2025-06-12T10:31:05", "op": "admit", "student": {...}}
+#   {"seq": 42, "time": "2025-06-12T10:40:17", "op": "tc", "student": {...}}
+# Sequence numbers only grow, so a consumer that remembers the last one it
+# saw (its cursor) asks for the changes after it and gets nothing twice.
+# Data stored before the change log existed is recorded once as a baseline
+# of "admit" (and "tc") events, so the log alone rebuilds the tables.
+CHANGE_COLUMNS = ['seq', 'time', 'op'] + TC_COLUMNS
+
+# Change export formats: label -> (file extension, MIME type)
+FORMATS = {
+    'JSONL': ('jsonl', 'application/x-ndjson'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def event_time():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def event_json(record):
+    return json.dumps(record, default=_json_default)
+
+
+# (op, record) pairs recreating tables that predate the change log: every
+# student and every TC holder is admitted, then the TCs are issued
+def baseline_events(students_df, tc_df):
+    students = students_df.to_dict('records')
+    tc_records = tc_df.to_dict('records')
+    admitted = [{k: v for k, v in record.items() if k not in ('TC_Date', 'TC_Reason')}
+                for record in tc_records]
+    return ([(OP_ADMIT, record) for record in students + admitted] +
+            [(OP_TC, record) for record in tc_records])
+
+
+# Events ({seq, time, op, student}) as one flat row each
+def changes_frame(events):
+    rows = [{'seq': event['seq'], 'time': event.get('time'), 'op': event['op'],
+             **event['student']} for event in events]
+    return pd.DataFrame(rows, columns=CHANGE_COLUMNS)
+
+
+# Rebuilds (students_df, tc_df) from a complete change log
+def replay(changes_df):
+    changes_df = changes_df.sort_values('seq')
+    records = [{'op': op, 'student': {c: v for c, v in row.items() if not pd.isna(v)}}
+               for op, row in zip(changes_df['op'],
+                                  changes_df[TC_COLUMNS].to_dict('records'))]
+    students, tc = AdmissionJournal._replay(pd.DataFrame(columns=STUDENT_COLUMNS),
+                                            pd.DataFrame(columns=TC_COLUMNS), records)
+    return students.reset_index(drop=True), tc.reset_index(drop=True)
+
+
+def serialize(changes_df, fmt):
+    if fmt == 'JSONL':
+        return changes_df.to_json(orient='records', lines=True, force_ascii=False).encode('utf-8')
+    if fmt == 'Parquet':
+        buffer = io.BytesIO()
+        changes_df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown change export format: {fmt}")
+
+
+def read_changes(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_json(path, lines=True, dtype={'Rank': int}, convert_dates=False)
+
+
+# File name saying which changes it holds, e.g. changes_101-250.jsonl; the
+# last number is the cursor for the next sync
+def file_name(after, last, fmt):
+    return f"changes_{after + 1}-{last}.{FORMATS[fmt][0]}"
+
+
+if __name__ == '__main__':
+    # Not at the top: storage imports this module
+    from admission.partitions import DEFAULT_SCHOOL, DEFAULT_YEAR, PartitionCatalog
+    from admission.storage import get_backend
+
+    parser = argparse.ArgumentParser(description="Export or replay the admission change log")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="Write the changes after a cursor to a file")
+    export.add_argument('--dir', default='.', help="Directory holding the data files")
+    export.add_argument('--school', default=DEFAULT_SCHOOL)
+    export.add_argument('--year', type=int, default=DEFAULT_YEAR)
+    export.add_argument('--after', type=int, default=0, help="Last sequence number already synced")
+    export.add_argument('--format', choices=list(FORMATS), default='JSONL')
+    export.add_argument('--output', help="File to write (default: named after the changes)")
+    rebuild = commands.add_parser('replay', help="Rebuild the roster and TC tables from exports")
+    rebuild.add_argument('files', nargs='+',
+                         help="Exported change files, together holding the log from its start")
+    rebuild.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        catalog = PartitionCatalog(args.dir)
+        if not catalog.exists(args.school, args.year):
+            parser.error(f"No data stored for {args.school} {args.year}")
+        # Reads only the change log, not the roster
+        backend = get_backend(directory=catalog.directory(args.school, args.year))
+        try:
+            changes_df = backend.changes(args.after)
+        finally:
+            backend.close()
+        last = changes_df['seq'].iloc[-1] if not changes_df.empty else args.after
+        output = args.output or file_name(args.after, last, args.format)
+        with open(output, 'wb') as f:
+            f.write(serialize(changes_df, args.format))
+        print(f"{len(changes_df)} changes written to {output}")
+    else:
+        changes_df = pd.concat([read_changes(path) for path in args.files], ignore_index=True)
+        # Overlapping exports are fine: each change is applied once
+        students_df, tc_df = replay(changes_df.drop_duplicates('seq'))
+        students_df.to_csv(os.path.join(args.output_dir, DATA_FILE), index=False)
+        tc_df.to_csv(os.path.join(args.output_dir, TC_FILE), index=False)
+        print(f"Rebuilt {len(students_df)} students and {len(tc_df)} TC records "
+              f"up to change {changes_df['seq'].max()}")
@@ -0,0 +1,23 @@
+# Allowed values of the categorical roster columns
+STREAMS = ["BIO", "CS", "HUM", "COM"]
+SECOND_LANGUAGES = ["MAL", "HIN", "SKT"]
+CASTES = ["GEN", "ETB", "MUSLIM", "SC", "LSA", "OBH", "DV", "VK", "KN", "KU", "ST", "OBCHRISTIAN"]
+STATUS_OPTIONS = ["PERMANENT", "TEMPORARY"]
+
+# Data files
+DATA_FILE = 'admission_data.csv'
+TC_FILE = 'tc_records.csv'
+JOURNAL_FILE = 'admission_journal.jsonl'
+DB_FILE = 'admission.db'
+# Compacted journal segments, kept as the CSV backend's change log
+CHANGES_DIR = 'admission_changes'
+# Cleaned tables of the last load, reused while the data files are unchanged
+CLEAN_CACHE_PREFIX = 'admission_clean'
+
+# Column layout of the roster and the TC records
+STUDENT_COLUMNS = ['Name', 'Rank', 'Stream', 'Second_Language', 'Caste',
+                   'Admission_Status', 'Date_of_Admission']
+TC_COLUMNS = STUDENT_COLUMNS + ['TC_Date', 'TC_Reason']
+
+# A student is identified by name, stream and rank (same as the TC form)
+STUDENT_KEY = ['Name', 'Stream', 'Rank']
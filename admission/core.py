@@ -0,0 +1,140 @@
+import datetime
+
+import pandas as pd
+
+from admission.analytics import AnalyticsWorker
+from admission.name_index import normalize_name, normalize_names
+from admission.roster import RosterStore, StudentNotFoundError, commit_with_retry
+from admission.schema import DATE_FORMAT, plain_value
+from admission.storage import get_backend
+from admission.validation import normalize_columns, validate_admissions
+
+
+class InvalidAdmissionError(ValueError):
+    # Raised with the errors table of validate_admissions
+    def __init__(self, errors):
+        super().__init__('; '.join(f"row {row}: {error}" for row, error in
+                                   zip(errors['Row'], errors['Error'])))
+        self.errors = errors
+
+
+def today():
+    return datetime.date.today().strftime(DATE_FORMAT)
+
+
+# DataFrame -> list of JSON-ready dicts (plain Python values, None for missing)
+def records(df):
+    return [{column: None if pd.isna(value) else plain_value(value)
+             for column, value in row.items()}
+            for row in df.to_dict('records')]
+
+
+class AdmissionService:
+    """Admission, TC and analytics operations without any user interface.
+
+    The Streamlit app and the HTTP API (``admission.api``) are both thin
+    layers over this class.  Every write retries on roster version conflicts
+    and returns the version it produced; reads come from the shared
+    ``RosterStore`` and its incremental aggregates, and dashboard tables
+    from the snapshots ``analytics`` rebuilds in the background.
+    """
+
+    def __init__(self, backend=None, directory='.'):
+        self.backend = backend if backend is not None else get_backend(directory=directory)
+        self.roster = RosterStore(self.backend)
+        self.analytics = AnalyticsWorker(self.roster)
+
+    @property
+    def version(self):
+        return self.roster.version
+
+    # Reading
+
+    def students(self):
+        return self.roster.snapshot()[1]
+
+    def tc_records(self):
+        return self.roster.tc_snapshot()[1]
+
+    def quarantine(self):
+        # Stored rows left out of the roster and TC register on load
+        return self.roster.quarantine
+
+    def existing_names(self, names):
+        # The given names (normalized) that are already on the roster; a
+        # lookup per name, so the cost does not grow with the roster
+        return [name for name in normalize_names(names) if self.roster.name_exists(name)]
+
+    def find_student(self, name, stream, rank):
+        return self.roster.find_student(name, stream, rank)
+
+    def search(self, name, limit=5, min_score=0.6):
+        return self.roster.similar_names(name, limit=limit, min_score=min_score)
+
+    def counts(self, column):
+        return self.roster.aggregates.counts(column)
+
+    def pivot(self, row, column):
+        return self.roster.aggregates.pivot(row, column)
+
+    def recent_admissions(self, limit=5):
+        return self.roster.recent_admissions(limit)
+
+    def changes(self, after=0, limit=None):
+        # Change events after the cursor, read from storage without the roster
+        return self.backend.changes(after, limit)
+
+    def last_change(self):
+        return self.backend.last_change()
+
+    def summary(self):
+        counts = self.counts('Stream')
+        return {
+            'version': self.version,
+            'students': self.roster.aggregates.total,
+            'tc_issued': len(self.tc_records()),
+            'by_stream': dict(zip(counts['Stream'], counts['Count'].tolist())),
+        }
+
+    # Writing
+
+    def validate(self, students_df, today=None):
+        students_df = normalize_columns(students_df)
+        return validate_admissions(students_df, self.existing_names(students_df['Name']), today)
+
+    def admit(self, student, expected_version=None):
+        # student holds already-checked values (e.g. from the admission form)
+        return commit_with_retry(
+            self.roster, lambda version: self.roster.admit(student, expected_version=version),
+            self.version if expected_version is None else expected_version)
+
+    def admit_many(self, students_df, expected_version=None):
+        return commit_with_retry(
+            self.roster, lambda version: self.roster.admit_many(students_df, expected_version=version),
+            self.version if expected_version is None else expected_version)
+
+    def admit_records(self, rows):
+        # Validates raw rows (dicts) and admits them all, or raises
+        # InvalidAdmissionError and admits none
+        valid, errors = self.validate(pd.DataFrame(rows))
+        if not errors.empty:
+            raise InvalidAdmissionError(errors)
+        return self.admit_many(valid), len(valid)
+
+    def issue_tc(self, name, stream, rank, reason=None, tc_date=None, expected_version=None):
+        student_info = self.find_student(normalize_name(name), stream, rank)
+        if student_info is None:
+            raise StudentNotFoundError(f"{name} ({stream}, rank {rank})")
+        student_info['TC_Date'] = tc_date or today()
+        if reason:
+            student_info['TC_Reason'] = reason
+        return commit_with_retry(
+            self.roster, lambda version: self.roster.issue_tc(student_info, expected_version=version),
+            self.version if expected_version is None else expected_version)
+
+    def issue_tcs(self, requests_df, tc_date=None, expected_version=None):
+        tc_date = tc_date or today()
+        return commit_with_retry(
+            self.roster,
+            lambda version: self.roster.issue_tcs(requests_df, tc_date, expected_version=version),
+            self.version if expected_version is None else expected_version)
@@ -0,0 +1,38 @@
+import io
+
+# Download formats: label -> (file extension, MIME type)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def serialize(df, fmt):
+    if fmt == 'CSV':
+        return df.to_csv(index=False).encode('utf-8')
+    buffer = io.BytesIO()
+    if fmt == 'Parquet':
+        df.to_parquet(buffer, index=False)
+    elif fmt == 'Excel':
+        df.to_excel(buffer, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+# Serialized bytes of a dataset (optionally narrowed by ``select``), cached
+# by the roster until the dataset is written again.  ``name`` identifies the
+# selection in the cache.
+def export_bytes(roster, dataset, name, fmt, select=None):
+    return roster.cached(
+        dataset, f'export:{name}:{fmt}',
+        lambda df: serialize(select(df) if select is not None else df, fmt))
+
+
+def file_name(stem, fmt):
+    return f"{stem}.{FORMATS[fmt][0]}"
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
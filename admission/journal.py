@@ -0,0 +1,413 @@
+import datetime
+import json
+import os
+import threading
+
+import pandas as pd
+
+from admission.constants import (CHANGES_DIR, DATA_FILE, JOURNAL_FILE, STUDENT_COLUMNS,
+                                 STUDENT_KEY, TC_FILE)
+from admission.schema import plain_value
+
+
+class JournalWriteError(RuntimeError):
+    pass
+
+
+# Journal records are written one JSON object per line:
+#   {"seq": 12, "time": "2025-06-12T10:31:05", "op": "admit", "student": {...}}
+#   {"seq": 13, "time": "2025-06-12T10:40:17", "op": "tc", "student": {...}}
+# A "tc" record removes the student (matched on Name, Stream and Rank) from
+# the roster and appends the record to the TC register.  Compacted journals
+# are kept in CHANGES_DIR, one segment per compaction named after its first
+# seq, and together with the live journal form the change log.
+OP_ADMIT = 'admit'
+OP_TC = 'tc'
+
+
+def _json_default(value):
+    # numpy scalars and timestamps coming from DataFrame rows
+    value = plain_value(value)
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def _student_key(record):
+    return (str(record['Name']), str(record['Stream']), int(record['Rank']))
+
+
+def _fsync_dir(directory):
+    # Make a rename durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_synced(path, write):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# The tables AdmissionJournal.load() returns, read without opening the
+# journal: no file is created and an interrupted compaction is read as if
+# it had finished.
+def read_tables(directory='.'):
+    paths = {name: os.path.join(directory, name) for name in (DATA_FILE, TC_FILE, JOURNAL_FILE)}
+    try:
+        with open(paths[JOURNAL_FILE] + '.state', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    def snapshot(path, columns):
+        if state.get('pending') and os.path.exists(path + '.next'):
+            path += '.next'
+        return pd.read_csv(path) if os.path.exists(path) else pd.DataFrame(columns=columns)
+
+    students = snapshot(paths[DATA_FILE], STUDENT_COLUMNS)
+    tc = snapshot(paths[TC_FILE], STUDENT_COLUMNS + ['TC_Date'])
+    snapshot_seq = state.get('snapshot_seq', 0)
+    records = [record for path in (paths[JOURNAL_FILE] + '.compacting', paths[JOURNAL_FILE])
+               for record in AdmissionJournal._all_records(path)
+               if record.get('seq', 0) > snapshot_seq]
+    return AdmissionJournal._replay(students, tc, records)
+
+
+class _Batch:
+    __slots__ = ('lines', 'done', 'error')
+
+    def __init__(self):
+        self.lines = []
+        self.done = False
+        self.error = None
+
+
+class AdmissionJournal:
+    """Append-only write path for admissions and TC issuance.
+
+    Every write appends one line to the journal instead of rewriting the
+    CSV files.  Writers that arrive while a flush is in progress join the
+    next batch, so a burst of concurrent submits shares one fsync (group
+    commit).  Once ``compact_every`` records have accumulated, a background
+    thread folds the journal back into ``admission_data.csv`` and
+    ``tc_records.csv`` and, once ``start_change_log`` has run, moves the
+    folded records into the change log segments.
+    """
+
+    def __init__(self, directory='.', compact_every=500):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.students_path = os.path.join(directory, DATA_FILE)
+        self.tc_path = os.path.join(directory, TC_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.compacting_path = self.journal_path + '.compacting'
+        self.state_path = self.journal_path + '.state'
+        self.changes_dir = os.path.join(directory, CHANGES_DIR)
+
+        self._cond = threading.Condition(threading.Lock())
+        self._open_batch = _Batch()
+        self._flushing = False
+        # A failed write could not be cut off; start the next on a new line
+        self._torn = False
+        # Held while the snapshot files are read or replaced
+        self._snapshot_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+
+        state = self._read_state()
+        if state.get('pending'):
+            self._finish_pending()
+        self._snapshot_seq = state.get('snapshot_seq', 0)
+        self._seq = self._snapshot_seq
+        pending = 0
+        for path in (self.compacting_path, self.journal_path):
+            for record in self._read_records(path):
+                self._seq = max(self._seq, record['seq'])
+                pending += 1
+        self._since_compaction = pending
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        # Terminate a torn last line so the next record starts cleanly
+        if self._file.tell() > 0:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+                    self._file.flush()
+
+    # Reading
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _all_records(path):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn write at the tail of the journal; the writer
+                    # never got its acknowledgement, so skip it.
+                    continue
+
+    def _read_records(self, path):
+        for record in self._all_records(path):
+            if record.get('seq', 0) > self._snapshot_seq:
+                yield record
+
+    def _read_snapshots(self):
+        if os.path.exists(self.students_path):
+            students = pd.read_csv(self.students_path)
+        else:
+            students = pd.DataFrame(columns=STUDENT_COLUMNS)
+        if os.path.exists(self.tc_path):
+            tc = pd.read_csv(self.tc_path)
+        else:
+            tc = pd.DataFrame(columns=STUDENT_COLUMNS + ['TC_Date'])
+        return students, tc
+
+    def load(self):
+        # Returns (students_df, tc_df) with the journal applied on top of
+        # the last snapshot.
+        with self._snapshot_lock:
+            students, tc = self._read_snapshots()
+            records = list(self._read_records(self.compacting_path))
+            records += list(self._read_records(self.journal_path))
+        return self._replay(students, tc, records)
+
+    @staticmethod
+    def _replay(students, tc, records):
+        if not records:
+            return students, tc
+
+        added = []
+        removed = set()
+        tc_rows = []
+        for record in records:
+            student = record['student']
+            if record['op'] == OP_ADMIT:
+                added.append(student)
+            elif record['op'] == OP_TC:
+                key = _student_key(student)
+                kept = [s for s in added if _student_key(s) != key]
+                if len(kept) == len(added):
+                    removed.add(key)
+                added = kept
+                tc_rows.append(student)
+
+        if removed and not students.empty:
+            keys = pd.MultiIndex.from_frame(
+                students[STUDENT_KEY].astype({'Name': str, 'Stream': str, 'Rank': int}))
+            students = students[~keys.isin(list(removed))]
+        if added:
+            students = pd.concat([students, pd.DataFrame(added)], ignore_index=True)
+        if tc_rows:
+            tc = pd.concat([tc, pd.DataFrame(tc_rows)], ignore_index=True)
+        return students, tc
+
+    def changes(self, after=0):
+        # Change log records with seq > after.  Segments that end at or
+        # before ``after`` are skipped unread.
+        with self._compact_lock:
+            segments = sorted(os.listdir(self.changes_dir)) if os.path.isdir(self.changes_dir) else []
+            firsts = [int(os.path.splitext(name)[0]) for name in segments]
+            paths = [os.path.join(self.changes_dir, name)
+                     for name, next_first in zip(segments, firsts[1:] + [None])
+                     if next_first is None or next_first - 1 > after]
+            records = []
+            for path in paths + [self.compacting_path, self.journal_path]:
+                records.extend(r for r in self._all_records(path) if r['seq'] > after)
+        return records
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def start_change_log(self, baseline):
+        # Starts keeping compacted records.  ``baseline(students, tc)``
+        # returns (op, record) pairs that recreate the data stored so far;
+        # they become the first segment.
+        if os.path.isdir(self.changes_dir):
+            return
+        if self._since_compaction:
+            self.compact()
+        students, tc = self._read_snapshots()
+        time = datetime.datetime.now().isoformat(timespec='seconds')
+        first = self._seq + 1
+        lines = [json.dumps({'seq': seq, 'time': time, 'op': op, 'student': student},
+                            default=_json_default)
+                 for seq, (op, student) in enumerate(baseline(students, tc), start=first)]
+        staging = self.changes_dir + '.new'
+        os.makedirs(staging, exist_ok=True)
+        if lines:
+            _write_synced(os.path.join(staging, f'{first:012d}.jsonl'),
+                          lambda f: f.write('\n'.join(lines) + '\n'))
+        # The baseline's numbers are taken before the segment appears, so a
+        # crash in between only leaves a gap in the numbering
+        last = first + len(lines) - 1
+        self._write_state({'snapshot_seq': max(self._snapshot_seq, last)})
+        self._seq = self._snapshot_seq = max(self._snapshot_seq, last)
+        os.replace(staging, self.changes_dir)
+        _fsync_dir(self.directory)
+
+    # Writing
+
+    def append_admission(self, student):
+        return self._commit([(OP_ADMIT, student)])
+
+    def append_admissions(self, students):
+        # All records land in the same batch, so they share one fsync
+        return self._commit([(OP_ADMIT, student) for student in students])
+
+    def append_tc(self, student_info):
+        return self._commit([(OP_TC, student_info)])
+
+    def append_tcs(self, students):
+        return self._commit([(OP_TC, student) for student in students])
+
+    def _commit(self, entries):
+        with self._cond:
+            batch = self._open_batch
+            time = datetime.datetime.now().isoformat(timespec='seconds')
+            for op, student in entries:
+                self._seq += 1
+                batch.lines.append(json.dumps({'seq': self._seq, 'time': time, 'op': op,
+                                               'student': student}, default=_json_default))
+            seq = self._seq
+            while not batch.done:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                # Become the leader and flush everything queued so far
+                self._flushing = True
+                flushing, self._open_batch = self._open_batch, _Batch()
+                self._cond.release()
+                size = None
+                try:
+                    size = os.fstat(self._file.fileno()).st_size
+                    self._file.write('\n' * self._torn + '\n'.join(flushing.lines) + '\n')
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._torn = False
+                except (OSError, ValueError) as e:
+                    # ValueError: the file could not be reopened after an
+                    # earlier failure
+                    flushing.error = e
+                    self._drop_failed_write(size)
+                finally:
+                    self._cond.acquire()
+                    flushing.done = True
+                    self._flushing = False
+                    if flushing.error is None:
+                        self._since_compaction += len(flushing.lines)
+                    self._cond.notify_all()
+            if batch.error is not None:
+                raise JournalWriteError(f"Could not write admission journal: {batch.error}")
+            start_compaction = self._since_compaction >= self.compact_every
+        if start_compaction:
+            self.compact(wait=False)
+        return seq
+
+    def _drop_failed_write(self, size):
+        # Cuts a failed batch, which may have reached the file in part, back
+        # off the journal so it is neither replayed nor continued by the
+        # next batch.  Called by the flushing leader without the lock.
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._torn = True
+        if size is not None:
+            try:
+                os.truncate(self.journal_path, size)
+                self._torn = False
+            except OSError:
+                pass
+        try:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+        except OSError:
+            pass
+
+    # Compaction
+
+    def _rotate(self):
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._file.close()
+            os.replace(self.journal_path, self.compacting_path)
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._since_compaction = 0
+        _fsync_dir(self.directory)
+
+    def _compact(self):
+        with self._compact_lock:
+            if not os.path.exists(self.compacting_path):
+                self._rotate()
+            records = list(self._read_records(self.compacting_path))
+            with self._snapshot_lock:
+                students, tc = self._read_snapshots()
+            students, tc = self._replay(students, tc, records)
+            last_seq = max([r['seq'] for r in records], default=self._snapshot_seq)
+
+            # New snapshots are staged next to the live files and the
+            # state file is flipped to "pending" before they are moved into
+            # place, so a crash half way through is rolled forward on the
+            # next start instead of replaying records twice.
+            _write_synced(self.tc_path + '.next', lambda f: tc.to_csv(f, index=False))
+            _write_synced(self.students_path + '.next',
+                          lambda f: students.to_csv(f, index=False))
+            with self._snapshot_lock:
+                self._write_state({'snapshot_seq': last_seq, 'pending': True})
+                self._finish_pending()
+                self._snapshot_seq = last_seq
+                if records and os.path.isdir(self.changes_dir):
+                    os.replace(self.compacting_path, os.path.join(
+                        self.changes_dir, f"{records[0]['seq']:012d}.jsonl"))
+                else:
+                    os.remove(self.compacting_path)
+            _fsync_dir(self.directory)
+
+    def _write_state(self, state):
+        tmp_path = self.state_path + '.tmp'
+        _write_synced(tmp_path, lambda f: json.dump(state, f))
+        os.replace(tmp_path, self.state_path)
+
+    def _finish_pending(self):
+        for path in (self.tc_path, self.students_path):
+            if os.path.exists(path + '.next'):
+                os.replace(path + '.next', path)
+        _fsync_dir(self.directory)
+        state = self._read_state()
+        state.pop('pending', None)
+        self._write_state(state)
+
+    def compact(self, wait=True):
+        if wait:
+            self._compact()
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact, name='journal-compactor',
+                                           daemon=True)
+        self._compactor.start()
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._cond:
+            self._file.close()
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from admission.constants import CLEAN_CACHE_PREFIX
+from admission.perf import span
+from admission.schema import enforce_schema
+from admission.validation import validate_roster
+
+QUARANTINE_FILE = 'quarantine_report.csv'
+
+
+class CleanTables:
+    """The roster and TC register of one backend after ``validate_roster``.
+
+    ``students`` and ``tc`` are schema-enforced frames.  ``quarantine``
+    lists the stored rows that were left out, with a Dataset column saying
+    which table each came from.  ``stored_keys`` maps the (Name, Stream,
+    Rank) of every student whose key was cleaned to the (Name, Stream) the
+    backend still stores, so writes can address the stored row.
+    ``version`` is the backend's ``data_version`` the tables were built from.
+    """
+
+    __slots__ = ('version', 'students', 'tc', 'quarantine', 'stored_keys')
+
+    def __init__(self, version, students, tc, quarantine, stored_keys):
+        self.version = version
+        self.students = students
+        self.tc = tc
+        self.quarantine = quarantine
+        self.stored_keys = stored_keys
+
+
+# Keys of students whose Name or Stream was cleaned: clean key -> stored
+# (Name, Stream).  Compared as whole columns; only changed rows are visited.
+def _stored_keys(stored_df, clean_df):
+    stored = stored_df.loc[clean_df.index]
+    changed = ((stored['Name'].astype(str) != clean_df['Name'].astype(str)) |
+               (stored['Stream'].astype(str) != clean_df['Stream'].astype(str)))
+    return {(str(name), str(stream), int(rank)): (stored_name, stored_stream)
+            for name, stream, rank, stored_name, stored_stream in zip(
+                clean_df['Name'][changed], clean_df['Stream'][changed], clean_df['Rank'][changed],
+                stored['Name'][changed], stored['Stream'][changed])}
+
+
+def clean_tables(backend, version=None):
+    return clean_frames(backend.load_students(), backend.load_tc(), version)
+
+
+# clean_tables for tables already read, e.g. by storage.read_tables
+def clean_frames(students_df, tc_df, version=None):
+    students_df = students_df.reset_index(drop=True)
+    tc_df = tc_df.reset_index(drop=True)
+    with span('validate_roster'):
+        students, student_errors = validate_roster(students_df)
+        # A student may have left, come back and left again
+        tc, tc_errors = validate_roster(tc_df, unique=False)
+    quarantine = pd.concat([student_errors.assign(Dataset='students'),
+                            tc_errors.assign(Dataset='tc')], ignore_index=True)
+    quarantine = quarantine[['Dataset'] + [c for c in quarantine.columns if c != 'Dataset']]
+    return CleanTables(version, enforce_schema(students).reset_index(drop=True),
+                       enforce_schema(tc).reset_index(drop=True), quarantine,
+                       _stored_keys(students_df, students))
+
+
+# The cache is one Arrow (Feather) file per table: plain data, read without
+# running any code, unlike a pickle in a writable data directory.  Each file
+# carries the data_version it was built from.
+_CACHE_TABLES = ('students', 'tc', 'quarantine', 'stored_keys')
+_VERSION_KEY = b'admission_data_version'
+_STORED_KEY_COLUMNS = ['Name', 'Stream', 'Rank', 'Stored_Name', 'Stored_Stream']
+
+
+def _cache_path(directory, table):
+    return os.path.join(directory, f"{CLEAN_CACHE_PREFIX}.{table}.feather")
+
+
+def _cache_frames(tables):
+    stored_keys = pd.DataFrame([key + stored for key, stored in tables.stored_keys.items()],
+                               columns=_STORED_KEY_COLUMNS)
+    # Raw stored values may mix types in a column (SQLite allows it), which
+    # Arrow cannot store; such columns are kept as text
+    quarantine = tables.quarantine.astype(
+        {c: 'str' for c in tables.quarantine.columns
+         if pd.api.types.infer_dtype(tables.quarantine[c], skipna=True).startswith('mixed')})
+    return {'students': tables.students, 'tc': tables.tc, 'quarantine': quarantine,
+            'stored_keys': stored_keys.astype({'Rank': 'int64'})}
+
+
+def _read_cache(directory, version):
+    frames = {}
+    for table in _CACHE_TABLES:
+        path = _cache_path(directory, table)
+        if not os.path.exists(path):
+            return None
+        try:
+            arrow_table = feather.read_table(path)
+        except Exception:
+            # Unreadable or from an incompatible release; rebuilt
+            return None
+        if (arrow_table.schema.metadata or {}).get(_VERSION_KEY) != version:
+            return None
+        frames[table] = arrow_table.to_pandas()
+    # Arrow keeps the categories a column uses; an empty table has none
+    for table in ('students', 'tc'):
+        if frames[table].empty:
+            frames[table] = enforce_schema(frames[table])
+    stored_keys = {(name, stream, int(rank)): (stored_name, stored_stream)
+                   for name, stream, rank, stored_name, stored_stream in zip(
+                       *(frames['stored_keys'][c] for c in _STORED_KEY_COLUMNS))}
+    return frames['students'], frames['tc'], frames['quarantine'], stored_keys
+
+
+def _write_cache(directory, version, tables):
+    for table, frame in _cache_frames(tables).items():
+        arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+        arrow_table = arrow_table.replace_schema_metadata(
+            {**(arrow_table.schema.metadata or {}), _VERSION_KEY: version})
+        # The app and the CLIs may both write it
+        path = _cache_path(directory, table)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(arrow_table, temp_path)
+        os.replace(temp_path, path)
+
+
+# Cleaned tables of a backend, kept next to the data and reused by the next
+# process as long as the backend's data_version is unchanged, so a restart
+# skips validation entirely.
+def load_clean(backend, cache=True):
+    version = backend.data_version()
+    key = json.dumps(version).encode('utf-8')
+    if cache:
+        cached = _read_cache(backend.directory, key)
+        if cached is not None:
+            return CleanTables(version, *cached)
+    tables = clean_tables(backend, version)
+    if cache:
+        _write_cache(backend.directory, key, tables)
+    return tables
+
+
+if __name__ == '__main__':
+    # Not at the top: partitions imports the roster, which imports this module
+    from admission.partitions import DEFAULT_SCHOOL, DEFAULT_YEAR, PartitionCatalog
+    from admission.storage import get_backend
+
+    parser = argparse.ArgumentParser(description="Validate the stored roster and report bad rows")
+    parser.add_argument('--dir', default='.', help="Directory holding the data files")
+    parser.add_argument('--school', default=DEFAULT_SCHOOL)
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR)
+    parser.add_argument('--output', default=QUARANTINE_FILE,
+                        help="CSV file for the quarantined rows")
+    args = parser.parse_args()
+
+    catalog = PartitionCatalog(args.dir)
+    if not catalog.exists(args.school, args.year):
+        parser.error(f"No data stored for {args.school} {args.year}")
+    backend = get_backend(directory=catalog.directory(args.school, args.year))
+    try:
+        tables = load_clean(backend, cache=False)
+    finally:
+        backend.close()
+    print(f"{len(tables.students)} students and {len(tables.tc)} TC records are valid; "
+          f"{len(tables.stored_keys)} students had their name or stream cleaned")
+    if tables.quarantine.empty:
+        print("No rows quarantined")
+    else:
+        tables.quarantine.to_csv(args.output, index=False)
+        print(f"{len(tables.quarantine)} rows quarantined, listed in {args.output}")
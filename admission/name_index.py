@@ -0,0 +1,151 @@
+import re
+import threading
+import unicodedata
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+_SPACES = re.compile(r'\s+')
+# Printable ASCII words (no lower case) separated by single spaces: already
+# in canonical form, as nearly every stored name is
+_CANONICAL = r'[!-`{-~]+(?: [!-`{-~]+)*'
+
+
+# Canonical form used for every name comparison: Unicode-normalised,
+# trimmed, inner whitespace collapsed, upper case.  "Apin " and "APIN" are
+# the same name.
+def normalize_name(name):
+    if not isinstance(name, str):
+        return ''
+    return _SPACES.sub(' ', unicodedata.normalize('NFKC', name)).strip().upper()
+
+
+# Vectorized normalize_name for a Series of names.  One regex match finds
+# the names that need work; only those are normalized.
+def normalize_names(names):
+    names = names.fillna('').astype(str)
+    todo = ~names.str.fullmatch(_CANONICAL)
+    if not todo.any():
+        return names
+    fixed = (names[todo].str.normalize('NFKC')
+             .str.replace(_SPACES, ' ', regex=True).str.strip().str.upper())
+    names = names.copy()
+    names[todo.to_numpy()] = fixed.to_numpy()
+    return names
+
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Trigram index over student names for typo-tolerant lookup.
+
+    Every distinct normalized name gets an integer id and each character
+    trigram keeps a posting list of the ids containing it.  A query
+    concatenates the posting lists of its trigrams and counts shared
+    trigrams per id with one ``numpy.bincount``; candidates are ranked by
+    the Dice coefficient of the two trigram sets.  ``add`` and ``remove``
+    keep the index current as students are admitted or leave: posting lists
+    only grow, and removed names are masked out until they come back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(lambda: array('i'))
+        self._ids = {}
+        self._names = []
+        self._gram_counts = array('i')
+        self._alive = array('b')
+        # normalized name -> {(Name, Stream, Rank), ...} as stored in the roster
+        self._students = defaultdict(set)
+
+    @classmethod
+    def from_frame(cls, students_df):
+        # Bulk build at start-up: names are normalized in one vectorized pass
+        # and each distinct name's trigrams are posted once
+        index = cls()
+        keys = zip(students_df['Name'].astype(str), students_df['Stream'].astype(str),
+                   students_df['Rank'].astype(int).tolist())
+        for normalized, key in zip(normalize_names(students_df['Name']), keys):
+            if normalized:
+                index._students[normalized].add(key)
+        postings = defaultdict(list)
+        for name_id, normalized in enumerate(index._students):
+            index._ids[normalized] = name_id
+            grams = trigrams(normalized)
+            index._gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(name_id)
+        index._names = list(index._students)
+        index._alive = array('b', [1]) * len(index._names)
+        for gram, ids in postings.items():
+            index._postings[gram] = array('i', ids)
+        return index
+
+    def __len__(self):
+        return len(self._students)
+
+    def _add(self, name, key):
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        name_id = self._ids.get(normalized)
+        if name_id is None:
+            name_id = len(self._names)
+            self._ids[normalized] = name_id
+            self._names.append(normalized)
+            grams = trigrams(normalized)
+            self._gram_counts.append(len(grams))
+            self._alive.append(1)
+            for gram in grams:
+                self._postings[gram].append(name_id)
+        else:
+            self._alive[name_id] = 1
+        self._students[normalized].add(key)
+
+    def add(self, name, key):
+        with self._lock:
+            self._add(name, key)
+
+    def remove(self, name, key):
+        normalized = normalize_name(name)
+        with self._lock:
+            keys = self._students.get(normalized)
+            if keys is None:
+                return
+            keys.discard(key)
+            if not keys:
+                del self._students[normalized]
+                self._alive[self._ids[normalized]] = 0
+
+    def exact(self, name):
+        # Roster keys whose name normalizes to the same string
+        with self._lock:
+            return sorted(self._students.get(normalize_name(name), ()), key=str)
+
+    def search(self, query, limit=10, min_score=0.4):
+        # Returns [(score, normalized_name, [keys...]), ...], best first
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized)
+        with self._lock:
+            lists = [np.array(self._postings[gram], dtype=np.int32)
+                     for gram in query_grams if gram in self._postings]
+            if not lists:
+                return []
+            total = len(self._names)
+            shared = np.bincount(np.concatenate(lists), minlength=total)
+            sizes = np.array(self._gram_counts, dtype=np.int32)
+            alive = np.array(self._alive, dtype=bool)
+            scores = np.where(alive, 2 * shared / (len(query_grams) + sizes), 0.0)
+
+            top = min(limit, total)
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.lexsort((best, -scores[best]))]
+            return [(float(scores[i]), self._names[i],
+                     sorted(self._students[self._names[i]], key=str))
+                    for i in best if scores[i] >= min_score]
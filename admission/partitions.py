@@ -0,0 +1,203 @@
+import argparse
+import os
+import re
+import threading
+
+import pandas as pd
+
+from admission.aggregates import COUNTED_COLUMNS
+from admission.constants import DATA_FILE, DB_FILE, JOURNAL_FILE, TC_FILE
+from admission.core import AdmissionService
+from admission.loading import clean_frames
+from admission.perf import span
+from admission.storage import get_backend, read_tables
+
+# Each school and admission year keeps its data in a directory of its own
+# (a partition):  <root>/schools/<SCHOOL>/<YEAR>/admission.db (or the CSVs)
+PARTITIONS_DIR = 'schools'
+# Files the storage backends write; a summary older than any of them is stale
+DATA_FILES = [DB_FILE, DB_FILE + '-wal', DATA_FILE, TC_FILE, JOURNAL_FILE]
+
+# School and admission year opened by default
+SCHOOL_ENV = 'ADMISSION_SCHOOL'
+YEAR_ENV = 'ADMISSION_YEAR'
+DEFAULT_SCHOOL = os.environ.get(SCHOOL_ENV, 'GHSS CHERPU')
+DEFAULT_YEAR = int(os.environ.get(YEAR_ENV, 2025))
+# Data written before partitioning (flat files in the root) is this
+# partition's until data is written to its own directory
+LEGACY_PARTITION = ('GHSS CHERPU', 2025)
+
+
+class PartitionNotFoundError(LookupError):
+    pass
+
+
+# School name as used for its directory: spaces, letters, digits, '.', '-'
+def school_key(school):
+    key = re.sub(r'[^\w .-]+', '', str(school)).strip().upper()
+    if not key or key.startswith('.'):
+        raise ValueError(f"Not a usable school name: {school!r}")
+    return key
+
+
+def _data_files(directory):
+    return [path for path in (os.path.join(directory, f) for f in DATA_FILES)
+            if os.path.exists(path)]
+
+
+def _data_mtime(directory):
+    return max((os.path.getmtime(path) for path in _data_files(directory)), default=0.0)
+
+
+class PartitionCatalog:
+    """The schools and admission years stored under one data directory.
+
+    ``service`` opens the ``AdmissionService`` of one stored partition on
+    first use and keeps it for the process; only ``create`` adds a
+    partition, so browsing never writes a directory or data file.  Only
+    opened partitions are loaded, so pages of the current year cost the
+    same however many years are stored.  ``summaries`` builds cross-year
+    tables from one small summary per partition: open partitions report
+    their live counters, the others are read without opening a backend and
+    summarized once per change of their data files.
+    """
+
+    def __init__(self, root='.', kind=None, legacy=LEGACY_PARTITION):
+        self.root = root
+        self.kind = kind
+        self.legacy = (school_key(legacy[0]), int(legacy[1])) if legacy else None
+        self._lock = threading.Lock()
+        self._services = {}
+        # (school, year) -> summary of a partition that is not open
+        self._summaries = {}
+
+    def directory(self, school, year):
+        directory = os.path.join(self.root, PARTITIONS_DIR, school_key(school), str(int(year)))
+        if ((school_key(school), int(year)) == self.legacy and not _data_files(directory)
+                and _data_files(self.root)):
+            return self.root
+        return directory
+
+    def partitions(self):
+        # (school, year) of every partition holding data, oldest year first
+        found = set()
+        base = os.path.join(self.root, PARTITIONS_DIR)
+        if os.path.isdir(base):
+            for school in os.listdir(base):
+                # Files beside the school folders (a shared logo, notes)
+                if not os.path.isdir(os.path.join(base, school)):
+                    continue
+                for year in os.listdir(os.path.join(base, school)):
+                    if year.isdigit() and _data_files(os.path.join(base, school, year)):
+                        found.add((school, int(year)))
+        if self.legacy and _data_files(self.root):
+            found.add(self.legacy)
+        return sorted(found, key=lambda p: (p[0], p[1]))
+
+    def exists(self, school, year):
+        return bool(_data_files(self.directory(school, year)))
+
+    def schools(self):
+        return sorted({school for school, _ in self.partitions()})
+
+    def years(self, school):
+        # Newest first
+        school = school_key(school)
+        return sorted({year for s, year in self.partitions() if s == school}, reverse=True)
+
+    def school_file(self, school, name):
+        # A school's own copy of a file (e.g. its logo), else the shared one
+        path = os.path.join(self.root, PARTITIONS_DIR, school_key(school), name)
+        return path if os.path.exists(path) else os.path.join(self.root, name)
+
+    def service(self, school, year):
+        return self._open(school, year, create=False)
+
+    def create(self, school, year):
+        # Adds the partition (a no-op for one already stored) and opens it
+        return self._open(school, year, create=True)
+
+    def _open(self, school, year, create):
+        key = (school_key(school), int(year))
+        with self._lock:
+            service = self._services.get(key)
+            if service is None:
+                directory = self.directory(*key)
+                if not create and not _data_files(directory):
+                    raise PartitionNotFoundError(f"No data stored for {key[0]} {key[1]}")
+                os.makedirs(directory, exist_ok=True)
+                with span('load_roster'):
+                    service = AdmissionService(get_backend(self.kind, directory))
+                self._services[key] = service
+            return service
+
+    # Cross-year summaries
+
+    def summary(self, school, year):
+        key = (school_key(school), int(year))
+        service = self._services.get(key)
+        if service is not None:
+            return _live_summary(service)
+        directory = self.directory(*key)
+        if not _data_files(directory):
+            return _frame_summary(pd.DataFrame(columns=COUNTED_COLUMNS), 0)
+        summary = self._summaries.get(key)
+        if summary is not None and summary['data_mtime'] >= _data_mtime(directory):
+            return summary
+        with span('partition_summary'):
+            tables = clean_frames(*read_tables(directory, self.kind))
+            summary = _frame_summary(tables.students, len(tables.tc))
+        # Reading SQLite may add its -wal file; take the time once it is closed
+        summary['data_mtime'] = _data_mtime(directory)
+        self._summaries[key] = summary
+        return summary
+
+    def summaries(self, school=None, column='Stream'):
+        # One row per partition: School, Year, Students, TCs and the
+        # students per value of ``column``
+        rows = []
+        for s, year in self.partitions():
+            if school is not None and s != school_key(school):
+                continue
+            summary = self.summary(s, year)
+            rows.append({'School': s, 'Year': year, 'Students': summary['students'],
+                         'TCs': summary['tc'], **summary['counts'][column]})
+        if not rows:
+            return pd.DataFrame(columns=['School', 'Year', 'Students', 'TCs'])
+        summaries = pd.DataFrame(rows)
+        values = sorted(summaries.columns[4:])
+        summaries[values] = summaries[values].fillna(0).astype(int)
+        return summaries[['School', 'Year', 'Students', 'TCs'] + values]
+
+    def close(self):
+        with self._lock:
+            for service in self._services.values():
+                service.analytics.stop()
+                service.backend.close()
+            self._services.clear()
+
+
+def _live_summary(service):
+    aggregates = service.roster.aggregates
+    counts = {}
+    for column in COUNTED_COLUMNS:
+        table = aggregates.counts(column)
+        counts[column] = dict(zip(table[column].astype(str), table['Count'].astype(int).tolist()))
+    return {'students': aggregates.total, 'tc': len(service.tc_records()), 'counts': counts}
+
+
+def _frame_summary(students_df, tc_count):
+    counts = {column: {str(value): int(n) for value, n in students_df[column].value_counts().items()
+                       if n}
+              for column in COUNTED_COLUMNS}
+    return {'students': len(students_df), 'tc': int(tc_count), 'counts': counts}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the stored schools and years")
+    parser.add_argument('--dir', default='.', help="Directory holding the data files")
+    args = parser.parse_args()
+
+    catalog = PartitionCatalog(args.dir)
+    summaries = catalog.summaries()
+    print(summaries.to_string(index=False) if not summaries.empty else "No data stored yet")
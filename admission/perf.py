@@ -0,0 +1,108 @@
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Path of an optional JSONL log of every timing (one object per line)
+LOG_ENV = 'ADMISSION_PERF_LOG'
+
+
+class PerfRecorder:
+    """Rolling store of operation timings for the whole server process.
+
+    ``span`` and ``timed`` measure a block or a function; the latest
+    ``window`` durations are kept per operation, so ``summary`` reports
+    current percentiles rather than an all-time average.  Page runs are
+    kept separately with the roster size in memory at the time.  With a
+    ``log_path`` every timing is also appended to a JSONL file.
+    """
+
+    def __init__(self, window=1000, log_path=None):
+        self._lock = threading.Lock()
+        self._window = window
+        self._timings = {}
+        self._runs = deque(maxlen=window)
+        self._local = threading.local()
+        self._log = open(log_path, 'a', buffering=1, encoding='utf-8') if log_path else None
+
+    def record(self, operation, ms, **extra):
+        with self._lock:
+            timings = self._timings.get(operation)
+            if timings is None:
+                timings = self._timings[operation] = deque(maxlen=self._window)
+            timings.append(ms)
+            if self._log is not None:
+                entry = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+                         'operation': operation, 'ms': round(ms, 3), **extra}
+                self._log.write(json.dumps(entry) + '\n')
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        # Innermost open span on this thread, or None
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def span(self, operation):
+        stack = self._stack()
+        stack.append(operation)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, (time.perf_counter() - start) * 1000)
+            stack.pop()
+
+    def timed(self, operation):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(operation):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def page_run(self, page, ms, students_mb):
+        # Total of one full script run, with the roster's memory footprint
+        self.record(f'page:{page}', ms, students_mb=round(students_mb, 2))
+        with self._lock:
+            self._runs.append({'Time': pd.Timestamp.now(), 'Page': page, 'ms': ms,
+                               'Students_MiB': students_mb})
+
+    # Reports
+
+    def summary(self):
+        with self._lock:
+            items = [(op, np.array(values)) for op, values in self._timings.items()]
+        rows = [{'Operation': op, 'Count': len(values),
+                 'p50_ms': np.percentile(values, 50), 'p95_ms': np.percentile(values, 95),
+                 'Max_ms': values.max()}
+                for op, values in items if len(values)]
+        summary = pd.DataFrame(rows, columns=['Operation', 'Count', 'p50_ms', 'p95_ms', 'Max_ms'])
+        return summary.sort_values('p95_ms', ascending=False, ignore_index=True)
+
+    def runs(self):
+        with self._lock:
+            return pd.DataFrame(list(self._runs), columns=['Time', 'Page', 'ms', 'Students_MiB'])
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._runs.clear()
+
+
+recorder = PerfRecorder(log_path=os.environ.get(LOG_ENV))
+span = recorder.span
+timed = recorder.timed
@@ -0,0 +1,356 @@
+import threading
+
+import pandas as pd
+
+from admission.aggregates import AdmissionAggregates
+from admission.cache import VersionedCache
+from admission.loading import load_clean
+from admission.name_index import NameIndex, normalize_name, normalize_names
+from admission.perf import span
+from admission.schema import append_rows, enforce_schema
+
+
+class RosterConflictError(RuntimeError):
+    # The roster changed since the caller read it
+    pass
+
+
+class DuplicateStudentError(ValueError):
+    pass
+
+
+class StudentNotFoundError(LookupError):
+    pass
+
+
+def _key(name, stream, rank):
+    return (str(name), str(stream), int(rank))
+
+
+class RosterStore:
+    """Process-wide roster shared by every Streamlit session.
+
+    The roster is held once per server process.  Each committed write
+    produces a new DataFrame and bumps ``version``; frames handed out by
+    ``snapshot`` are never modified afterwards, so sessions can keep a
+    reference without copying.  Writes take the version the caller validated
+    against and fail with ``RosterConflictError`` if another session
+    committed in the meantime (optimistic concurrency).  The lock is not
+    held while a write is persisted (see ``admit``), so concurrent writes
+    share the backend's commits.
+
+    The students and TC datasets each have their own generation counter;
+    ``cached`` memoises values derived from one dataset until that dataset
+    is written again.  ``aggregates`` holds the dashboard counters, which are
+    adjusted by each write rather than recomputed from the roster, and
+    ``names`` the typo-tolerant name index, maintained the same way.
+    Listeners added with ``add_listener`` are called with the changed
+    datasets after each commit, while the roster lock is held, so they
+    must only hand the work off.  Both tables are loaded through
+    ``load_clean``; ``quarantine`` lists the stored rows left out.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._lock = threading.RLock()
+        self._version = 0
+        self._generations = {'students': 0, 'tc': 0}
+        self.cache = VersionedCache()
+        self._listeners = []
+        tables = load_clean(backend)
+        self._students = tables.students
+        self._tc = tables.tc
+        self.quarantine = tables.quarantine
+        # Students whose name or stream was cleaned on load -> the
+        # (Name, Stream) the backend stores
+        self._stored_keys = dict(tables.stored_keys)
+        self.aggregates = AdmissionAggregates.from_frame(self._students)
+        self._next_label = len(self._students)
+        self.names = NameIndex.from_frame(self._students)
+        # Reservations of writes being persisted: normalized names being
+        # admitted and labels of students being issued a TC
+        self._arriving = set()
+        self._leaving = set()
+        self._keys = {
+            _key(name, stream, rank): label
+            for label, name, stream, rank in zip(self._students.index, self._students['Name'],
+                                                 self._students['Stream'], self._students['Rank'])
+        }
+
+    @property
+    def version(self):
+        return self._version
+
+    def generation(self, dataset):
+        return self._generations[dataset]
+
+    # Reading
+
+    def snapshot(self):
+        # Returns (version, students_df); treat the frame as read-only
+        with self._lock:
+            return self._version, self._students
+
+    def tc_snapshot(self):
+        with self._lock:
+            return self._version, self._tc
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def cached(self, dataset, name, build):
+        # build(frame) is called only when the dataset changed since the
+        # value was last built
+        with self._lock:
+            generation = self._generations[dataset]
+            frame = self._students if dataset == 'students' else self._tc
+        return self.cache.get(dataset, name, generation, lambda: build(frame))
+
+    def name_exists(self, name):
+        # Compares normalized names, so "APIN " and "apin" are the same student
+        return bool(self.names.exact(name))
+
+    def _label(self, name, stream, rank):
+        key = _key(name, stream, rank)
+        label = self._keys.get(key)
+        if label is None:
+            # Stored under a differently spaced or cased spelling
+            for stored in self.names.exact(name):
+                if stored[1:] == key[1:]:
+                    return self._keys.get(stored)
+        return label
+
+    def find_student(self, name, stream, rank):
+        with self._lock:
+            label = self._label(name, stream, rank)
+            if label is None:
+                return None
+            return self._students.loc[label].to_dict()
+
+    def similar_names(self, name, limit=5, min_score=0.6):
+        # [(score, name, [(Name, Stream, Rank), ...]), ...] for typeahead and
+        # possible-duplicate warnings
+        return self.names.search(name, limit=limit, min_score=min_score)
+
+    def possible_duplicates(self, name, stream, rank, min_score=0.6):
+        # Students whose name differs from ``name`` by a typo and who hold
+        # the same Stream and Rank: the same student entered twice.  Near
+        # namesakes (ARJUN SURESH K M and K B) hold other ranks.
+        name = normalize_name(name)
+        return [key for _, match, keys in self.similar_names(name, limit=20, min_score=min_score)
+                if match != name
+                for key in keys if key[1] == stream and key[2] == int(rank)]
+
+    # Hash join of (Name, Stream, Rank) rows against the key index: O(rows),
+    # independent of the roster size.  Returns the roster labels (None where
+    # there is no such student).
+    def lookup(self, keys_df):
+        with self._lock:
+            return [self._label(name, stream, rank)
+                    for name, stream, rank in zip(keys_df['Name'], keys_df['Stream'],
+                                                  keys_df['Rank'])]
+
+    def recent_admissions(self, limit=5):
+        with self._lock:
+            if self.aggregates.recent_incomplete:
+                # TCs emptied part of the buffer; refill it from the roster
+                self.aggregates.reset_recent(self._students)
+        return self.aggregates.recent(limit)
+
+    # Writing
+
+    # Rows as the backend stores them, for writes that address students by key
+    def _stored_rows(self, rows):
+        stored = [self._stored_keys.get(_key(name, stream, rank))
+                  for name, stream, rank in zip(rows['Name'], rows['Stream'], rows['Rank'])]
+        if not any(stored):
+            return rows
+        rows = rows.copy()
+        rows['Name'] = [key[0] if key else name for key, name in zip(stored, rows['Name'])]
+        rows['Stream'] = [key[1] if key else stream for key, stream in zip(stored, rows['Stream'])]
+        return rows
+
+    def _check_version(self, expected_version):
+        if expected_version is not None and expected_version != self._version:
+            raise RosterConflictError(
+                f"Roster is at version {self._version}, expected {expected_version}")
+
+    # Every write runs in three steps: under the lock it checks the version
+    # and reserves what it changes (names being admitted, students leaving);
+    # it persists without the lock, so concurrent writes reach the journal
+    # together and share a group commit; then it takes the lock again to
+    # apply the change in memory.  Reservations make a concurrent write of
+    # the same student fail as it would after the first one committed.
+
+    def _reserve_names(self, names):
+        # names: normalized; raises DuplicateStudentError for names on the
+        # roster, in flight in another write, or repeated
+        names = pd.Index(names)
+        clashes = names[[bool(self.names.exact(name)) or name in self._arriving
+                         for name in names] | names.duplicated()]
+        if len(clashes):
+            raise DuplicateStudentError(', '.join(map(str, clashes.unique())))
+        self._arriving.update(names)
+
+    def _reserve_leaving(self, labels, keys):
+        busy = [key for label, key in zip(labels, keys) if label in self._leaving]
+        if busy:
+            raise StudentNotFoundError(
+                ', '.join(f"{n} ({s}, rank {r}) is already being issued a TC" for n, s, r in busy))
+        self._leaving.update(labels)
+
+    def admit(self, student, expected_version=None):
+        normalized = normalize_name(student['Name'])
+        with self._lock:
+            self._check_version(expected_version)
+            try:
+                self._reserve_names([normalized])
+            except DuplicateStudentError:
+                raise DuplicateStudentError(student['Name'])
+            label = self._next_label
+            self._next_label += 1
+        try:
+            with span('persist:admit'):
+                self._backend.add_student(student)
+        except BaseException:
+            with self._lock:
+                self._arriving.discard(normalized)
+            raise
+
+        new_row = enforce_schema(pd.DataFrame([student], index=[label]))
+        with self._lock:
+            self._arriving.discard(normalized)
+            self._students = append_rows(self._students, new_row)
+            self.aggregates.add(new_row.loc[label].to_dict())
+            key = _key(student['Name'], student['Stream'], student['Rank'])
+            self._keys[key] = label
+            self.names.add(key[0], key)
+            self._committed('students')
+            return self._version
+
+    def admit_many(self, students_df, expected_version=None):
+        # Admits every row as a single commit; all-or-nothing
+        names = normalize_names(students_df['Name']).tolist()
+        with self._lock:
+            self._check_version(expected_version)
+            self._reserve_names(names)
+            labels = range(self._next_label, self._next_label + len(students_df))
+            self._next_label += len(students_df)
+        try:
+            with span('persist:admit_many'):
+                self._backend.add_students(students_df)
+        except BaseException:
+            with self._lock:
+                self._arriving.difference_update(names)
+            raise
+
+        new_rows = enforce_schema(students_df.set_axis(labels))
+        with self._lock:
+            self._arriving.difference_update(names)
+            self._students = append_rows(self._students, new_rows)
+            for label, name, stream, rank in zip(labels, new_rows['Name'], new_rows['Stream'],
+                                                 new_rows['Rank']):
+                key = _key(name, stream, rank)
+                self._keys[key] = label
+                self.names.add(name, key)
+            self.aggregates.add_frame(new_rows)
+            self._committed('students')
+            return self._version
+
+    def issue_tc(self, student_info, expected_version=None):
+        with self._lock:
+            self._check_version(expected_version)
+            label = self._label(student_info['Name'], student_info['Stream'],
+                                student_info['Rank'])
+            if label is None:
+                raise StudentNotFoundError(
+                    _key(student_info['Name'], student_info['Stream'], student_info['Rank']))
+            student = self._students.loc[label].to_dict()
+            key = _key(student['Name'], student['Stream'], student['Rank'])
+            self._reserve_leaving([label], [key])
+            # The backend removes the student by the key as stored
+            stored = self._stored_keys.get(key, key[:2])
+        student_info = {**student_info, 'Name': key[0]}
+        try:
+            with span('persist:issue_tc'):
+                self._backend.issue_tc({**student_info, 'Name': stored[0], 'Stream': stored[1]})
+        except BaseException:
+            with self._lock:
+                self._leaving.discard(label)
+            raise
+
+        with self._lock:
+            self._leaving.discard(label)
+            self._stored_keys.pop(key, None)
+            self.aggregates.remove(student)
+            self._students = self._students.drop(index=label)
+            del self._keys[key]
+            self.names.remove(key[0], key)
+            self._tc = append_rows(self._tc, pd.DataFrame([student_info], index=[len(self._tc)]))
+            self._committed('students', 'tc')
+            return self._version
+
+    def issue_tcs(self, requests_df, tc_date, expected_version=None):
+        # Issues TCs for every (Name, Stream, Rank) row as one commit; an
+        # optional TC_Reason column is copied to the TC records.
+        with self._lock:
+            self._check_version(expected_version)
+            labels = self.lookup(requests_df)
+            missing = [f"{n} ({s}, rank {r})" for label, n, s, r in zip(
+                labels, requests_df['Name'], requests_df['Stream'], requests_df['Rank'])
+                if label is None]
+            if missing:
+                raise StudentNotFoundError(', '.join(missing))
+            if len(set(labels)) != len(labels):
+                raise ValueError("The same student is listed more than once")
+
+            removed = self._students.loc[labels]
+            keys = [_key(name, stream, rank) for name, stream, rank in zip(
+                removed['Name'], removed['Stream'], removed['Rank'])]
+            self._reserve_leaving(labels, keys)
+            tc_rows = removed.reset_index(drop=True)
+            tc_rows['TC_Date'] = tc_date
+            if 'TC_Reason' in requests_df.columns:
+                reasons = requests_df['TC_Reason'].reset_index(drop=True)
+                tc_rows['TC_Reason'] = reasons.where(reasons.astype(bool), None)
+            stored_rows = self._stored_rows(tc_rows)
+        try:
+            with span('persist:issue_tcs'):
+                self._backend.issue_tcs(stored_rows)
+        except BaseException:
+            with self._lock:
+                self._leaving.difference_update(labels)
+            raise
+
+        with self._lock:
+            self._leaving.difference_update(labels)
+            self.aggregates.remove_frame(removed)
+            self._students = self._students.drop(index=labels)
+            for key in keys:
+                del self._keys[key]
+                self._stored_keys.pop(key, None)
+                self.names.remove(key[0], key)
+            self._tc = append_rows(self._tc, tc_rows.set_axis(
+                range(len(self._tc), len(self._tc) + len(tc_rows))))
+            self._committed('students', 'tc')
+            return self._version
+
+    def _committed(self, *datasets):
+        self._version += 1
+        for dataset in datasets:
+            self._generations[dataset] += 1
+            self.cache.invalidate(dataset)
+        for listener in self._listeners:
+            listener(datasets)
+
+
+# Runs ``write(expected_version)`` against the roster, re-reading the
+# version and retrying when another session committed first.  ``write``
+# must re-validate against the roster itself (admit/issue_tc do).
+def commit_with_retry(roster, write, expected_version, attempts=5):
+    for _ in range(attempts - 1):
+        try:
+            return write(expected_version)
+        except RosterConflictError:
+            expected_version = roster.version
+    return write(roster.version)
@@ -0,0 +1,71 @@
+import datetime
+
+import pandas as pd
+
+from admission.constants import (CASTES, SECOND_LANGUAGES, STATUS_OPTIONS, STREAMS,
+                                 STUDENT_COLUMNS)
+
+# Categorical columns and their categories, in display order
+CATEGORIES = {
+    'Stream': STREAMS,
+    'Second_Language': SECOND_LANGUAGES,
+    'Caste': CASTES,
+    'Admission_Status': STATUS_OPTIONS,
+}
+DATE_COLUMNS = ['Date_of_Admission', 'TC_Date']
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _categorical(values, categories):
+    # Values outside the constants are kept as extra categories rather than
+    # turned into NaN; validation decides what to do with them.
+    if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories) == categories:
+        return values.array
+    values = values.astype(object)
+    extra = sorted(set(values.dropna().unique()) - set(categories), key=str)
+    return pd.Categorical(values, categories=list(categories) + extra)
+
+
+def _rank(values):
+    ranks = pd.to_numeric(values, errors='coerce')
+    return ranks.astype('Int32' if ranks.isna().any() else 'int32')
+
+
+# Roster (or TC register) with the compact in-memory types: Categoricals for
+# the constant-backed columns, int32 ranks and datetime64 dates parsed once.
+def enforce_schema(df):
+    df = df.copy()
+    for column in STUDENT_COLUMNS:
+        if column not in df.columns:
+            df[column] = pd.Series(dtype=object, index=df.index)
+    for column, categories in CATEGORIES.items():
+        df[column] = _categorical(df[column], categories)
+    df['Rank'] = _rank(df['Rank'])
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=DATE_FORMAT, errors='coerce')
+    return df
+
+
+# Appends rows to a schema-enforced frame without losing the compact types
+# (concatenating Categoricals with different categories falls back to object).
+def append_rows(df, rows):
+    rows = enforce_schema(rows)
+    df = df.copy(deep=False)
+    for column in CATEGORIES:
+        missing = [c for c in rows[column].cat.categories if c not in df[column].cat.categories]
+        if missing:
+            df[column] = df[column].cat.add_categories(missing)
+        rows[column] = rows[column].cat.set_categories(df[column].cat.categories)
+    if df['Rank'].dtype != rows['Rank'].dtype:
+        rows['Rank'] = rows['Rank'].astype(df['Rank'].dtype)
+    return pd.concat([df, rows])
+
+
+# Python/JSON/SQLite friendly form of a single cell
+def plain_value(value):
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.strftime(DATE_FORMAT)
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
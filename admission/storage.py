@@ -0,0 +1,366 @@
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+
+import pandas as pd
+
+from admission.constants import (DATA_FILE, DB_FILE, STUDENT_COLUMNS, STUDENT_KEY,
+                                 TC_COLUMNS, TC_FILE)
+from admission.changes import baseline_events, changes_frame, event_json, event_time
+from admission.journal import OP_ADMIT, OP_TC, AdmissionJournal
+from admission.journal import read_tables as read_journal_tables
+from admission.schema import plain_value
+
+# Selects the storage backend: "sqlite" (default) or "csv"
+STORAGE_ENV = 'ADMISSION_STORAGE'
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _student_values(student, columns):
+    return tuple(None if pd.isna(student.get(c)) else plain_value(student.get(c))
+                 for c in columns)
+
+
+class StorageBackend:
+    """Interface shared by the storage backends.
+
+    ``load_students`` and ``load_tc`` return full DataFrames.  Lookups are
+    answered from the roster held in memory (``RosterStore``), so backends
+    only load and persist.
+    """
+
+    def load_students(self):
+        raise NotImplementedError
+
+    def load_tc(self):
+        raise NotImplementedError
+
+    def add_student(self, student):
+        raise NotImplementedError
+
+    def add_students(self, students_df):
+        # Adds all rows as one commit
+        raise NotImplementedError
+
+    def issue_tc(self, student_info):
+        # Removes the student and records the TC as one commit
+        raise NotImplementedError
+
+    def issue_tcs(self, tc_df):
+        # Batch version of issue_tc, also a single commit
+        raise NotImplementedError
+
+    def changes(self, after=0, limit=None):
+        # Change events with seq > after, oldest first, as a CHANGE_COLUMNS
+        # frame; reads only those events
+        raise NotImplementedError
+
+    def last_change(self):
+        # Sequence number of the latest change event (0 if none)
+        raise NotImplementedError
+
+    def data_version(self):
+        # Changes whenever the stored tables may have changed, including
+        # edits made outside the app
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CsvJournalBackend(StorageBackend):
+    """CSV snapshots plus the append-only admission journal."""
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self.journal = AdmissionJournal(directory)
+        self.journal.start_change_log(baseline_events)
+
+    # Read back from the snapshots and the journal; the roster keeps the
+    # tables in memory, so this runs once per load
+    def load_students(self):
+        return self.journal.load()[0]
+
+    def load_tc(self):
+        return self.journal.load()[1]
+
+    def add_student(self, student):
+        self.journal.append_admission(student)
+
+    def add_students(self, students_df):
+        self.journal.append_admissions(students_df.to_dict('records'))
+
+    def issue_tc(self, student_info):
+        self.journal.append_tc(student_info)
+
+    def issue_tcs(self, tc_df):
+        self.journal.append_tcs(tc_df.to_dict('records'))
+
+    def changes(self, after=0, limit=None):
+        return changes_frame(self.journal.changes(after)[:limit])
+
+    def last_change(self):
+        return self.journal.last_seq
+
+    def data_version(self):
+        journal = self.journal
+        return tuple(_file_version(path) for path in (journal.students_path, journal.tc_path,
+                                                      journal.journal_path,
+                                                      journal.compacting_path))
+
+    def close(self):
+        self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Rank INTEGER NOT NULL,
+    Stream TEXT NOT NULL,
+    Second_Language TEXT,
+    Caste TEXT,
+    Admission_Status TEXT,
+    Date_of_Admission TEXT
+);
+-- Finds the student a TC removes
+CREATE INDEX IF NOT EXISTS idx_students_key ON students (Name, Stream, Rank);
+
+CREATE TABLE IF NOT EXISTS tc_records (
+    id INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Rank INTEGER NOT NULL,
+    Stream TEXT NOT NULL,
+    Second_Language TEXT,
+    Caste TEXT,
+    Admission_Status TEXT,
+    Date_of_Admission TEXT,
+    TC_Date TEXT,
+    TC_Reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tc_date ON tc_records (TC_Date);
+
+-- Change log: one row per admission or TC, in commit order
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL,
+    op TEXT NOT NULL,
+    student TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_STUDENT_COLS_SQL = ', '.join(STUDENT_COLUMNS)
+_TC_COLS_SQL = ', '.join(TC_COLUMNS)
+_INSERT_STUDENT = (f"INSERT INTO students ({_STUDENT_COLS_SQL}) "
+                   f"VALUES ({', '.join('?' * len(STUDENT_COLUMNS))})")
+_INSERT_TC = (f"INSERT INTO tc_records ({_TC_COLS_SQL}) "
+              f"VALUES ({', '.join('?' * len(TC_COLUMNS))})")
+_INSERT_CHANGE = "INSERT INTO changes (time, op, student) VALUES (?, ?, ?)"
+
+
+# Change log rows for (op, record) pairs, written in the data's transaction
+def _log_changes(conn, events):
+    time = event_time()
+    conn.executemany(_INSERT_CHANGE, ((time, op, event_json(record)) for op, record in events))
+
+
+def _load_students(conn):
+    return pd.read_sql_query(f"SELECT {_STUDENT_COLS_SQL} FROM students ORDER BY id", conn)
+
+
+def _load_tc(conn):
+    tc_df = pd.read_sql_query(f"SELECT {_TC_COLS_SQL} FROM tc_records ORDER BY id", conn)
+    if tc_df['TC_Reason'].isna().all():
+        tc_df = tc_df.drop(columns='TC_Reason')
+    return tc_df
+
+
+class SqliteBackend(StorageBackend):
+    """Embedded SQLite storage.
+
+    Every write also appends its change events in the same transaction, so
+    the change log and the tables never disagree.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.directory = os.path.dirname(path) or '.'
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        if not self.get_meta('change_log_started'):
+            # Rows stored before the change log become its first events
+            with self._conn() as conn:
+                _log_changes(conn, baseline_events(self.load_students(), self.load_tc()))
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             ('change_log_started', event_time()))
+
+    def _conn(self):
+        # sqlite3 connections must stay on the thread that created them and
+        # every Streamlit session runs on its own thread.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load_students(self):
+        return _load_students(self._conn())
+
+    def load_tc(self):
+        return _load_tc(self._conn())
+
+    def add_student(self, student):
+        with self._conn() as conn:
+            conn.execute(_INSERT_STUDENT, _student_values(student, STUDENT_COLUMNS))
+            _log_changes(conn, [(OP_ADMIT, student)])
+
+    def add_students(self, students_df):
+        records = students_df.to_dict('records')
+        with self._conn() as conn:
+            conn.executemany(_INSERT_STUDENT, (
+                _student_values(row, STUDENT_COLUMNS) for row in records))
+            _log_changes(conn, [(OP_ADMIT, row) for row in records])
+
+    def issue_tc(self, student_info):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM students WHERE Name = ? AND Stream = ? AND Rank = ?",
+                         _student_values(student_info, STUDENT_KEY))
+            conn.execute(_INSERT_TC, _student_values(student_info, TC_COLUMNS))
+            _log_changes(conn, [(OP_TC, student_info)])
+
+    def issue_tcs(self, tc_df):
+        records = tc_df.to_dict('records')
+        with self._conn() as conn:
+            conn.executemany("DELETE FROM students WHERE Name = ? AND Stream = ? AND Rank = ?",
+                             (_student_values(row, STUDENT_KEY) for row in records))
+            conn.executemany(_INSERT_TC, (_student_values(row, TC_COLUMNS) for row in records))
+            _log_changes(conn, [(OP_TC, row) for row in records])
+
+    def import_tables(self, students_df, tc_df, source):
+        # Students and TC records brought in from elsewhere, plus the
+        # migrated_from_csv marker, as one commit.  TC records come without
+        # their students: logged as admitted, then issued a TC.
+        with self._conn() as conn:
+            conn.executemany(_INSERT_STUDENT, (
+                _student_values(row, STUDENT_COLUMNS) for row in students_df.to_dict('records')))
+            conn.executemany(_INSERT_TC, (
+                _student_values(row, TC_COLUMNS) for row in tc_df.to_dict('records')))
+            _log_changes(conn, baseline_events(students_df, tc_df))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         ('migrated_from_csv', source))
+
+    def changes(self, after=0, limit=None):
+        # The primary key index finds the first event after the cursor
+        rows = self._conn().execute(
+            "SELECT seq, time, op, student FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (int(after), -1 if limit is None else int(limit))).fetchall()
+        return changes_frame({'seq': seq, 'time': time, 'op': op, 'student': json.loads(student)}
+                             for seq, time, op, student in rows)
+
+    def last_change(self):
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def data_version(self):
+        # Every write through the app logs a change; the file's own version
+        # catches edits made with other SQLite tools once checkpointed
+        return self.last_change(), _file_version(self.path)
+
+    def get_meta(self, key):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# One-shot import of admission_data.csv / tc_records.csv (plus any pending
+# journal records) into an empty SQLite database.
+def migrate_csv_to_sqlite(backend, directory='.'):
+    if backend.get_meta('migrated_from_csv'):
+        return False
+    csv_files = [os.path.join(directory, f) for f in (DATA_FILE, TC_FILE)]
+    if not any(os.path.exists(f) for f in csv_files):
+        backend.set_meta('migrated_from_csv', 'nothing to migrate')
+        return False
+
+    # Read only: opening an AdmissionJournal would create the journal file
+    students_df, tc_df = read_journal_tables(directory)
+    backend.import_tables(students_df, tc_df, ', '.join(csv_files))
+    return True
+
+
+# (students_df, tc_df) stored in a directory, read without creating,
+# migrating or caching anything: the database is opened read-only (SQLite
+# may still add its -wal/-shm companions), CSV data is read with its
+# journal.  Before migration a SQLite directory holds only the CSV files.
+def read_tables(directory='.', kind=None):
+    kind = kind or os.environ.get(STORAGE_ENV, 'sqlite')
+    path = os.path.join(directory, DB_FILE)
+    if kind == 'sqlite' and os.path.exists(path):
+        conn = sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True)
+        try:
+            return _load_students(conn), _load_tc(conn)
+        finally:
+            conn.close()
+    return read_journal_tables(directory)
+
+
+# CSV remains the interchange format
+def export_csv(backend, directory='.'):
+    backend.load_students().to_csv(os.path.join(directory, DATA_FILE), index=False)
+    backend.load_tc().to_csv(os.path.join(directory, TC_FILE), index=False)
+
+
+def get_backend(kind=None, directory='.'):
+    kind = kind or os.environ.get(STORAGE_ENV, 'sqlite')
+    if kind == 'csv':
+        return CsvJournalBackend(directory)
+    if kind == 'sqlite':
+        backend = SqliteBackend(os.path.join(directory, DB_FILE))
+        migrate_csv_to_sqlite(backend, directory)
+        return backend
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Admission data storage tools")
+    parser.add_argument('command', choices=['migrate', 'export'],
+                        help="migrate: import the CSV files into SQLite; "
+                             "export: write the SQLite data back out as CSV")
+    parser.add_argument('--dir', default='.', help="Directory holding the data files")
+    args = parser.parse_args()
+
+    sqlite_backend = SqliteBackend(os.path.join(args.dir, DB_FILE))
+    if args.command == 'migrate':
+        if migrate_csv_to_sqlite(sqlite_backend, args.dir):
+            print(f"Imported CSV data into {sqlite_backend.path}")
+        else:
+            print("Nothing to migrate")
+    else:
+        export_csv(sqlite_backend, args.dir)
+        print(f"Exported {DATA_FILE} and {TC_FILE}")
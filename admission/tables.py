@@ -0,0 +1,39 @@
+# Server-side search, sort and pagination for the roster and TC tables.
+# Only the requested page is handed to st.dataframe; sorted orders are built
+# once per data generation and shared through the roster cache.
+
+from admission.name_index import normalize_name
+
+
+def sorted_view(roster, dataset, column, ascending=True):
+    return roster.cached(
+        dataset, f'sorted:{column}:{ascending}',
+        lambda df: df.sort_values(column, ascending=ascending, kind='stable', ignore_index=True))
+
+
+# Rows matching a name prefix, in the requested order.  The prefix is
+# normalized like the stored names ("  arjun  s" finds "ARJUN SURESH") and
+# answered with a binary search on the name-sorted view, so it does not
+# scan the table; without a search the cached sorted view is returned as is.
+def matching_rows(roster, dataset, search='', sort_by='Name', ascending=True):
+    search = normalize_name(search)
+    if not search:
+        return sorted_view(roster, dataset, sort_by, ascending)
+
+    by_name = sorted_view(roster, dataset, 'Name')
+    names = by_name['Name']
+    start = names.searchsorted(search, side='left')
+    end = names.searchsorted(search + '\U0010ffff', side='left')
+    matches = by_name.iloc[start:end]
+    if sort_by != 'Name' or not ascending:
+        matches = matches.sort_values(sort_by, ascending=ascending, kind='stable')
+    return matches
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+
+def page_of(rows, page, page_size):
+    first = (page - 1) * page_size
+    return rows.iloc[first:first + page_size]
@@ -0,0 +1,60 @@
+import pandas as pd
+
+# Bucket sizes, finest first: name -> (resample rule, approximate days)
+BUCKETS = {
+    'Day': ('D', 1),
+    'Week': ('W-MON', 7),
+    'Month': ('MS', 30.4),
+    'Quarter': ('QS', 91.3),
+    'Year': ('YS', 365.25),
+}
+# Most bars or points sent to the browser for one chart
+MAX_MARKS = 400
+
+
+# Finest bucket (not finer than ``finest``) that keeps ``series`` lines or
+# bar groups over [start, end] within max_marks
+def choose_bucket(start, end, series=1, finest='Day', max_marks=MAX_MARKS):
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    names = list(BUCKETS)
+    for name in names[names.index(finest):]:
+        if (days / BUCKETS[name][1] + 1) * max(series, 1) <= max_marks:
+            return name
+    return names[-1]
+
+
+def _window(daily_df, start, end):
+    dates = daily_df['Date_of_Admission']
+    return daily_df[(dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))]
+
+
+# Sums (Date_of_Admission, by, Count) rows into buckets.  Weeks start on
+# Monday and every bucket is labelled with its first day.
+def bucket_counts(daily_df, start, end, bucket, by='Stream'):
+    rule = BUCKETS[bucket][0]
+    window = _window(daily_df, start, end)
+    grouper = pd.Grouper(key='Date_of_Admission', freq=rule, label='left', closed='left')
+    counts = window.groupby([grouper, by], observed=True)['Count'].sum().reset_index()
+    return counts[counts['Count'] > 0].reset_index(drop=True)
+
+
+# Totals per bucket, including empty buckets inside the range
+def bucket_totals(daily_df, start, end, bucket):
+    rule = BUCKETS[bucket][0]
+    window = _window(daily_df, start, end)
+    totals = (window.set_index('Date_of_Admission')['Count']
+              .resample(rule, label='left', closed='left').sum())
+    return totals.rename('Total').reset_index()
+
+
+# Display labels, formatted once per bucket rather than once per row
+def bucket_labels(dates, bucket):
+    if bucket == 'Day':
+        return dates.dt.strftime('%Y-%m-%d')
+    if bucket == 'Week':
+        return 'Week of ' + dates.dt.strftime('%d %b %Y')
+    if bucket == 'Month':
+        return dates.dt.strftime('%b %Y')
+    if bucket == 'Quarter':
+        return dates.dt.year.astype(str) + ' Q' + dates.dt.quarter.astype(str)
+    return dates.dt.strftime('%Y')
@@ -0,0 +1,263 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from admission.constants import (CASTES, SECOND_LANGUAGES, STATUS_OPTIONS, STREAMS,
+                                 STUDENT_COLUMNS, STUDENT_KEY)
+from admission.name_index import normalize_names
+from admission.schema import DATE_COLUMNS, DATE_FORMAT
+
+REQUIRED_COLUMNS = ['Name', 'Rank', 'Stream', 'Second_Language', 'Caste', 'Admission_Status']
+TC_LIST_COLUMNS = ['Name', 'Stream', 'Rank']
+APPLICANT_COLUMNS = ['Name', 'Rank', 'Caste', 'Second_Language', 'Preferences']
+ALLOWED_VALUES = {
+    'Stream': STREAMS,
+    'Second_Language': SECOND_LANGUAGES,
+    'Caste': CASTES,
+    'Admission_Status': STATUS_OPTIONS,
+}
+
+
+class ImportFormatError(ValueError):
+    # The upload cannot be validated at all (unreadable, missing columns)
+    pass
+
+
+# Other headers seen on allotment lists
+HEADER_ALIASES = {
+    'student_name': 'Name',
+    'language': 'Second_Language',
+    'status': 'Admission_Status',
+    'date': 'Date_of_Admission',
+    'reason': 'TC_Reason',
+    'options': 'Preferences',
+    'choices': 'Preferences',
+    'stream_preferences': 'Preferences',
+}
+
+
+def _header_key(column):
+    return str(column).strip().lower().replace(' ', '_')
+
+
+# Allotment lists come with headers like "Second Language" or "RANK"; map
+# them onto the roster columns and drop everything else.
+def normalize_columns(df, required=REQUIRED_COLUMNS):
+    known = {_header_key(c): c for c in STUDENT_COLUMNS + ['TC_Reason'] + list(required)}
+    known.update(HEADER_ALIASES)
+    renamed = {c: known[_header_key(c)] for c in df.columns if _header_key(c) in known}
+    df = df.rename(columns=renamed)[list(dict.fromkeys(renamed.values()))]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}")
+    return df
+
+
+def read_upload(uploaded_file, required=REQUIRED_COLUMNS):
+    name = uploaded_file.name.lower()
+    if name.endswith('.csv'):
+        df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+    elif name.endswith('.xlsx'):
+        df = pd.read_excel(uploaded_file, dtype=str).fillna('')
+    else:
+        raise ImportFormatError("Upload a .csv or .xlsx file")
+    return normalize_columns(df, required)
+
+
+# Validates an allotment list in bulk.  Every check is a vectorized
+# operation over whole columns; duplicates against the roster are found with
+# a hash lookup (Index.isin) instead of scanning the roster per row, so
+# existing_names must already be normalized (see name_index.normalize_names).
+#
+# Returns (valid_df, errors_df).  errors_df has one row per rejected input
+# row: its spreadsheet row number, the name and all problems found.
+def validate_admissions(df, existing_names, today=None):
+    df = normalize_columns(df).reset_index(drop=True)
+    today = today or datetime.date.today().strftime(DATE_FORMAT)
+
+    clean = pd.DataFrame(index=df.index)
+    clean['Name'] = normalize_names(df['Name'])
+    clean['Rank'] = pd.to_numeric(df['Rank'], errors='coerce')
+    for column in ALLOWED_VALUES:
+        clean[column] = df[column].fillna('').astype(str).str.strip().str.upper()
+    if 'Date_of_Admission' in df.columns:
+        dates = df['Date_of_Admission'].fillna('').astype(str).str.strip()
+        dates = dates.mask(dates == '', today)
+    else:
+        dates = pd.Series(today, index=df.index)
+    parsed_dates = pd.to_datetime(dates, format=DATE_FORMAT, errors='coerce')
+    clean['Date_of_Admission'] = parsed_dates.dt.strftime(DATE_FORMAT)
+
+    problems = [
+        (clean['Name'] == '', "name is empty"),
+        (clean['Rank'].isna() | (clean['Rank'] < 1) | (clean['Rank'] % 1 != 0),
+         "rank must be a whole number of at least 1"),
+        (parsed_dates.isna(), "date of admission must be YYYY-MM-DD"),
+    ]
+    for column, allowed in ALLOWED_VALUES.items():
+        problems.append((~clean[column].isin(allowed),
+                         f"{column.replace('_', ' ').lower()} must be one of {', '.join(allowed)}"))
+    named = clean['Name'] != ''
+    problems.append((named & pd.Index(clean['Name']).isin(pd.Index(existing_names)),
+                     "already admitted"))
+    problems.append((named & clean['Name'].duplicated(keep='first'),
+                     "appears more than once in the file"))
+
+    valid, errors = _split_errors(clean, problems)
+    return valid[STUDENT_COLUMNS].reset_index(drop=True), errors
+
+
+# Splits rows into (valid, errors) given (mask, message) pairs
+def _split_errors(clean, problems):
+    messages = [pd.Series(message, index=mask[mask].index) for mask, message in problems
+                if mask.any()]
+    if messages:
+        all_messages = pd.concat(messages)
+        joined = all_messages.groupby(level=0).agg('; '.join)
+    else:
+        joined = pd.Series(dtype=object)
+
+    errors = pd.DataFrame({
+        'Row': joined.index + 2,  # header is row 1
+        'Name': clean.loc[joined.index, 'Name'].values,
+        'Error': joined.values,
+    })
+    valid = clean.drop(index=joined.index)
+    valid['Rank'] = valid['Rank'].astype(int)
+    return valid, errors
+
+
+# The columns below have few distinct values, so each distinct value is
+# cleaned once and the factorize codes map the results back onto the rows
+# (missing values have code -1, which picks the appended last entry).
+
+# Trimmed, upper-cased values as a Categorical of the allowed values, NaN
+# where the value is not allowed
+def _allowed_values(values, allowed):
+    codes, uniques = pd.factorize(values)
+    cleaned = pd.Index(uniques).astype(str).str.strip().str.upper()
+    positions = np.append(pd.Index(allowed).get_indexer(cleaned), -1)
+    return pd.Categorical.from_codes(positions[codes], categories=allowed)
+
+
+# (datetime64 Series, mask of rows that are neither blank nor YYYY-MM-DD)
+def _dates(values):
+    codes, uniques = pd.factorize(values)
+    text = pd.Index(uniques).astype(str).str.strip()
+    parsed = pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+    invalid = np.append((text != '') & parsed.isna(), False)
+    dates = np.append(parsed.to_numpy(), np.datetime64('NaT'))
+    return pd.Series(dates[codes], index=values.index), pd.Series(invalid[codes], index=values.index)
+
+
+# Later copies of a student key.  Rank and stream nearly always tell
+# students apart, so they are hashed as one integer (stream codes are -1..3)
+# and names are compared only among rows sharing both.
+def _duplicate_keys(clean):
+    ranks = np.nan_to_num(clean['Rank'].to_numpy(dtype=float), nan=-1).astype(np.int64)
+    pairs = ranks * 8 + clean['Stream'].cat.codes.to_numpy() + 1
+    shared = pd.Series(pairs, index=clean.index).duplicated(keep=False)
+    duplicated = pd.Series(False, index=clean.index)
+    if shared.any():
+        duplicated[shared] = clean.loc[shared, STUDENT_KEY].duplicated(keep='first')
+    return duplicated
+
+
+# Cleans the roster (or TC register) as it comes out of storage, where
+# hand-edited CSV files may have left "APIN " for "APIN", "cs" for "CS" or
+# castes that are not in the list.  Names are normalized, the
+# constant-backed columns trimmed and upper-cased, ranks and dates parsed,
+# each as one operation over the whole column.  Rows that still break the
+# rules are quarantined instead of loaded: the == filters of the pages
+# would never match them.  Students are unique by (Name, Stream, Rank);
+# later copies are quarantined.  Blank dates are allowed.
+#
+# Returns (clean_df, quarantine_df).  clean_df keeps the input's index;
+# quarantine_df has the spreadsheet row, the problems and the row as stored.
+def validate_roster(df, unique=True):
+    stored = df.reset_index(drop=True)
+    # Columns are replaced, never modified, so the stored ones are shared
+    clean = {column: stored[column] for column in stored.columns}
+    for column in STUDENT_COLUMNS:
+        if column not in clean:
+            clean[column] = pd.Series(None, index=stored.index, dtype=object)
+    clean['Name'] = normalize_names(clean['Name'])
+    clean['Rank'] = pd.to_numeric(clean['Rank'], errors='coerce')
+
+    problems = [
+        (clean['Name'] == '', "name is empty"),
+        (clean['Rank'].isna() | (clean['Rank'] < 1) | (clean['Rank'] % 1 != 0),
+         "rank must be a whole number of at least 1"),
+    ]
+    for column, allowed in ALLOWED_VALUES.items():
+        clean[column] = pd.Series(_allowed_values(clean[column], allowed), index=stored.index)
+        problems.append((clean[column].isna(),
+                         f"{column.replace('_', ' ').lower()} must be one of {', '.join(allowed)}"))
+    for column in DATE_COLUMNS:
+        if column in clean:
+            clean[column], invalid = _dates(clean[column])
+            problems.append((invalid, f"{column.replace('_', ' ').lower()} must be YYYY-MM-DD"))
+    clean = pd.DataFrame(clean, copy=False)
+    if unique:
+        problems.append((_duplicate_keys(clean), "appears more than once"))
+
+    valid, errors = _split_errors(clean, problems)
+    quarantine = pd.concat([errors[['Row', 'Error']],
+                            stored.iloc[errors['Row'] - 2].reset_index(drop=True)], axis=1)
+    return valid.set_axis(df.index[valid.index]), quarantine
+
+
+# Validates an applicant list for seat allocation.  Preferences holds the
+# streams in order of choice, separated by commas, semicolons or spaces
+# ("CS, BIO, COM"); it comes back as a list per applicant.  Applicants
+# already on the roster (existing_names, normalized) are rejected.
+def validate_applicants(df, existing_names):
+    df = normalize_columns(df, APPLICANT_COLUMNS).reset_index(drop=True)
+    clean = pd.DataFrame(index=df.index)
+    clean['Name'] = normalize_names(df['Name'])
+    clean['Rank'] = pd.to_numeric(df['Rank'], errors='coerce')
+    for column in ('Caste', 'Second_Language'):
+        clean[column] = df[column].fillna('').astype(str).str.strip().str.upper()
+    choices = df['Preferences'].fillna('').astype(str).str.upper().str.findall(r'[A-Z]+')
+    clean['Preferences'] = choices.map(lambda streams: list(dict.fromkeys(streams)))
+
+    listed = clean['Preferences'].explode()
+    unknown = (listed.notna() & ~listed.isin(STREAMS)).groupby(level=0).any()
+    named = clean['Name'] != ''
+    problems = [
+        (~named, "name is empty"),
+        (clean['Rank'].isna() | (clean['Rank'] < 1) | (clean['Rank'] % 1 != 0),
+         "rank must be a whole number of at least 1"),
+        (~clean['Caste'].isin(CASTES), f"caste must be one of {', '.join(CASTES)}"),
+        (~clean['Second_Language'].isin(SECOND_LANGUAGES),
+         f"second language must be one of {', '.join(SECOND_LANGUAGES)}"),
+        (clean['Preferences'].str.len() == 0, "no stream preferences given"),
+        (unknown, f"preferences must be streams from {', '.join(STREAMS)}"),
+        (named & pd.Index(clean['Name']).isin(pd.Index(existing_names)), "already admitted"),
+        (named & clean['Name'].duplicated(keep='first'), "appears more than once in the file"),
+    ]
+    valid, errors = _split_errors(clean, problems)
+    return valid.reset_index(drop=True), errors
+
+
+# Cleans a list of students to issue TCs for (Name, Stream, Rank and an
+# optional TC_Reason).  Returns (requests_df, errors_df) like
+# validate_admissions, except that requests_df keeps the input row positions
+# so the caller can report rows that turn out not to be on the roster.
+def validate_tc_list(df):
+    df = normalize_columns(df, TC_LIST_COLUMNS).reset_index(drop=True)
+    clean = pd.DataFrame(index=df.index)
+    clean['Name'] = normalize_names(df['Name'])
+    clean['Stream'] = df['Stream'].fillna('').astype(str).str.strip().str.upper()
+    clean['Rank'] = pd.to_numeric(df['Rank'], errors='coerce')
+    if 'TC_Reason' in df.columns:
+        clean['TC_Reason'] = df['TC_Reason'].fillna('').astype(str).str.strip()
+
+    problems = [
+        (clean['Name'] == '', "name is empty"),
+        (clean['Rank'].isna() | (clean['Rank'] % 1 != 0), "rank must be a whole number"),
+        (~clean['Stream'].isin(STREAMS), f"stream must be one of {', '.join(STREAMS)}"),
+        (clean.duplicated(TC_LIST_COLUMNS, keep='first'), "appears more than once in the file"),
+    ]
+    return _split_errors(clean, problems)
@@ -0,0 +1,205 @@
+# Headless timings of every page and write path of the Streamlit app on
+# synthetic rosters, emitted as JSON so runs can be compared across versions.
+#
+#   python benchmarks/bench_app.py --rows 1000 10000 100000 --output new.json
+#   python benchmarks/bench_app.py --compare old.json new.json
+#
+# Each case is timed as the wall-clock time of the AppTest script run it
+# triggers (or of the export call), repeated --repeat times.
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admission.constants import STREAMS  # noqa: E402
+from admission.exports import FORMATS, serialize  # noqa: E402
+from admission.storage import get_backend  # noqa: E402
+from synthetic import write_dataset  # noqa: E402
+
+APP = os.path.join(ROOT, 'streamlit admission_app.py')
+ANALYSIS_TABS = ["Stream Distribution", "Admission Status", "Caste Distribution",
+                 "Second Language", "Date-wise Analysis", "Year-wise Comparison"]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _run(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _roster_size(directory):
+    backend = get_backend(directory=directory)
+    try:
+        return len(backend.load_students())
+    finally:
+        backend.close()
+
+
+def _open_app(page=None):
+    at = AppTest.from_file(APP, default_timeout=600)
+    _run(at)
+    if page:
+        at.sidebar.radio[0].set_value(page)
+        _run(at)
+    return at
+
+
+def bench_size(rows, repeat, seed):
+    directory = tempfile.mkdtemp(prefix=f'admission-bench-{rows}-')
+    previous = os.getcwd()
+    students_df, _ = write_dataset(directory, rows, seed)
+    os.chdir(directory)
+    # Every size gets its own roster: drop the service cached by the last one
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    timings = {}
+
+    def record(case, fn):
+        timings.setdefault(case, []).append(_timed(fn))
+
+    try:
+        for i in range(repeat):
+            st.cache_resource.clear()
+            at = AppTest.from_file(APP, default_timeout=600)
+            record('startup', lambda: _run(at))
+
+        # Names of random letters, so no submit is held back as looking like
+        # a student already on the roster
+        letters = random.Random(seed)
+        names = [' '.join(''.join(letters.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=8))
+                          for _ in range(2)) for _ in range(repeat)]
+        admitted = _roster_size(directory)
+        at = _open_app()
+        for name in names:
+            at.text_input[0].input(name)
+            _button(at, 'Submit').click()
+            record('admission_submit', lambda: _run(at))
+        if _roster_size(directory) != admitted + repeat:
+            raise RuntimeError(f"Expected {repeat} admissions, the roster grew by "
+                               f"{_roster_size(directory) - admitted}")
+
+        at = _open_app("TC Issuance")
+        for student in students_df.head(repeat).itertuples():
+            at.text_input(key='tc_name').input(student.Name)
+            at.selectbox(key='tc_stream').set_value(student.Stream)
+            at.number_input(key='tc_rank').set_value(int(student.Rank))
+            _button(at, 'Issue TC').click()
+            record('tc_issue', lambda: _run(at))
+
+        at = _open_app("Stream-wise View")
+        for i in range(repeat):
+            for stream in STREAMS:
+                at.radio(key='stream_tab').set_value(stream)
+                record(f'stream_view:{stream}', lambda: _run(at))
+
+        at = _open_app("Data Analysis")
+        for i in range(repeat):
+            for tab in ANALYSIS_TABS:
+                at.radio(key='analysis_tab').set_value(tab)
+                record(f'analysis:{tab}', lambda: _run(at))
+
+        # Download buttons serialize lazily in the browser round trip, which
+        # AppTest does not perform; time the serialization itself.
+        backend = get_backend(directory=directory)
+        frames = {'students': backend.load_students(), 'tc': backend.load_tc()}
+        backend.close()
+        for i in range(repeat):
+            for dataset, frame in frames.items():
+                for fmt in FORMATS:
+                    record(f'export:{dataset}:{fmt}', lambda: serialize(frame, fmt))
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return [{'rows': rows, 'case': case, 'median_ms': round(statistics.median(runs), 2),
+             'min_ms': round(min(runs), 2), 'runs_ms': [round(r, 2) for r in runs]}
+            for case, runs in timings.items()]
+
+
+def _git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, seed):
+    results = []
+    for rows in sizes:
+        print(f"benchmarking {rows:,} rows...", file=sys.stderr)
+        results.extend(bench_size(rows, repeat, seed))
+    return {
+        'version': _git_version(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'streamlit': st.__version__,
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+
+
+# Median of each case in new relative to old; > 1 means slower
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r['rows'], r['case']): r['median_ms'] for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = {(r['rows'], r['case']): r['median_ms'] for r in json.load(f)['results']}
+    print(f"{'rows':>9}  {'case':40}{'old ms':>10}{'new ms':>10}{'ratio':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float('inf')
+        print(f"{key[0]:>9,}  {key[1]:40}{old[key]:10.1f}{new[key]:10.1f}{ratio:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the admission app headlessly")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Compare two result files instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = run(args.rows, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# Timings of the load-time pipeline that cleans the stored roster
+# (admission.loading), on synthetic rosters with a share of hand-edit
+# damage: padded or lower-case names, lower-case streams, unknown castes
+# and bad dates.
+#
+#   python benchmarks/bench_load.py --rows 10000 1000000 --output new.json
+#   python benchmarks/bench_load.py --compare old.json new.json
+#
+# validate     validate_roster on the roster as read from storage
+# load         load_clean without the cache file (read, validate, enforce)
+# cached_load  load_clean when the cache file matches the data
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from bench_app import _git_version, compare
+from synthetic import write_dataset
+
+from admission.loading import load_clean
+from admission.storage import get_backend
+from admission.validation import validate_roster
+
+
+def _damage(students_df, share, seed):
+    damaged = students_df.sample(frac=share, random_state=seed).index
+    quarter = len(damaged) // 4
+    students_df.loc[damaged[:quarter], 'Name'] = students_df.loc[damaged[:quarter], 'Name'] + ' '
+    students_df.loc[damaged[quarter:2 * quarter], 'Stream'] = (
+        students_df.loc[damaged[quarter:2 * quarter], 'Stream'].str.lower())
+    students_df.loc[damaged[2 * quarter:3 * quarter], 'Caste'] = 'UNKNOWN'
+    students_df.loc[damaged[3 * quarter:], 'Date_of_Admission'] = '12/06/2025'
+    return students_df
+
+
+def _timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return runs
+
+
+def bench(rows, repeat, seed, share):
+    directory = tempfile.mkdtemp(prefix=f'admission-load-{rows}-')
+    try:
+        students_df, _ = write_dataset(directory, rows, seed, backend='csv')
+        students_df = _damage(students_df, share, seed)
+        students_df.to_csv(f"{directory}/admission_data.csv", index=False)
+        backend = get_backend('sqlite', directory)
+        try:
+            stored_df = backend.load_students()
+            timings = {
+                'validate': _timed(lambda: validate_roster(stored_df), repeat),
+                'load': _timed(lambda: load_clean(backend, cache=False), repeat),
+            }
+            load_clean(backend)
+            timings['cached_load'] = _timed(lambda: load_clean(backend), repeat)
+        finally:
+            backend.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return [{'rows': rows, 'case': case, 'median_ms': round(statistics.median(runs), 2),
+             'min_ms': round(min(runs), 2), 'runs_ms': [round(r, 2) for r in runs]}
+            for case, runs in timings.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the roster's load-time validation")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--damaged', type=float, default=0.01,
+                        help="Share of rows given hand-edit damage")
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Compare two result files instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = []
+    for rows in args.rows:
+        print(f"benchmarking load with {rows:,} rows...", file=sys.stderr)
+        results.extend(bench(rows, args.repeat, args.seed, args.damaged))
+    report = {'version': _git_version(), 'python': sys.version.split()[0],
+              'repeat': args.repeat, 'seed': args.seed, 'damaged': args.damaged,
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Memory and groupby speed of the raw CSV roster versus the typed roster
+# produced by admission.schema.enforce_schema.
+#
+#   python benchmarks/bench_schema.py --rows 200000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission.constants import CASTES, SECOND_LANGUAGES, STATUS_OPTIONS, STREAMS  # noqa: E402
+from admission.schema import enforce_schema  # noqa: E402
+
+
+def raw_roster(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2025-04-01', periods=90).strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'Name': [f'STUDENT {i}' for i in range(rows)],
+        'Rank': rng.permutation(rows) + 1,
+        'Stream': rng.choice(STREAMS, rows),
+        'Second_Language': rng.choice(SECOND_LANGUAGES, rows),
+        'Caste': rng.choice(CASTES, rows),
+        'Admission_Status': rng.choice(STATUS_OPTIONS, rows),
+        'Date_of_Admission': rng.choice(dates, rows),
+    })
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def daily_counts_raw(df):
+    # What the Date-wise tab did on every render
+    date_df = df.copy()
+    date_df['Date_of_Admission'] = pd.to_datetime(date_df['Date_of_Admission'])
+    return date_df.groupby(['Date_of_Admission', 'Stream']).size()
+
+
+def daily_counts_typed(df):
+    return df.groupby(['Date_of_Admission', 'Stream'], observed=True).size()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the raw CSV roster against the typed roster")
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    raw = raw_roster(args.rows)
+    typed = enforce_schema(raw)
+
+    print(f"{args.rows:,} students")
+    print(f"{'':32}{'raw':>12}{'typed':>12}")
+    raw_mb = raw.memory_usage(deep=True).sum() / 2**20
+    typed_mb = typed.memory_usage(deep=True).sum() / 2**20
+    print(f"{'memory (MiB)':32}{raw_mb:12.1f}{typed_mb:12.1f}")
+
+    cases = [
+        ('stream x status groupby (ms)',
+         lambda: raw.groupby(['Stream', 'Admission_Status']).size(),
+         lambda: typed.groupby(['Stream', 'Admission_Status'], observed=True).size()),
+        ('caste value_counts (ms)',
+         lambda: raw['Caste'].value_counts(),
+         lambda: typed['Caste'].value_counts()),
+        ('stream filter + rank sort (ms)',
+         lambda: raw[raw['Stream'] == 'CS'].sort_values('Rank'),
+         lambda: typed[typed['Stream'] == 'CS'].sort_values('Rank')),
+        ('date x stream counts (ms)',
+         lambda: daily_counts_raw(raw),
+         lambda: daily_counts_typed(typed)),
+    ]
+    for label, raw_fn, typed_fn in cases:
+        print(f"{label:32}{best_of(raw_fn):12.1f}{best_of(typed_fn):12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Cold-start timings of the Streamlit app: how long the script's imports
+# take and how long the first page takes to render, each in a fresh Python
+# process (nothing imported or cached yet), as on a server's first visitor.
+#
+#   python benchmarks/bench_startup.py --rows 10000 --output new.json
+#   python benchmarks/bench_startup.py --compare old.json new.json
+#
+# imports_ms   executing the script's top-level import statements
+# first_run_ms the first AppTest run of the script (imports, roster load and
+#              the New Admission page)
+# rerun_ms     the run after that, as seen by every later interaction
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from bench_app import APP, ROOT, _git_version, compare
+from synthetic import write_dataset
+
+# Runs in the child process; prints one JSON object
+CHILD = r'''
+import ast, json, os, sys, time
+sys.path.insert(0, {root!r})
+app, mode = {app!r}, {mode!r}
+if mode == 'imports':
+    tree = ast.parse(open(app, encoding='utf-8').read())
+    imports = ast.Module([node for node in tree.body
+                          if isinstance(node, (ast.Import, ast.ImportFrom))], [])
+    code = compile(imports, app, 'exec')
+    start = time.perf_counter()
+    exec(code, {{}})
+    print(json.dumps({{'imports_ms': (time.perf_counter() - start) * 1000}}))
+else:
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    harness_ms = (time.perf_counter() - start) * 1000
+    at = AppTest.from_file(app, default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise SystemExit(at.exception[0].message)
+    start = time.perf_counter()
+    at.run()
+    rerun = (time.perf_counter() - start) * 1000
+    print(json.dumps({{'first_run_ms': first, 'rerun_ms': rerun, 'harness_ms': harness_ms}}))
+'''
+
+
+def _child(mode, directory):
+    code = CHILD.format(root=ROOT, app=APP, mode=mode)
+    result = subprocess.run([sys.executable, '-c', code], cwd=directory, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench(rows, repeat, seed):
+    directory = tempfile.mkdtemp(prefix=f'admission-startup-{rows}-')
+    timings = {}
+    try:
+        write_dataset(directory, rows, seed)
+        for _ in range(repeat):
+            for mode in ('imports', 'render'):
+                for case, ms in _child(mode, directory).items():
+                    if case != 'harness_ms':
+                        timings.setdefault(case, []).append(ms)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return [{'rows': rows, 'case': case, 'median_ms': round(statistics.median(runs), 2),
+             'min_ms': round(min(runs), 2), 'runs_ms': [round(r, 2) for r in runs]}
+            for case, runs in timings.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's cold start")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Compare two result files instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = []
+    for rows in args.rows:
+        print(f"benchmarking cold start with {rows:,} rows...", file=sys.stderr)
+        results.extend(bench(rows, args.repeat, args.seed))
+    report = {'version': _git_version(), 'python': sys.version.split()[0],
+              'repeat': args.repeat, 'seed': args.seed, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
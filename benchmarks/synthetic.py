@@ -0,0 +1,131 @@
+# Seeded synthetic rosters and TC histories for benchmarks and load tests.
+#
+#   python benchmarks/synthetic.py --rows 100000 --dir /tmp/admission-100k
+#
+# writes admission_data.csv and tc_records.csv there (and admission.db with
+# --backend sqlite), so the app can be started against it with
+#   cd /tmp/admission-100k && streamlit run /path/to/"streamlit admission_app.py"
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission.constants import (CASTES, SECOND_LANGUAGES, STATUS_OPTIONS,  # noqa: E402
+                                 STREAMS, STUDENT_COLUMNS)
+from admission.storage import get_backend  # noqa: E402
+
+FIRST_NAMES = [
+    'AARAV', 'ABHINAV', 'ADHIL', 'ADITHYA', 'AISWARYA', 'AKHIL', 'ALEENA', 'AMAL', 'AMRITHA',
+    'ANAGHA', 'ANANDU', 'ANJALI', 'ANN', 'ANUSREE', 'APARNA', 'ARJUN', 'ASWIN', 'ATHIRA',
+    'BASIL', 'BHAGYA', 'CHRISTY', 'DEVANANDA', 'DEVIKA', 'DIYA', 'FATHIMA', 'GAUTHAM', 'GOPIKA',
+    'HARIKRISHNAN', 'HRIDYA', 'JISHNU', 'JOEL', 'KAVYA', 'KRISHNA', 'LAKSHMI', 'MEERA', 'MIDHUN',
+    'MUHAMMED', 'NANDANA', 'NAVANEETH', 'NIDHA', 'NIKHIL', 'NIVEDYA', 'RAHUL', 'RIYA', 'SANIKA',
+    'SANJAY', 'SHIFANA', 'SIDHARTH', 'SNEHA', 'SREELAKSHMI', 'SREYA', 'VAISHNAV', 'VISHNU',
+]
+FATHER_NAMES = [
+    'ABDUL', 'AJAYAN', 'ANIL', 'ANTONY', 'ASHRAF', 'BABU', 'BIJU', 'DINESH', 'GEORGE', 'GIREESH',
+    'HARIDAS', 'JAMES', 'JOSE', 'KRISHNAN', 'MANOJ', 'MOHANAN', 'MURALI', 'NASAR', 'PRADEEP',
+    'RAJAN', 'RAJESH', 'RAMESH', 'SAJEEV', 'SANTHOSH', 'SHAJI', 'SHIBU', 'SUNIL', 'SURESH',
+    'THOMAS', 'UNNIKRISHNAN', 'VARGHESE', 'VINOD',
+]
+INITIALS = [chr(c) for c in range(ord('A'), ord('Z') + 1)]
+
+# Shares seen in a typical Plus One intake; the remainder is spread evenly
+STREAM_WEIGHTS = {'BIO': 0.30, 'CS': 0.25, 'HUM': 0.20, 'COM': 0.25}
+LANGUAGE_WEIGHTS = {'MAL': 0.60, 'HIN': 0.30, 'SKT': 0.10}
+CASTE_WEIGHTS = {'GEN': 0.35, 'ETB': 0.14, 'MUSLIM': 0.14, 'SC': 0.10, 'ST': 0.04}
+STATUS_WEIGHTS = {'PERMANENT': 0.85, 'TEMPORARY': 0.15}
+TC_REASONS = ['', '', 'Joined another school', 'Changed stream elsewhere', 'Family relocation',
+              'Joined ITI / polytechnic', 'Personal reasons']
+
+
+def _weights(values, shares):
+    rest = [v for v in values if v not in shares]
+    left = max(0.0, 1.0 - sum(shares.values()))
+    weights = np.array([shares.get(v, left / len(rest) if rest else 0.0) for v in values])
+    return weights / weights.sum()
+
+
+# Distinct names like "ARJUN SURESH K M", drawn without replacement
+def _names(rows, rng):
+    parts = [FIRST_NAMES, FATHER_NAMES, INITIALS, INITIALS]
+    capacity = int(np.prod([len(p) for p in parts]))
+    if rows > capacity:
+        raise ValueError(f"At most {capacity:,} distinct names can be generated")
+    codes = rng.choice(capacity, size=rows, replace=False)
+    pieces = []
+    for part in reversed(parts):
+        codes, index = np.divmod(codes, len(part))
+        pieces.append(np.asarray(part, dtype=object)[index])
+    first, father, initial1, initial2 = reversed(pieces)
+    return first + ' ' + father + ' ' + initial1 + ' ' + initial2
+
+
+# Admission dates over the admission window: most students join in the
+# first weeks, with a long tail of late admissions
+def _dates(rows, rng, start, days):
+    offsets = np.minimum(rng.exponential(days / 4, rows).astype(int), days - 1)
+    return (pd.Timestamp(start) + pd.to_timedelta(offsets, unit='D')).strftime('%Y-%m-%d')
+
+
+def generate_roster(rows, seed=0, start='2025-06-02', days=90):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Name': _names(rows, rng),
+        'Rank': rng.permutation(rows) + 1,
+        'Stream': rng.choice(STREAMS, rows, p=_weights(STREAMS, STREAM_WEIGHTS)),
+        'Second_Language': rng.choice(SECOND_LANGUAGES, rows,
+                                      p=_weights(SECOND_LANGUAGES, LANGUAGE_WEIGHTS)),
+        'Caste': rng.choice(CASTES, rows, p=_weights(CASTES, CASTE_WEIGHTS)),
+        'Admission_Status': rng.choice(STATUS_OPTIONS, rows,
+                                       p=_weights(STATUS_OPTIONS, STATUS_WEIGHTS)),
+        'Date_of_Admission': _dates(rows, rng, start, days),
+    })[STUDENT_COLUMNS]
+
+
+# Splits a generated roster into (students, tc_records): tc_fraction of the
+# students left, some time after they were admitted
+def generate_tc(roster_df, tc_fraction=0.03, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    left = rng.random(len(roster_df)) < tc_fraction
+    tc_df = roster_df[left].reset_index(drop=True)
+    admitted = pd.to_datetime(tc_df['Date_of_Admission'])
+    tc_df['TC_Date'] = (admitted + pd.to_timedelta(rng.integers(1, 120, len(tc_df)), unit='D')
+                        ).dt.strftime('%Y-%m-%d')
+    tc_df['TC_Reason'] = rng.choice(TC_REASONS, len(tc_df))
+    return roster_df[~left].reset_index(drop=True), tc_df
+
+
+# Writes a dataset the app can be started on.  With backend='sqlite' the
+# CSV files are also imported into admission.db.
+def write_dataset(directory, rows, seed=0, tc_fraction=0.03, backend='sqlite'):
+    os.makedirs(directory, exist_ok=True)
+    students_df, tc_df = generate_tc(generate_roster(rows, seed), tc_fraction, seed)
+    students_df.to_csv(os.path.join(directory, 'admission_data.csv'), index=False)
+    tc_df.to_csv(os.path.join(directory, 'tc_records.csv'), index=False)
+    if backend == 'sqlite':
+        get_backend('sqlite', directory).close()
+    return students_df, tc_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic admission dataset")
+    parser.add_argument('--rows', type=int, default=10_000,
+                        help="Students generated, including those who later left")
+    parser.add_argument('--dir', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tc-fraction', type=float, default=0.03)
+    parser.add_argument('--backend', choices=['sqlite', 'csv'], default='sqlite')
+    args = parser.parse_args()
+
+    students_df, tc_df = write_dataset(args.dir, args.rows, args.seed, args.tc_fraction,
+                                       args.backend)
+    print(f"{len(students_df):,} students and {len(tc_df):,} TC records in {args.dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,29 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import matplotlib.pyplot as plt
+import time
+import functools
 import os
-import altair as alt
-from PIL import Image
-import io
-import base64
+# Charting (altair) and imaging (PIL) libraries are imported inside the
+# functions that draw charts or certificates, so a page only pays for the
+# libraries it uses
+from admission.allocation import DEFAULT_RESERVATION, allot_seats
+from admission.changes import FORMATS as CHANGE_FORMATS
+from admission.changes import file_name as changes_file_name, serialize as serialize_changes
+from admission.constants import (CASTES, SECOND_LANGUAGES, STATUS_OPTIONS, STREAMS, STUDENT_COLUMNS,
+                                 STUDENT_KEY)
+from admission.roster import DuplicateStudentError, StudentNotFoundError
+from admission.exports import FORMATS, export_bytes, file_name, mime_type
+from admission.name_index import normalize_name
+from admission.partitions import DEFAULT_SCHOOL, DEFAULT_YEAR, PartitionCatalog, school_key
+from admission.perf import recorder, span, timed
+from admission.tables import matching_rows, page_count, page_of
+from admission.timeseries import BUCKETS, MAX_MARKS, bucket_counts, bucket_labels, bucket_totals, choose_bucket
+from admission.validation import (APPLICANT_COLUMNS, TC_LIST_COLUMNS, ImportFormatError,
+                                  read_upload, validate_applicants, validate_tc_list)
+
+# Whole-run timer for the performance page
+run_started = time.perf_counter()
 
 # Configuration for the multi-page app
 st.set_page_config(
@@ -17,44 +34,76 @@ st.set_page_config(
 )
 
 # Constants
-SCHOOL_NAME = "GHSS CHERPU"
-ADMISSION_YEAR = 2025
-STREAMS = ["BIO", "CS", "HUM", "COM"]
-SECOND_LANGUAGES = ["MAL", "HIN", "SKT"]
-CASTES = ["GEN", "ETB", "MUSLIM", "SC", "LSA", "OBH", "DV", "VK", "KN", "KU", "ST", "OBCHRISTIAN"]
-STATUS_OPTIONS = ["PERMANENT", "TEMPORARY"]
-
-# Load or create the dataframe
-@st.cache_data
+# Optional logo printed on TC certificates (looked up in the school's
+# directory, then in the data directory)
+SCHOOL_LOGO = "school_logo.png"
+
+# Schools and admission years stored in the data directory, shared by every
+# session of this server process
+@st.cache_resource
+def get_catalog():
+    return PartitionCatalog()
+
+# Admission service (storage and roster) of the school and year picked in
+# this session; sessions that picked the same partition share it
+def get_service():
+    return get_catalog().service(st.session_state.school, st.session_state.admission_year)
+
+def get_roster():
+    return get_service().roster
+
+# HTTP API on ADMISSION_API_PORT, served by this process for the default
+# school and year, so API and app writes go through the same roster
+@st.cache_resource
+def start_api():
+    from admission.api import API_HOST_ENV, API_PORT_ENV, AdmissionAPI, serve_in_thread
+    port = os.environ.get(API_PORT_ENV)
+    if not port:
+        return None
+    service = get_catalog().service(DEFAULT_SCHOOL, DEFAULT_YEAR)
+    try:
+        return serve_in_thread(AdmissionAPI(service), os.environ.get(API_HOST_ENV, '127.0.0.1'),
+                               int(port))
+    except OSError as e:
+        # Cached like a started server, so the port is not retried every run
+        st.sidebar.warning(f"HTTP API not started: {e}")
+        return None
+
+# Latest dashboard tables, rebuilt in the background after writes
+def get_analytics():
+    return get_service().analytics.snapshot()
+
+# Current roster version and a read-only view of the students
+@timed('load_data')
 def load_data():
-    if os.path.exists('admission_data.csv'):
-        return pd.read_csv('admission_data.csv')
-    else:
-        columns = ['Name', 'Rank', 'Stream', 'Second_Language', 'Caste', 
-                 'Admission_Status', 'Date_of_Admission']
-        return pd.DataFrame(columns=columns)
-
-# Save data to CSV
-def save_data(df):
-    df.to_csv('admission_data.csv', index=False)
-    
-# Save TC records
-def save_tc_data(student_info):
-    tc_file = 'tc_records.csv'
-    today = datetime.date.today().strftime("%Y-%m-%d")
-    
-    # Add TC date
-    student_info['TC_Date'] = today
-    
-    # Check if file exists
-    if os.path.exists(tc_file):
-        tc_df = pd.read_csv(tc_file)
-        tc_df = pd.concat([tc_df, pd.DataFrame([student_info])])
-    else:
-        tc_df = pd.DataFrame([student_info])
+    return get_roster().snapshot()
+
+# Load TC records
+@timed('load_tc_data')
+def load_tc_data():
+    return get_roster().tc_snapshot()[1]
+
+# Save a newly admitted student
+@timed('save_data')
+def save_data(student):
+    st.session_state.roster_version = get_service().admit(student, st.session_state.rendered_version)
+    
+# Save a validated allotment list as one commit
+@timed('save_bulk_data')
+def save_bulk_data(students):
+    st.session_state.roster_version = get_service().admit_many(students, st.session_state.rendered_version)
     
-    # Save TC records
-    tc_df.to_csv(tc_file, index=False)
+# Issue a TC: removes the student and records the TC in one commit
+@timed('save_tc_data')
+def save_tc_data(name, stream, rank, reason=None):
+    st.session_state.roster_version = get_service().issue_tc(
+        name, stream, rank, reason, expected_version=st.session_state.rendered_version)
+
+# Issue TCs for a list of students (Name, Stream, Rank, TC_Reason) as one commit
+@timed('save_tc_batch')
+def save_tc_batch(requests_df):
+    st.session_state.roster_version = get_service().issue_tcs(
+        requests_df, expected_version=st.session_state.rendered_version)
 
 # Function to clear form fields
 def clear_form_fields():
@@ -66,6 +115,21 @@ def clear_form_fields():
     st.session_state.form_language = SECOND_LANGUAGES[0]
     st.session_state.form_caste = CASTES[0]
     st.session_state.form_status = STATUS_OPTIONS[0]
+    st.session_state.pop('admission_not_duplicate', None)
+
+# TC Issuance: copy the student picked from the name search into the TC form
+def fill_tc_form(choices):
+    picked = st.session_state.tc_pick
+    if picked is not None:
+        st.session_state.tc_name, st.session_state.tc_stream, st.session_state.tc_rank = choices[picked]
+
+# Header markup of a school and year, built once per process
+@functools.lru_cache(maxsize=None)
+def header_html(school, year):
+    return f"""
+        <h1 style="margin-bottom: 0px;">{school}</h1>
+        <h3 style="margin-top: 0px; color: #636363;">Admission Portal {year}</h3>
+        """
 
 # Custom header with school logo
 def display_header():
@@ -81,16 +145,732 @@ def display_header():
     
     # School name and title
     with col2:
-        st.markdown(f"""
-        <h1 style="margin-bottom: 0px;">{SCHOOL_NAME}</h1>
-        <h3 style="margin-top: 0px; color: #636363;">Admission Portal {ADMISSION_YEAR}</h3>
-        """, unsafe_allow_html=True)
+        st.markdown(header_html(st.session_state.school, st.session_state.admission_year),
+                    unsafe_allow_html=True)
     
     st.markdown("<hr>", unsafe_allow_html=True)
 
+# Seat Allocation: rank-ordered allotment of an applicant list
+@st.fragment
+@timed('seat_allocation')
+def render_seat_allocation():
+    if 'allocation_message' in st.session_state:
+        st.success(st.session_state.pop('allocation_message'))
+    
+    st.caption("Upload the applicant list with the columns Name, Rank, Caste, Second_Language and "
+               "Preferences (streams in order of choice, e.g. \"CS, BIO, COM\"). Students already "
+               "admitted keep their seats; to re-run a round after withdrawals, upload the list again.")
+    uploaded = st.file_uploader("Applicant list", type=['csv', 'xlsx'],
+                                key=f"applicants_upload_{st.session_state.get('applicants_upload_id', 0)}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Seats per stream**")
+        seats_df = st.data_editor(pd.DataFrame({'Stream': STREAMS, 'Seats': 50}),
+                                  key="allocation_seats", disabled=['Stream'], hide_index=True,
+                                  use_container_width=True)
+    with col2:
+        st.markdown("**Reservation (% of seats)**")
+        reservation_df = st.data_editor(
+            # Float column, so fractional percentages can be entered
+            pd.DataFrame({'Caste': list(DEFAULT_RESERVATION),
+                          'Percent': [float(p) for p in DEFAULT_RESERVATION.values()]}),
+            key="allocation_reservation", disabled=['Caste'], hide_index=True, use_container_width=True)
+    admission_status = st.selectbox("Admission status of allotted students", options=STATUS_OPTIONS,
+                                    key="allocation_status")
+    if uploaded is None:
+        return
+    
+    try:
+        applicants_df = read_upload(uploaded, APPLICANT_COLUMNS)
+        applicants_df, errors_df = validate_applicants(
+            applicants_df, get_service().existing_names(applicants_df['Name']))
+        allotment_df, summary_df = allot_seats(
+            applicants_df,
+            dict(zip(seats_df['Stream'], seats_df['Seats'].fillna(0))),
+            dict(zip(reservation_df['Caste'], reservation_df['Percent'].fillna(0))),
+            admitted_df=get_roster().snapshot()[1])
+    except ValueError as e:
+        st.error(str(e))
+        return
+    allotted = allotment_df[allotment_df['Allotted_Stream'].notna()].sort_values('Rank')
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Applicants", len(allotment_df))
+    with col2:
+        st.metric("Allotted", len(allotted))
+    with col3:
+        st.metric("Not allotted", len(allotment_df) - len(allotted))
+    with col4:
+        st.metric("Rejected rows", len(errors_df))
+    
+    if not errors_df.empty:
+        show_table(errors_df, use_container_width=True, hide_index=True)
+    
+    st.subheader("Seat Matrix")
+    show_table(summary_df, use_container_width=True, hide_index=True)
+    
+    if allotted.empty:
+        return
+    st.subheader("Allotment")
+    show_table(allotted.head(200), use_container_width=True, hide_index=True)
+    if len(allotted) > 200:
+        st.caption(f"Showing the 200 best-ranked of {len(allotted)} allotted applicants")
+    
+    if st.button(f"Admit {len(allotted)} allotted students", key="allocation_admit"):
+        students = pd.DataFrame({
+            'Name': allotted['Name'],
+            'Rank': allotted['Rank'].astype(int),
+            'Stream': allotted['Allotted_Stream'].astype(str),
+            'Second_Language': allotted['Second_Language'],
+            'Caste': allotted['Caste'],
+            'Admission_Status': admission_status,
+            'Date_of_Admission': datetime.date.today().strftime("%Y-%m-%d"),
+        })[STUDENT_COLUMNS].reset_index(drop=True)
+        try:
+            save_bulk_data(students)
+        except DuplicateStudentError as e:
+            st.error(f"Already admitted: {e}")
+        else:
+            st.session_state.allocation_message = f"{len(students)} students admitted from {uploaded.name}."
+            st.session_state.applicants_upload_id = st.session_state.get('applicants_upload_id', 0) + 1
+            st.rerun()
+
+# st.dataframe / st.altair_chart, timed under the enclosing operation
+def show_table(data, **kwargs):
+    with span(f"{recorder.current() or 'page:' + selection}:table"):
+        st.dataframe(data, **kwargs)
+
+def show_chart(chart, **kwargs):
+    with span(f"{recorder.current() or 'page:' + selection}:chart"):
+        st.altair_chart(chart, **kwargs)
+
+# Admin: latency percentiles of the timed operations and recent page runs
+@st.fragment
+def render_performance():
+    import altair as alt
+    st.caption("Timings of this server process (last 1000 per operation). "
+               "Set ADMISSION_PERF_LOG to a file path to also log every timing as JSON lines.")
+    if st.button("Reset timings", key="perf_reset"):
+        recorder.reset()
+    
+    summary = recorder.summary()
+    if summary.empty:
+        st.info("Nothing timed yet.")
+        return
+    st.subheader("Latency by Operation")
+    st.dataframe(summary, use_container_width=True, hide_index=True, column_config={
+        column: st.column_config.NumberColumn(format="%.1f")
+        for column in ['p50_ms', 'p95_ms', 'Max_ms']})
+    
+    runs = recorder.runs()
+    if not runs.empty:
+        st.subheader("Page Runs")
+        chart = alt.Chart(runs).mark_line(point=True).encode(
+            x=alt.X('Time:T', title='Time'),
+            y=alt.Y('ms:Q', title='Run time (ms)'),
+            color=alt.Color('Page:N')
+        )
+        st.altair_chart(chart, use_container_width=True)
+        st.caption(f"Roster in memory: {runs['Students_MiB'].iloc[-1]:.2f} MiB")
+    
+    cache_stats = get_roster().cache.stats()
+    st.caption(f"Roster v{get_roster().version} · cache hits {cache_stats['hits']}, "
+               f"misses {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+
+# Render only the selected tab. Runs as a fragment, so switching tabs or
+# using a widget inside a tab reruns just this part of the page.
+@st.fragment
+def lazy_tabs(key, tabs):
+    selected = st.radio("View", list(tabs), horizontal=True, key=key,
+                        label_visibility="collapsed")
+    tabs[selected]()
+
+# Download button for a dataset. Nothing is serialized until the button is
+# clicked, and the bytes are cached until the data changes.
+def export_button(label, dataset, name, file_stem, select=None, container=st, key=None):
+    fmt = st.session_state.get('export_format', 'CSV')
+    container.download_button(
+        label,
+        data=lambda: export_bytes(get_roster(), dataset, name, fmt, select),
+        file_name=file_name(file_stem, fmt),
+        mime=mime_type(fmt),
+        key=key,
+        on_click="ignore"
+    )
+
+# Change events after..last, exactly the ones the file name promises even if
+# more arrive before the download is clicked
+def export_changes(after, last, fmt):
+    changes_df = get_service().changes(after, last - after)
+    return serialize_changes(changes_df[changes_df['seq'] <= last], fmt)
+
+# Paginated table: searching, sorting and slicing happen on the server and
+# only the visible page is sent to the browser
+@st.fragment
+@timed('paged_table')
+def paged_table(key, dataset, sort_columns, ascending=True, page_size=25):
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search = st.text_input("Search by name", key=f"{key}_search")
+    with col2:
+        sort_by = st.selectbox("Sort by", options=sort_columns, key=f"{key}_sort")
+    with col3:
+        order = st.selectbox("Order", options=["Ascending", "Descending"],
+                             index=0 if ascending else 1, key=f"{key}_order")
+    
+    rows = matching_rows(get_roster(), dataset, search, sort_by, order == "Ascending")
+    total = len(rows)
+    pages = page_count(total, page_size)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    page_df = page_of(rows, page, page_size)
+    
+    show_table(page_df, use_container_width=True, hide_index=True)
+    first = (page - 1) * page_size
+    st.caption(f"Showing {min(first + 1, total)}–{min(first + page_size, total)} of {total}")
+
+# New Admission: bulk import of an allotment list
+@st.fragment
+@timed('bulk_import')
+def render_bulk_import():
+    if 'bulk_message' in st.session_state:
+        st.success(st.session_state.pop('bulk_message'))
+    
+    st.caption("Upload a CSV or Excel file with the columns Name, Rank, Stream, Second_Language, "
+               "Caste and Admission_Status. Date_of_Admission is optional and defaults to today.")
+    uploaded = st.file_uploader("Allotment list", type=['csv', 'xlsx'],
+                                key=f"bulk_upload_{st.session_state.get('bulk_upload_id', 0)}")
+    if uploaded is None:
+        return
+    
+    try:
+        valid_df, errors_df = get_service().validate(read_upload(uploaded))
+    except ImportFormatError as e:
+        st.error(str(e))
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Ready to admit", len(valid_df))
+    with col2:
+        st.metric("Rejected rows", len(errors_df))
+    
+    if not errors_df.empty:
+        show_table(errors_df, use_container_width=True, hide_index=True)
+    
+    if not valid_df.empty and st.button(f"Admit {len(valid_df)} students", key="bulk_admit"):
+        try:
+            save_bulk_data(valid_df)
+        except DuplicateStudentError as e:
+            st.error(f"Already admitted: {e}")
+        else:
+            st.session_state.bulk_message = f"{len(valid_df)} students admitted from {uploaded.name}."
+            # Start over with an empty uploader and refresh the whole page
+            st.session_state.bulk_upload_id = st.session_state.get('bulk_upload_id', 0) + 1
+            st.rerun()
+
+# TC Issuance: TCs for many students at once
+@st.fragment
+@timed('batch_tc')
+def render_batch_tc():
+    if 'batch_tc_message' in st.session_state:
+        st.success(st.session_state.pop('batch_tc_message'))
+    
+    source = st.radio("Select students", ["From the roster", "Upload a list"], horizontal=True,
+                      key="batch_tc_source")
+    errors_df = pd.DataFrame(columns=['Row', 'Name', 'Error'])
+    
+    if source == "From the roster":
+        batch_stream = st.selectbox("Stream", options=STREAMS, key="batch_tc_stream")
+        stream_df = get_roster().cached(
+            'students', f'stream:{batch_stream}',
+            lambda df: df[df['Stream'] == batch_stream].sort_values('Rank'))
+        labels = st.multiselect(
+            "Students", options=list(stream_df.index), key="batch_tc_students",
+            format_func=lambda label: f"{stream_df.at[label, 'Name']} (rank {stream_df.at[label, 'Rank']})")
+        requests_df = stream_df.loc[labels, STUDENT_KEY]
+    else:
+        uploaded = st.file_uploader(
+            "List of students (Name, Stream, Rank and optionally TC_Reason)", type=['csv', 'xlsx'],
+            key=f"batch_tc_upload_{st.session_state.get('batch_tc_upload_id', 0)}")
+        if uploaded is None:
+            return
+        try:
+            requests_df, errors_df = validate_tc_list(read_upload(uploaded, TC_LIST_COLUMNS))
+        except ImportFormatError as e:
+            st.error(str(e))
+            return
+        
+        # Rows that are not on the roster (one key lookup per row)
+        found = pd.Series(get_roster().lookup(requests_df), index=requests_df.index).notna()
+        missing = requests_df[~found]
+        errors_df = pd.concat([errors_df, pd.DataFrame({
+            'Row': missing.index + 2,
+            'Name': missing['Name'],
+            'Error': "no student with this name, stream and rank"
+        })], ignore_index=True).sort_values('Row')
+        requests_df = requests_df[found]
+    
+    batch_reason = st.text_input("Reason for TC (Optional, used where the list gives none)",
+                                 key="batch_tc_reason")
+    
+    if not errors_df.empty:
+        st.warning(f"{len(errors_df)} row(s) skipped")
+        show_table(errors_df, use_container_width=True, hide_index=True)
+    
+    if not requests_df.empty and st.button(f"Issue {len(requests_df)} TCs", key="batch_tc_issue"):
+        requests_df = requests_df.copy()
+        if 'TC_Reason' not in requests_df.columns:
+            requests_df['TC_Reason'] = ''
+        requests_df['TC_Reason'] = requests_df['TC_Reason'].mask(
+            requests_df['TC_Reason'] == '', batch_reason)
+        try:
+            save_tc_batch(requests_df)
+        except StudentNotFoundError as e:
+            st.error(f"Student not found: {e}")
+        else:
+            st.session_state.batch_tc_message = f"{len(requests_df)} TCs issued."
+            st.session_state.pop('batch_tc_students', None)
+            st.session_state.batch_tc_upload_id = st.session_state.get('batch_tc_upload_id', 0) + 1
+            st.rerun()
+
+# School name, year and logo printed on this session's certificates
+def certificate_school():
+    school = st.session_state.school
+    return school, st.session_state.admission_year, get_catalog().school_file(school, SCHOOL_LOGO)
+
+# TC Issuance: one certificate, rendered when the download is clicked
+def certificate_button(record, key=None):
+    from admission.certificates import FORMATS as CERTIFICATE_FORMATS, certificate_name, render_certificate
+    fmt = st.session_state.get('certificate_format', 'PDF')
+    st.download_button(
+        "🖨️ Download TC Certificate",
+        data=lambda: render_certificate(record, fmt, *certificate_school()),
+        file_name=certificate_name(record, fmt),
+        mime=CERTIFICATE_FORMATS[fmt][1],
+        key=key,
+        on_click="ignore"
+    )
+
+# TC Issuance: certificates for many TC records, rendered by a thread pool
+# in the background while the page stays usable
+@st.fragment
+@timed('tc_certificates')
+def render_tc_certificates():
+    from admission.certificates import FORMATS as CERTIFICATE_FORMATS, CertificateBatch
+    tc_df = load_tc_data()
+    tc_dates = pd.to_datetime(tc_df['TC_Date'], errors='coerce')
+    # No record with a readable TC date: start from today
+    first, last = tc_dates.min(), tc_dates.max()
+    today = datetime.date.today()
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        date_range = st.date_input("TCs issued between",
+                                   value=(today if pd.isna(first) else first.date(),
+                                          today if pd.isna(last) else last.date()),
+                                   key="certificate_dates")
+    with col2:
+        stream = st.selectbox("Stream", options=["All"] + STREAMS, key="certificate_stream")
+    with col3:
+        fmt = st.radio("Format", options=list(CERTIFICATE_FORMATS), horizontal=True, key="certificate_format")
+    
+    if len(date_range) == 2:
+        picked = tc_dates.between(pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))
+    else:
+        picked = tc_dates >= pd.Timestamp(date_range[0]) if date_range else tc_dates.notna()
+    if stream != "All":
+        picked &= tc_df['Stream'] == stream
+    selected = tc_df[picked]
+    
+    batch = st.session_state.get('certificate_batch')
+    running = batch is not None and not batch.finished()
+    if st.button(f"Generate {len(selected)} certificates", key="certificate_generate",
+                 disabled=selected.empty or running):
+        st.session_state.certificate_batch = CertificateBatch(selected, fmt, *certificate_school()).start()
+        st.rerun()
+
+# TC Issuance: progress of the running certificate batch, polled without
+# rerunning the page; the whole page reruns once to offer the download
+@st.fragment(run_every=1)
+def render_certificate_progress():
+    batch = st.session_state.certificate_batch
+    if batch.finished():
+        st.rerun()
+    st.progress(batch.done / batch.total, text=f"Rendering certificates: {batch.done} of {batch.total}")
+
+def render_certificate_download():
+    batch = st.session_state.get('certificate_batch')
+    if batch is None:
+        return
+    if not batch.finished():
+        render_certificate_progress()
+        return
+    try:
+        data = batch.result()
+    except Exception as e:
+        st.error(f"Could not render the certificates: {e}")
+        st.session_state.pop('certificate_batch')
+        return
+    st.download_button(
+        f"📦 Download {batch.total} certificates (zip)",
+        data=data,
+        file_name=f"tc_certificates_{batch.fmt.lower()}.zip",
+        mime="application/zip",
+        key="certificate_zip",
+        on_click="ignore"
+    )
+
+# Stream-wise View: one stream
+@st.fragment
+@timed('stream_tab')
+def render_stream_tab(stream):
+    import altair as alt
+    st.subheader(f"{stream} Stream Students")
+    
+    # Filter data for this stream, sorted by rank (cached until the next admission or TC)
+    stream_df = get_roster().cached(
+        'students', f'stream:{stream}',
+        lambda df: df[df['Stream'] == stream].sort_values('Rank'))
+    
+    if not stream_df.empty:
+        # Display the dataframe
+        show_table(stream_df, use_container_width=True)
+        
+        # Download button for this stream's data
+        export_button(f"Download {stream} Stream Data", 'students', f'stream:{stream}',
+                      f"{stream}_stream_students",
+                      select=lambda df: df[df['Stream'] == stream].sort_values('Rank'))
+        
+        # Show statistics
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Total Students", len(stream_df))
+        
+        with col2:
+            permanent = len(stream_df[stream_df['Admission_Status'] == 'PERMANENT'])
+            st.metric("Permanent", permanent)
+        
+        with col3:
+            temporary = len(stream_df[stream_df['Admission_Status'] == 'TEMPORARY'])
+            st.metric("Temporary", temporary)
+        
+        # Show second language distribution
+        st.subheader("Second Language Distribution")
+        language_counts = stream_df['Second_Language'].value_counts()
+        # Categorical: languages nobody in the stream takes are counted as 0
+        language_counts = language_counts[language_counts > 0].reset_index()
+        language_counts.columns = ['Language', 'Count']
+        
+        chart = alt.Chart(language_counts).mark_bar().encode(
+            x=alt.X('Language:N', title='Second Language'),
+            y=alt.Y('Count:Q', title='Number of Students'),
+            color=alt.Color('Language:N', legend=None)
+        ).properties(
+            title=f'Second Language Distribution - {stream} Stream',
+            height=300
+        )
+        show_chart(chart, use_container_width=True)
+        
+    else:
+        st.info(f"No students admitted to {stream} stream yet.")
+
+# Data Analysis Tab 1: Stream Distribution
+@st.fragment
+@timed('analysis:stream_distribution')
+def render_stream_distribution():
+    import altair as alt
+    # Tables precomputed by the analytics worker
+    analytics = get_analytics()
+    
+    st.subheader("Students by Stream")
+    
+    # Create DataFrame for plot
+    stream_counts = analytics['stream_counts']
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        show_table(stream_counts, use_container_width=True)
+    
+    with col2:
+        chart = alt.Chart(stream_counts).mark_bar().encode(
+            x=alt.X('Stream:N', title='Stream'),
+            y=alt.Y('Count:Q', title='Number of Students'),
+            color=alt.Color('Stream:N', legend=None)
+        ).properties(
+            title='Students by Stream'
+        )
+        show_chart(chart, use_container_width=True)
+
+# Data Analysis Tab 2: Admission Status
+@st.fragment
+@timed('analysis:admission_status')
+def render_admission_status():
+    import altair as alt
+    analytics = get_analytics()
+    
+    st.subheader("Admission Status Analysis")
+    
+    # Pivot table and its long form for Altair
+    status_pivot = analytics['status_by_stream']
+    status_data = analytics['status_by_stream_long']
+    
+    # Display the data
+    show_table(status_pivot, use_container_width=True)
+    
+    # Create chart
+    chart = alt.Chart(status_data).mark_bar().encode(
+        x=alt.X('Stream:N', title='Stream'),
+        y=alt.Y('Count:Q', title='Number of Students'),
+        color=alt.Color('Status:N'),
+        xOffset='Status:N'  # Group bars by status
+    ).properties(
+        title='Admission Status by Stream'
+    )
+    show_chart(chart, use_container_width=True)
+
+# Data Analysis Tab 3: Caste Distribution
+@st.fragment
+@timed('analysis:caste_distribution')
+def render_caste_distribution():
+    import altair as alt
+    analytics = get_analytics()
+    
+    st.subheader("Caste-wise Distribution")
+    
+    # Create DataFrame for plot
+    caste_counts = analytics['caste_counts']
+    
+    # Display the data
+    show_table(caste_counts, use_container_width=True)
+    
+    # Create chart
+    chart = alt.Chart(caste_counts).mark_bar().encode(
+        x=alt.X('Caste:N', sort='-y', title='Caste'),
+        y=alt.Y('Count:Q', title='Number of Students'),
+        color=alt.Color('Caste:N', legend=None)
+    ).properties(
+        title='Students by Caste'
+    )
+    show_chart(chart, use_container_width=True)
+    
+    # Stream-wise caste distribution
+    st.subheader("Caste Distribution by Stream")
+    
+    # Create pivot table
+    caste_pivot = analytics['caste_by_stream']
+    
+    show_table(caste_pivot, use_container_width=True)
+
+# Data Analysis Tab 4: Second Language
+@st.fragment
+@timed('analysis:second_language')
+def render_second_language():
+    import altair as alt
+    analytics = get_analytics()
+    
+    st.subheader("Second Language Distribution")
+    
+    # Create DataFrame for plot
+    language_counts = analytics['language_counts']
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        show_table(language_counts, use_container_width=True)
+    
+    with col2:
+        chart = alt.Chart(language_counts).mark_bar().encode(
+            x=alt.X('Second Language:N', title='Second Language'),
+            y=alt.Y('Count:Q', title='Number of Students'),
+            color=alt.Color('Second Language:N', legend=None)
+        ).properties(
+            title='Students by Second Language'
+        )
+        show_chart(chart, use_container_width=True)
+    
+    # Stream-wise language distribution
+    st.subheader("Second Language by Stream")
+    
+    # Pivot table and its long form for Altair
+    language_pivot = analytics['language_by_stream']
+    language_data = analytics['language_by_stream_long']
+    
+    # Display the data
+    show_table(language_pivot, use_container_width=True)
+    
+    # Create chart
+    chart = alt.Chart(language_data).mark_bar().encode(
+        x=alt.X('Stream:N', title='Stream'),
+        y=alt.Y('Count:Q', title='Number of Students'),
+        color=alt.Color('Language:N'),
+        xOffset='Language:N'  # Group bars by language
+    ).properties(
+        title='Second Language Distribution by Stream'
+    )
+    show_chart(chart, use_container_width=True)
+
+# Data Analysis Tab 5: Date-wise Analysis
+@st.fragment
+@timed('analysis:date_analysis')
+def render_date_analysis():
+    import altair as alt
+    analytics = get_analytics()
+    
+    st.subheader("Date-wise Admission Analysis")
+    
+    try:
+        # Admissions per date and stream (one row per day and stream)
+        daily = analytics['daily_by_stream']
+        if daily.empty:
+            st.info("No admission dates recorded yet.")
+            return
+        first_day = daily['Date_of_Admission'].min().date()
+        last_day = daily['Date_of_Admission'].max().date()
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            date_range = st.date_input("Date range", value=(first_day, last_day), min_value=first_day,
+                                       max_value=last_day, key="date_range")
+        with col2:
+            requested = st.selectbox("Group by", options=["Auto"] + list(BUCKETS), key="date_bucket")
+        # While only the start of the range is picked, show up to the last day
+        start, end = (tuple(date_range) + (last_day,))[:2] if date_range else (first_day, last_day)
+        
+        # Buckets follow the range so no chart exceeds MAX_MARKS bars or points
+        streams = daily['Stream'].nunique()
+        bucket = choose_bucket(start, end, streams, finest="Day" if requested == "Auto" else requested)
+        if requested not in ("Auto", bucket):
+            st.caption(f"Grouped by {bucket.lower()} to keep the charts under {MAX_MARKS} bars.")
+        
+        date_stream_counts = bucket_counts(daily, start, end, bucket)
+        date_stream_counts['Date'] = bucket_labels(date_stream_counts['Date_of_Admission'], bucket)
+        
+        # Show the data
+        show_table(date_stream_counts[['Date', 'Stream', 'Count']], use_container_width=True,
+                   hide_index=True)
+        
+        # Create chart
+        chart = alt.Chart(date_stream_counts).mark_bar().encode(
+            x=alt.X('Date:O', title=bucket, sort=None),
+            y=alt.Y('Count:Q', title='Number of Students'),
+            color=alt.Color('Stream:N'),
+            xOffset='Stream:N'  # Group bars by stream
+        ).properties(
+            title=f'Admissions by Stream per {bucket}'
+        )
+        show_chart(chart, use_container_width=True)
+        
+        # Total admissions per bucket, empty buckets included
+        st.subheader("Total Admissions by Date")
+        totals = bucket_totals(daily, start, end, bucket)
+        totals['Date'] = bucket_labels(totals['Date_of_Admission'], bucket)
+        
+        show_table(totals[['Date', 'Total']], use_container_width=True, hide_index=True)
+        
+        # Create chart for totals
+        chart = alt.Chart(totals).mark_line(point=True).encode(
+            x=alt.X('Date_of_Admission:T', title=bucket),
+            y=alt.Y('Total:Q', title='Number of Admissions'),
+            tooltip=['Date', 'Total']
+        ).properties(
+            title=f'Total Admissions per {bucket}'
+        )
+        show_chart(chart, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error in date analysis: {str(e)}")
+        st.info("Please check if the dates in your data are in a valid format (YYYY-MM-DD).")
+
+# Data Analysis Tab 6: other years and schools, from per-partition summaries
+@st.fragment
+@timed('analysis:year_comparison')
+def render_year_comparison():
+    import altair as alt
+    compare = st.radio("Compare", ["Years of this school", "Schools in this year"], horizontal=True,
+                       key="comparison")
+    if compare == "Years of this school":
+        st.subheader(f"{st.session_state.school}: Admissions by Year")
+        summaries = get_catalog().summaries(st.session_state.school)
+        group = 'Year'
+    else:
+        st.subheader(f"Admissions by School in {st.session_state.admission_year}")
+        summaries = get_catalog().summaries()
+        summaries = summaries[summaries['Year'] == st.session_state.admission_year]
+        group = 'School'
+    
+    show_table(summaries, use_container_width=True, hide_index=True)
+    
+    # Students per stream, one group of bars per year or school
+    long_df = summaries.melt(id_vars=[group], value_vars=[s for s in STREAMS if s in summaries.columns],
+                             var_name='Stream', value_name='Count')
+    chart = alt.Chart(long_df).mark_bar().encode(
+        x=alt.X(f'{group}:O', title=group),
+        y=alt.Y('Count:Q', title='Number of Students'),
+        color=alt.Color('Stream:N'),
+        xOffset='Stream:N'
+    ).properties(
+        title=f'Students by Stream per {group}'
+    )
+    show_chart(chart, use_container_width=True)
+
+# A school or admission year is only added from this form, never by
+# picking it; the new partition is selected on the next run
+def render_new_partition():
+    with st.form("new_partition"):
+        school = st.text_input("School", value=DEFAULT_SCHOOL)
+        year = st.number_input("Admission year", min_value=2000, max_value=2100, step=1,
+                               value=DEFAULT_YEAR)
+        if st.form_submit_button("Create"):
+            try:
+                get_catalog().create(school, year)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.session_state.created_partition = (school_key(school), int(year))
+                st.rerun()
+
+# The in-process API serves the default school and year once they exist
+if get_catalog().exists(DEFAULT_SCHOOL, DEFAULT_YEAR):
+    start_api()
+
+# School and admission year of this session; only their data is loaded
+schools = get_catalog().schools()
+if not schools:
+    with st.sidebar.expander("➕ New school or year", expanded=True):
+        render_new_partition()
+    st.info("No admission data yet. Create the school and admission year in the sidebar to start.")
+    st.stop()
+if 'created_partition' in st.session_state:
+    st.session_state.school, st.session_state.admission_year = st.session_state.pop('created_partition')
+default_school = school_key(DEFAULT_SCHOOL)
+st.sidebar.selectbox("School", options=schools,
+                     index=schools.index(default_school) if default_school in schools else 0,
+                     key="school")
+years = get_catalog().years(st.session_state.school)
+if st.session_state.get('admission_year') not in years:
+    # Picked for another school
+    st.session_state.pop('admission_year', None)
+st.sidebar.selectbox("Admission year", options=years,
+                     index=years.index(DEFAULT_YEAR) if DEFAULT_YEAR in years else 0,
+                     key="admission_year")
+with st.sidebar.expander("➕ New school or year"):
+    render_new_partition()
+
 # Initialize session states
-if 'students_df' not in st.session_state:
-    st.session_state.students_df = load_data()
+# Sessions keep only the roster version they last read; the roster itself
+# is shared by all sessions.  A form submitted in this run was filled in
+# against the version the previous run rendered, so writes expect that one:
+# if another session committed since, the service re-checks the write
+# against the current roster before it commits.
+st.session_state.rendered_version = st.session_state.get('roster_version')
+st.session_state.roster_version, students_df = load_data()
 
 # Initialize form fields
 for field in ['name', 'rank', 'stream', 'language', 'caste', 'status']:
@@ -116,13 +896,41 @@ pages = {
     "New Admission": "📝",
     "Stream-wise View": "👥",
     "TC Issuance": "🔖",
+    "Seat Allocation": "🎯",
     "Data Analysis": "📊"
 }
+# Hidden admin page (open the app with ?admin=1)
+if 'admin' in st.query_params:
+    pages["Performance"] = "⏱️"
 
 # Add a sidebar with navigation
 st.sidebar.title("Navigation")
 selection = st.sidebar.radio("Go to", list(pages.keys()), format_func=lambda x: f"{pages[x]} {x}")
 
+# File format for every download button
+if selection in ("Stream-wise View", "TC Issuance", "Data Analysis"):
+    st.sidebar.selectbox("Download format", options=list(FORMATS), key="export_format")
+
+# Data cache statistics (open the app with ?debug=1)
+if 'debug' in st.query_params:
+    cache_stats = get_roster().cache.stats()
+    st.sidebar.caption(
+        f"Roster v{st.session_state.roster_version} · cache hits {cache_stats['hits']}, "
+        f"misses {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+
+# Stored rows that failed validation on load (bad stream, caste, rank, ...)
+quarantine = get_service().quarantine()
+if not quarantine.empty:
+    st.sidebar.warning(f"{len(quarantine)} stored row(s) failed validation and were not loaded.")
+    st.sidebar.download_button(
+        "Download Quarantine Report",
+        data=functools.partial(quarantine.to_csv, index=False),
+        file_name="quarantine_report.csv",
+        mime="text/csv",
+        key="quarantine_report",
+        on_click="ignore"
+    )
+
 # Initialize page-specific variables
 if selection == "New Admission":
     # Clear button in sidebar
@@ -137,7 +945,7 @@ if selection == "New Admission":
         col1, col2 = st.columns(2)
         
         with col1:
-            student_name = st.text_input("Student Name", value=st.session_state.form_name).upper()
+            student_name = normalize_name(st.text_input("Student Name", value=st.session_state.form_name))
             rank = st.number_input("Rank", min_value=1, step=1, value=st.session_state.form_rank)
             stream = st.selectbox("Stream", options=STREAMS, index=STREAMS.index(st.session_state.form_stream) if st.session_state.form_stream in STREAMS else 0)
         
@@ -157,6 +965,9 @@ if selection == "New Admission":
             submitted = st.form_submit_button("Submit")
         with col2:
             clear_form = st.form_submit_button("Clear Form")
+        with col3:
+            not_duplicate = st.checkbox("Not a duplicate", key="admission_not_duplicate",
+                                        help="Admit even though a similar name holds the same stream and rank")
             
         if clear_form:
             clear_form_fields()
@@ -171,13 +982,19 @@ if selection == "New Admission":
             st.session_state.form_caste = caste
             st.session_state.form_status = admission_status
             
-            # Check if student is already admitted
-            if student_name and any(st.session_state.students_df['Name'] == student_name):
-                st.error(f"A student with name {student_name} is already admitted!")
-            elif not student_name:
+            # A name that differs only by a typo, with the same stream and
+            # rank, is probably the same student
+            similar = [] if not student_name else get_roster().possible_duplicates(
+                student_name, stream, rank)
+            
+            if not student_name:
                 st.error("Please enter student name!")
+            elif similar and not not_duplicate:
+                st.warning("Possible duplicate of " + ", ".join(
+                    f"{name} ({stream}, rank {rank})" for name, stream, rank in similar) +
+                    ". Tick \"Not a duplicate\" and submit again to admit anyway.")
             else:
-                # Add new student to DataFrame
+                # Add new student
                 new_student = {
                     'Name': student_name,
                     'Rank': rank,
@@ -188,37 +1005,41 @@ if selection == "New Admission":
                     'Date_of_Admission': today_date
                 }
                 
-                # Append data to the DataFrame
-                new_df = pd.DataFrame([new_student])
-                st.session_state.students_df = pd.concat([st.session_state.students_df, new_df])
-                
-                # Save data
-                save_data(st.session_state.students_df)
-                
-                st.success(f"Student {student_name} admitted successfully to {stream} stream!")
-                
-                # Clear form fields after successful submission
-                clear_form_fields()
-                st.rerun()
+                # Save data (also rejects a name that is already admitted)
+                try:
+                    save_data(new_student)
+                except DuplicateStudentError:
+                    st.error(f"A student with name {student_name} is already admitted!")
+                else:
+                    st.success(f"Student {student_name} admitted successfully to {stream} stream!")
+                    
+                    # Clear form fields after successful submission
+                    clear_form_fields()
+                    st.rerun()
+    
+    # Admit a whole allotment list at once
+    with st.expander("📥 Bulk Import from Allotment List"):
+        render_bulk_import()
     
     # Display current admission data
-    if not st.session_state.students_df.empty:
+    if not students_df.empty:
         st.subheader("Recent Admissions")
-        # Show only the last 5 entries for quick view
-        recent_df = st.session_state.students_df.sort_values('Date_of_Admission', ascending=False).head(5)
-        st.dataframe(recent_df, use_container_width=True)
+        # Show only the last 5 entries for quick view (kept in a bounded buffer)
+        recent_df = get_roster().recent_admissions(5)
+        show_table(recent_df, use_container_width=True)
         
         # Show counts by stream
         st.subheader("Current Admission Status")
-        stream_counts = st.session_state.students_df['Stream'].value_counts().reset_index()
-        stream_counts.columns = ['Stream', 'Count']
+        aggregates = get_roster().aggregates
+        stream_counts = aggregates.counts('Stream')
         
         col1, col2 = st.columns([1, 2])
         
         with col1:
-            st.dataframe(stream_counts, use_container_width=True)
+            show_table(stream_counts, use_container_width=True)
         
         with col2:
+            import altair as alt
             chart = alt.Chart(stream_counts).mark_bar().encode(
                 x=alt.X('Stream:N', title='Stream'),
                 y=alt.Y('Count:Q', title='Number of Students'),
@@ -226,370 +1047,156 @@ if selection == "New Admission":
             ).properties(
                 title='Students by Stream'
             )
-            st.altair_chart(chart, use_container_width=True)
+            show_chart(chart, use_container_width=True)
     else:
         st.info("No students admitted yet.")
 
 elif selection == "Stream-wise View":
     st.header("Stream-wise Student Lists")
     
-    # Create tabs for different streams
-    tabs = st.tabs(STREAMS)
-    
-    for i, stream in enumerate(STREAMS):
-        with tabs[i]:
-            st.subheader(f"{stream} Stream Students")
-            
-            # Filter data for this stream
-            stream_df = st.session_state.students_df[st.session_state.students_df['Stream'] == stream]
-            
-            if not stream_df.empty:
-                # Sort by rank
-                stream_df = stream_df.sort_values('Rank')
-                
-                # Display the dataframe
-                st.dataframe(stream_df, use_container_width=True)
-                
-                # Download button for this stream's data
-                csv = stream_df.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()
-                href = f'<a href="data:file/csv;base64,{b64}" download="{stream}_stream_students.csv">Download {stream} Stream Data</a>'
-                st.markdown(href, unsafe_allow_html=True)
-                
-                # Show statistics
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Total Students", len(stream_df))
-                
-                with col2:
-                    permanent = len(stream_df[stream_df['Admission_Status'] == 'PERMANENT'])
-                    st.metric("Permanent", permanent)
-                
-                with col3:
-                    temporary = len(stream_df[stream_df['Admission_Status'] == 'TEMPORARY'])
-                    st.metric("Temporary", temporary)
-                
-                # Show second language distribution
-                st.subheader("Second Language Distribution")
-                language_counts = stream_df['Second_Language'].value_counts().reset_index()
-                language_counts.columns = ['Language', 'Count']
-                
-                chart = alt.Chart(language_counts).mark_bar().encode(
-                    x=alt.X('Language:N', title='Second Language'),
-                    y=alt.Y('Count:Q', title='Number of Students'),
-                    color=alt.Color('Language:N', legend=None)
-                ).properties(
-                    title=f'Second Language Distribution - {stream} Stream',
-                    height=300
-                )
-                st.altair_chart(chart, use_container_width=True)
-                
-            else:
-                st.info(f"No students admitted to {stream} stream yet.")
+    # Create tabs for different streams (only the selected one is rendered)
+    lazy_tabs("stream_tab", {stream: functools.partial(render_stream_tab, stream) for stream in STREAMS})
 
 elif selection == "TC Issuance":
     st.header("Issue Transfer Certificate (TC)")
     
-    if not st.session_state.students_df.empty:
+    if not students_df.empty:
         # Show current students for reference
         with st.expander("View Current Students"):
-            st.dataframe(st.session_state.students_df, use_container_width=True)
+            paged_table("students_table", "students", ['Name', 'Rank', 'Stream', 'Date_of_Admission'])
+        
+        # Typeahead: names close to what was typed, misspellings included
+        tc_query = st.text_input("🔍 Find student", key="tc_search",
+                                 placeholder="Type a name, even partly or misspelt")
+        if tc_query:
+            choices = {f"{name} ({stream}, rank {rank})": (name, stream, rank)
+                       for _, _, keys in get_roster().similar_names(tc_query, limit=8, min_score=0.3)
+                       for name, stream, rank in keys}
+            if choices:
+                st.selectbox("Matching students", options=list(choices), index=None, key="tc_pick",
+                             placeholder="Select a student...", on_change=fill_tc_form, args=(choices,))
+            else:
+                st.caption("No similar names on the roster.")
         
         # TC form
         with st.form("tc_form"):
             col1, col2 = st.columns(2)
             
             with col1:
-                tc_name = st.text_input("Student Name for TC").upper()
-                tc_stream = st.selectbox("Stream", options=STREAMS)
+                tc_name = normalize_name(st.text_input("Student Name for TC", key="tc_name"))
+                tc_stream = st.selectbox("Stream", options=STREAMS, key="tc_stream")
             
             with col2:
-                tc_rank = st.number_input("Rank", min_value=1, step=1)
+                tc_rank = st.number_input("Rank", min_value=1, step=1, key="tc_rank")
                 tc_reason = st.text_input("Reason for TC (Optional)")
             
             tc_submitted = st.form_submit_button("Issue TC")
             
             if tc_submitted:
-                # Find the student
-                mask = (
-                    (st.session_state.students_df['Name'] == tc_name) & 
-                    (st.session_state.students_df['Stream'] == tc_stream) & 
-                    (st.session_state.students_df['Rank'] == tc_rank)
-                )
-                
-                if mask.any():
-                    # Get student info before removing
-                    student_info = st.session_state.students_df[mask].iloc[0].to_dict()
-                    if tc_reason:
-                        student_info['TC_Reason'] = tc_reason
-                    
-                    # Drop the student from DataFrame
-                    st.session_state.students_df = st.session_state.students_df[~mask]
-                    save_data(st.session_state.students_df)
-                    
-                    # Save TC record
-                    save_tc_data(student_info)
-                    
-                    st.success(f"TC issued for {tc_name} from {tc_stream} stream.")
-                else:
+                # Drop the student and save the TC record
+                try:
+                    save_tc_data(tc_name, tc_stream, tc_rank, tc_reason)
+                except StudentNotFoundError:
                     st.error("Student not found! Please check name, stream and rank.")
+                else:
+                    st.success(f"TC issued for {tc_name} from {tc_stream} stream.")
+                    st.session_state.last_tc = (tc_name, tc_stream, tc_rank)
+                    st.session_state.roster_version, students_df = load_data()
+        
+        # Certificate of the TC just issued
+        if 'last_tc' in st.session_state:
+            last_name, last_stream, last_rank = st.session_state.last_tc
+            tc_df = load_tc_data()
+            issued = tc_df[(tc_df['Name'] == last_name) & (tc_df['Stream'] == last_stream)
+                           & (tc_df['Rank'] == last_rank)]
+            if not issued.empty:
+                certificate_button(issued.iloc[-1].to_dict(), key="last_tc_certificate")
+        
+        # Many TCs in one commit
+        with st.expander("📦 Batch TC Issuance"):
+            render_batch_tc()
         
         # Display TC records if available
-        if os.path.exists('tc_records.csv'):
+        tc_df = load_tc_data()
+        if not tc_df.empty:
             st.subheader("TC Records")
-            tc_df = pd.read_csv('tc_records.csv')
-            st.dataframe(tc_df.sort_values('TC_Date', ascending=False), use_container_width=True)
+            paged_table("tc_table", "tc", ['TC_Date', 'Name', 'Rank', 'Stream'], ascending=False)
             
             # Download TC records
-            csv = tc_df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="tc_records.csv">Download TC Records</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            export_button("Download TC Records", 'tc', 'all', "tc_records")
+            
+            # Printable certificates
+            with st.expander("🖨️ TC Certificates"):
+                render_tc_certificates()
+                render_certificate_download()
     else:
         st.info("No students admitted yet.")
 
+elif selection == "Seat Allocation":
+    st.header("Seat Allocation")
+    render_seat_allocation()
+
 elif selection == "Data Analysis":
     st.header("Admission Data Analysis")
     
     # Add option to export data
     st.sidebar.subheader("Export Options")
     
-    if st.sidebar.button("Export All Admission Data"):
-        csv = st.session_state.students_df.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="admission_data.csv">Download Complete Admission Data</a>'
-        st.sidebar.markdown(href, unsafe_allow_html=True)
-    
-    if os.path.exists('tc_records.csv'):
-        if st.sidebar.button("Export TC Records"):
-            tc_df = pd.read_csv('tc_records.csv')
-            csv = tc_df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="tc_records.csv">Download TC Records</a>'
-            st.sidebar.markdown(href, unsafe_allow_html=True)
-    
-    if not st.session_state.students_df.empty:
-        # Create analysis options
-        analysis_tabs = st.tabs([
-            "Stream Distribution", 
-            "Admission Status", 
-            "Caste Distribution", 
-            "Second Language", 
-            "Date-wise Analysis"
-        ])
-        
-        # Tab 1: Stream Distribution
-        with analysis_tabs[0]:
-            st.subheader("Students by Stream")
-            
-            # Create DataFrame for plot
-            stream_counts = st.session_state.students_df['Stream'].value_counts().reset_index()
-            stream_counts.columns = ['Stream', 'Count']
-            
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.dataframe(stream_counts, use_container_width=True)
-            
-            with col2:
-                chart = alt.Chart(stream_counts).mark_bar().encode(
-                    x=alt.X('Stream:N', title='Stream'),
-                    y=alt.Y('Count:Q', title='Number of Students'),
-                    color=alt.Color('Stream:N', legend=None)
-                ).properties(
-                    title='Students by Stream'
-                )
-                st.altair_chart(chart, use_container_width=True)
-        
-        # Tab 2: Admission Status
-        with analysis_tabs[1]:
-            st.subheader("Admission Status Analysis")
-            
-            # Create pivot table
-            status_pivot = pd.pivot_table(
-                st.session_state.students_df, 
-                values='Name',
-                index='Stream',
-                columns='Admission_Status',
-                aggfunc='count',
-                fill_value=0
-            ).reset_index()
-            
-            # Convert to a format suitable for Altair
-            status_data = pd.melt(
-                status_pivot, 
-                id_vars=['Stream'], 
-                var_name='Status', 
-                value_name='Count'
-            )
-            
-            # Display the data
-            st.dataframe(status_pivot, use_container_width=True)
-            
-            # Create chart
-            chart = alt.Chart(status_data).mark_bar().encode(
-                x=alt.X('Stream:N', title='Stream'),
-                y=alt.Y('Count:Q', title='Number of Students'),
-                color=alt.Color('Status:N'),
-                xOffset='Status:N'  # Group bars by status
-            ).properties(
-                title='Admission Status by Stream'
-            )
-            st.altair_chart(chart, use_container_width=True)
-        
-        # Tab 3: Caste Distribution
-        with analysis_tabs[2]:
-            st.subheader("Caste-wise Distribution")
-            
-            # Create DataFrame for plot
-            caste_counts = st.session_state.students_df['Caste'].value_counts().reset_index()
-            caste_counts.columns = ['Caste', 'Count']
-            
-            # Display the data
-            st.dataframe(caste_counts, use_container_width=True)
-            
-            # Create chart
-            chart = alt.Chart(caste_counts).mark_bar().encode(
-                x=alt.X('Caste:N', sort='-y', title='Caste'),
-                y=alt.Y('Count:Q', title='Number of Students'),
-                color=alt.Color('Caste:N', legend=None)
-            ).properties(
-                title='Students by Caste'
-            )
-            st.altair_chart(chart, use_container_width=True)
-            
-            # Stream-wise caste distribution
-            st.subheader("Caste Distribution by Stream")
-            
-            # Create pivot table
-            caste_pivot = pd.pivot_table(
-                st.session_state.students_df, 
-                values='Name',
-                index='Stream',
-                columns='Caste',
-                aggfunc='count',
-                fill_value=0
-            ).reset_index()
-            
-            st.dataframe(caste_pivot, use_container_width=True)
-        
-        # Tab 4: Second Language
-        with analysis_tabs[3]:
-            st.subheader("Second Language Distribution")
-            
-            # Create DataFrame for plot
-            language_counts = st.session_state.students_df['Second_Language'].value_counts().reset_index()
-            language_counts.columns = ['Second Language', 'Count']
-            
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.dataframe(language_counts, use_container_width=True)
-            
-            with col2:
-                chart = alt.Chart(language_counts).mark_bar().encode(
-                    x=alt.X('Second Language:N', title='Second Language'),
-                    y=alt.Y('Count:Q', title='Number of Students'),
-                    color=alt.Color('Second Language:N', legend=None)
-                ).properties(
-                    title='Students by Second Language'
-                )
-                st.altair_chart(chart, use_container_width=True)
-            
-            # Stream-wise language distribution
-            st.subheader("Second Language by Stream")
-            
-            # Create pivot table
-            language_pivot = pd.pivot_table(
-                st.session_state.students_df, 
-                values='Name',
-                index='Stream',
-                columns='Second_Language',
-                aggfunc='count',
-                fill_value=0
-            ).reset_index()
-            
-            # Convert to a format suitable for Altair
-            language_data = pd.melt(
-                language_pivot, 
-                id_vars=['Stream'], 
-                var_name='Language', 
-                value_name='Count'
-            )
-            
-            # Display the data
-            st.dataframe(language_pivot, use_container_width=True)
-            
-            # Create chart
-            chart = alt.Chart(language_data).mark_bar().encode(
-                x=alt.X('Stream:N', title='Stream'),
-                y=alt.Y('Count:Q', title='Number of Students'),
-                color=alt.Color('Language:N'),
-                xOffset='Language:N'  # Group bars by language
-            ).properties(
-                title='Second Language Distribution by Stream'
-            )
-            st.altair_chart(chart, use_container_width=True)
+    export_button("Export All Admission Data", 'students', 'all', "admission_data",
+                  container=st.sidebar)
+    
+    tc_df = load_tc_data()
+    if not tc_df.empty:
+        export_button("Export TC Records", 'tc', 'all', "tc_records", container=st.sidebar,
+                      key="sidebar_tc_export")
+    
+    # Only what changed since the last hand-off (numbered change events)
+    st.sidebar.subheader("Sync Changes")
+    last_change = get_service().last_change()
+    changes_after = st.sidebar.number_input("Already synced up to change #", min_value=0,
+                                            max_value=max(last_change, 0), step=1, key="changes_after")
+    changes_fmt = st.sidebar.radio("Changes format", options=list(CHANGE_FORMATS), horizontal=True,
+                                   key="changes_format")
+    st.sidebar.caption(f"{last_change - changes_after} change(s) to sync; latest is #{last_change}.")
+    st.sidebar.download_button(
+        "Export Changes",
+        data=functools.partial(export_changes, changes_after, last_change, changes_fmt),
+        file_name=changes_file_name(changes_after, last_change, changes_fmt),
+        mime=CHANGE_FORMATS[changes_fmt][1],
+        disabled=last_change <= changes_after,
+        on_click="ignore"
+    )
+    
+    if not students_df.empty:
+        # Figures may trail the latest admission by a second or two
+        st.caption("Figures as of " + time.strftime('%H:%M:%S', time.localtime(get_analytics().built_at)))
         
-        # Tab 5: Date-wise Analysis
-        with analysis_tabs[4]:
-            st.subheader("Date-wise Admission Analysis")
-            
-            # Ensure Date_of_Admission is in datetime format
-            try:
-                date_df = st.session_state.students_df.copy()
-                date_df['Date_of_Admission'] = pd.to_datetime(date_df['Date_of_Admission'])
-                
-                # Group by date and stream
-                date_stream_counts = date_df.groupby(['Date_of_Admission', 'Stream']).size().reset_index(name='Count')
-                
-                # Format date for display
-                date_stream_counts['Date'] = date_stream_counts['Date_of_Admission'].dt.strftime('%Y-%m-%d')
-                
-                # Show the data
-                st.dataframe(date_stream_counts, use_container_width=True)
-                
-                # Create chart
-                chart = alt.Chart(date_stream_counts).mark_bar().encode(
-                    x=alt.X('Date:N', title='Date'),
-                    y=alt.Y('Count:Q', title='Number of Students'),
-                    color=alt.Color('Stream:N'),
-                    xOffset='Stream:N'  # Group bars by stream
-                ).properties(
-                    title='Daily Admissions by Stream'
-                )
-                st.altair_chart(chart, use_container_width=True)
-                
-                # Total admissions per day
-                st.subheader("Total Admissions by Date")
-                daily_totals = date_df.groupby('Date_of_Admission').size().reset_index(name='Total')
-                daily_totals['Date'] = daily_totals['Date_of_Admission'].dt.strftime('%Y-%m-%d')
-                
-                st.dataframe(daily_totals[['Date', 'Total']], use_container_width=True)
-                
-                # Create chart for totals
-                chart = alt.Chart(daily_totals).mark_line(point=True).encode(
-                    x=alt.X('Date:N', title='Date'),
-                    y=alt.Y('Total:Q', title='Number of Admissions'),
-                    tooltip=['Date', 'Total']
-                ).properties(
-                    title='Total Daily Admissions Trend'
-                )
-                st.altair_chart(chart, use_container_width=True)
-                
-            except Exception as e:
-                st.error(f"Error in date analysis: {str(e)}")
-                st.info("Please check if the dates in your data are in a valid format (YYYY-MM-DD).")
-            
+        # Create analysis options (only the selected one is rendered)
+        lazy_tabs("analysis_tab", {
+            "Stream Distribution": render_stream_distribution,
+            "Admission Status": render_admission_status,
+            "Caste Distribution": render_caste_distribution,
+            "Second Language": render_second_language,
+            "Date-wise Analysis": render_date_analysis,
+            "Year-wise Comparison": render_year_comparison
+        })
     else:
         st.info("No admission data available for analysis.")
 
+elif selection == "Performance":
+    st.header("Performance")
+    render_performance()
+
 # Add a footer
 st.markdown("---")
 st.markdown(f"""
 <div style="display: flex; justify-content: space-between; align-items: center;">
-    <p>© {ADMISSION_YEAR} {SCHOOL_NAME} Admission Portal</p>
+    <p>© {st.session_state.admission_year} {st.session_state.school} Admission Portal</p>
     <p>Made with ❤️ for Education</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Record this run (fragment reruns are timed by their own spans)
+recorder.page_run(selection, (time.perf_counter() - run_started) * 1000,
+                  get_roster().cached('students', 'memory_mb',
+                                      lambda df: df.memory_usage(deep=True).sum() / 2**20))
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+from admission.allocation import OPEN, allot_seats, seat_matrix
+
+
+def _applicants(*rows):
+    # rows: (name, rank, caste, preferences)
+    return pd.DataFrame([{'Name': name, 'Rank': rank, 'Caste': caste, 'Second_Language': 'MAL',
+                          'Preferences': preferences} for name, rank, caste, preferences in rows])
+
+
+def _allotted(allotment_df):
+    # {name: (stream, quota)} of the allotted applicants
+    allotted = allotment_df[allotment_df['Allotted_Stream'].notna()]
+    return {name: (stream, quota) for name, stream, quota in zip(
+        allotted['Name'], allotted['Allotted_Stream'], allotted['Quota'])}
+
+
+def _seats(summary_df, stream, quota):
+    row = summary_df[(summary_df['Stream'] == stream) & (summary_df['Quota'] == quota)]
+    return row.iloc[0][['Sanctioned', 'Remaining', 'Filled', 'Vacant']].tolist()
+
+
+def test_merit_order_within_each_category():
+    applicants = _applicants(*[(f'GEN {rank}', rank, 'GEN', ['CS']) for rank in (7, 1, 5, 3, 9)],
+                             ('SC 20', 20, 'SC', ['CS']), ('SC 12', 12, 'SC', ['CS']),
+                             ('SC 15', 15, 'SC', ['CS']))
+    allotment_df, _ = allot_seats(applicants, {'CS': 5}, {'SC': 40})
+    assert _allotted(allotment_df) == {
+        'GEN 1': ('CS', OPEN), 'GEN 3': ('CS', OPEN), 'GEN 5': ('CS', OPEN),
+        'SC 12': ('CS', 'SC'), 'SC 15': ('CS', 'SC')}
+
+
+def test_open_seats_are_filled_before_reserved_ones():
+    applicants = _applicants(('SC 1', 1, 'SC', ['CS']), ('GEN 2', 2, 'GEN', ['CS']),
+                             ('SC 3', 3, 'SC', ['CS']), ('GEN 4', 4, 'GEN', ['CS']))
+    allotment_df, summary_df = allot_seats(applicants, {'CS': 3}, {'SC': 34})
+    # SC 1 takes an open seat on merit, keeping the reserved one for SC 3
+    assert _allotted(allotment_df) == {
+        'SC 1': ('CS', OPEN), 'GEN 2': ('CS', OPEN), 'SC 3': ('CS', 'SC')}
+    assert _seats(summary_df, 'CS', 'SC') == [1, 1, 1, 0]
+
+
+def test_unfilled_reserved_seats_go_to_the_partner_community():
+    # No SC applicant: the SC seat goes to the ST applicant still waiting
+    applicants = _applicants(*[(f'GEN {rank}', rank, 'GEN', ['CS']) for rank in range(1, 9)],
+                             ('ST 9', 9, 'ST', ['CS']), ('ST 10', 10, 'ST', ['CS']),
+                             ('GEN 11', 11, 'GEN', ['CS']))
+    allotment_df, summary_df = allot_seats(applicants, {'CS': 10}, {'SC': 10, 'ST': 10})
+    allotted = _allotted(allotment_df)
+    assert allotted['ST 9'] == ('CS', 'ST') and allotted['ST 10'] == ('CS', 'ST')
+    assert 'GEN 11' not in allotted
+    assert _seats(summary_df, 'CS', 'SC') == [1, 0, 0, 0]
+    assert _seats(summary_df, 'CS', 'ST') == [1, 2, 2, 0]
+
+
+def test_unfilled_reserved_seats_otherwise_go_to_open_merit():
+    applicants = _applicants(*[(f'GEN {rank}', rank, 'GEN', ['CS']) for rank in range(1, 10)],
+                             ('ETB 10', 10, 'ETB', ['BIO']))
+    allotment_df, summary_df = allot_seats(applicants, {'CS': 10}, {'SC': 10, 'MUSLIM': 10})
+    allotted = _allotted(allotment_df)
+    # Both reserved seats found no taker and were released to merit
+    assert len(allotted) == 9 and all(quota == OPEN for _, quota in allotted.values())
+    assert _seats(summary_df, 'CS', OPEN) == [8, 10, 9, 1]
+
+
+def test_equal_ranks_are_allotted_in_list_order():
+    applicants = _applicants(('FIRST', 3, 'GEN', ['CS']), ('SECOND', 3, 'GEN', ['CS', 'BIO']),
+                             ('THIRD', 3, 'GEN', ['CS', 'BIO']))
+    allotment_df, _ = allot_seats(applicants, {'CS': 1, 'BIO': 1}, {})
+    assert _allotted(allotment_df) == {'FIRST': ('CS', OPEN), 'SECOND': ('BIO', OPEN)}
+    assert allotment_df['Choice'].tolist()[:2] == [1, 2]
+
+
+def test_students_already_admitted_keep_their_seats():
+    admitted = pd.DataFrame({'Name': ['OLD 1', 'OLD 2'], 'Rank': [1, 2], 'Stream': ['CS', 'CS'],
+                             'Caste': ['GEN', 'SC']})
+    applicants = _applicants(('NEW 3', 3, 'GEN', ['CS']), ('NEW 4', 4, 'SC', ['CS']),
+                             ('NEW 5', 5, 'GEN', ['CS']))
+    allotment_df, summary_df = allot_seats(applicants, {'CS': 4}, {'SC': 25}, admitted_df=admitted)
+    assert _allotted(allotment_df) == {'NEW 3': ('CS', OPEN), 'NEW 4': ('CS', 'SC')}
+    assert _seats(summary_df, 'CS', OPEN) == [3, 1, 1, 0]
+    assert _seats(summary_df, 'CS', 'SC') == [1, 1, 1, 0]
+
+
+@pytest.mark.parametrize('total', range(0, 121, 7))
+def test_fractional_percentages_add_up_to_the_seats(total):
+    reservation = {'SC': 12, 'ST': 8, 'ETB': 7.5, 'MUSLIM': 2.5, 'OBCHRISTIAN': 0.5}
+    assert sum(seat_matrix({'CS': total}, reservation)['CS'].values()) == total
+
+
+def test_fractional_percentages_are_rounded_by_largest_remainder():
+    # Shares of 7 seats: SC 0.84, ST 0.56, ETB 0.525, MUSLIM 0.175, OPEN 4.9
+    assert seat_matrix({'BIO': 7}, {'SC': 12, 'ST': 8, 'ETB': 7.5, 'MUSLIM': 2.5}) == {
+        'BIO': {'SC': 1, 'ST': 1, 'ETB': 0, 'MUSLIM': 0, OPEN: 5}}
+    # 2.5% of 40 seats is one whole seat, which int(percent) used to drop
+    assert seat_matrix({'CS': 40}, {'MUSLIM': 2.5})['CS'] == {'MUSLIM': 1, OPEN: 39}
+
+
+def test_reservation_over_100_percent_is_rejected():
+    with pytest.raises(ValueError):
+        seat_matrix({'CS': 10}, {'SC': 60, 'ST': 40.5})
+
+
+def test_negative_seats_are_rejected():
+    with pytest.raises(ValueError, match='BIO'):
+        seat_matrix({'CS': 10, 'BIO': -5}, {'SC': 8})
+    # The page shows the error allot_seats raises
+    with pytest.raises(ValueError, match='negative'):
+        allot_seats(_applicants(('ANU K', 1, 'GEN', 'CS')), {'CS': -1}, {'SC': 8})
@@ -0,0 +1,78 @@
+import time
+
+import pandas as pd
+import pytest
+
+from admission.analytics import AnalyticsWorker, build_tables
+from admission.roster import RosterStore
+from admission.storage import get_backend
+
+
+def _student(i, stream, caste='GEN', language='MAL'):
+    return {'Name': f'STUDENT {i}', 'Rank': i, 'Stream': stream, 'Second_Language': language,
+            'Caste': caste, 'Admission_Status': 'PERMANENT',
+            'Date_of_Admission': f'2025-06-{i % 28 + 1:02d}'}
+
+
+@pytest.fixture
+def roster(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    yield RosterStore(backend)
+    backend.close()
+
+
+def _rows(table):
+    # Counts that tie come in the order the values were first counted
+    return table.sort_values(list(table.columns)).reset_index(drop=True)
+
+
+def _wait_for(worker, generation, timeout=10):
+    deadline = time.monotonic() + timeout
+    while worker.snapshot().generation != generation:
+        assert time.monotonic() < deadline, "no snapshot of the latest generation"
+        time.sleep(0.01)
+
+
+def test_a_burst_of_writes_is_rebuilt_once(roster):
+    worker = AnalyticsWorker(roster, debounce=0.5, max_delay=10)
+    rebuilds = []
+    build = worker._build
+
+    def counted_build():
+        rebuilds.append(roster.generation('students'))
+        return build()
+
+    worker._build = counted_build
+    try:
+        for i in range(1, 21):
+            roster.admit(_student(i, ['BIO', 'CS', 'HUM', 'COM'][i % 4]))
+        _wait_for(worker, roster.generation('students'))
+        # Nothing is rebuilt once the burst is published
+        time.sleep(0.7)
+    finally:
+        worker.stop()
+    assert len(rebuilds) == 1
+    assert worker.snapshot()['stream_counts']['Count'].sum() == 20
+
+
+def test_snapshots_match_tables_built_from_storage(roster, tmp_path):
+    worker = AnalyticsWorker(roster, debounce=0.05, max_delay=1)
+    try:
+        for i, (stream, caste, language) in enumerate([
+                ('CS', 'SC', 'HIN'), ('BIO', 'GEN', 'MAL'), ('CS', 'ST', 'SKT'),
+                ('COM', 'SC', 'MAL'), ('HUM', 'GEN', 'HIN')], 1):
+            roster.admit(_student(i, stream, caste, language))
+        roster.issue_tc({**_student(3, 'CS'), 'TC_Date': '2025-07-01'})
+        _wait_for(worker, roster.generation('students'))
+        snapshot = worker.snapshot()
+    finally:
+        worker.stop()
+
+    reloaded = get_backend('sqlite', str(tmp_path))
+    try:
+        expected = build_tables(RosterStore(reloaded).aggregates)
+    finally:
+        reloaded.close()
+    assert set(snapshot.tables) == set(expected)
+    for name, table in expected.items():
+        pd.testing.assert_frame_equal(_rows(snapshot[name]), _rows(table), obj=name)
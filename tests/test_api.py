@@ -0,0 +1,97 @@
+import asyncio
+import json
+import socket
+from http import HTTPStatus
+
+import pytest
+
+from admission.api import AdmissionAPI, serve_in_thread
+from admission.core import AdmissionService
+from admission.storage import get_backend
+
+
+def _student(name, stream, rank):
+    return {'Name': name, 'Rank': rank, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+@pytest.fixture
+def api(tmp_path):
+    service = AdmissionService(get_backend('sqlite', str(tmp_path)))
+    yield AdmissionAPI(service)
+    service.analytics.stop()
+    service.backend.close()
+
+
+def _call(api, method, target, body=None):
+    raw_body = body if isinstance(body, bytes) else json.dumps(body).encode() if body else b''
+    return asyncio.run(api.dispatch(method, target, raw_body))
+
+
+def test_post_admissions_admits_all_rows(api):
+    status, payload = _call(api, 'POST', '/admissions',
+                            [_student('ANU K', 'CS', 1), _student('BINU P', 'BIO', 2)])
+    assert status == HTTPStatus.CREATED
+    assert payload == {'version': api.service.version, 'admitted': 2}
+    assert api.service.summary()['students'] == 2
+
+
+def test_post_admissions_rejects_invalid_rows(api):
+    status, payload = _call(api, 'POST', '/admissions',
+                            [_student('ANU K', 'CS', 1), _student('BINU P', 'ARTS', 2),
+                             _student('anu  k', 'BIO', 3)])
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert [row['Row'] for row in payload['rows']] == [3, 4]
+    assert api.service.summary()['students'] == 0
+
+
+def test_post_admissions_conflicts_with_a_name_admitted_meanwhile(api, monkeypatch):
+    _call(api, 'POST', '/admissions', _student('ANU K', 'CS', 1))
+    # Validation ran before the other admission of the name committed
+    monkeypatch.setattr(api.service, 'existing_names', lambda names: [])
+    status, payload = _call(api, 'POST', '/admissions', _student('ANU K', 'BIO', 5))
+    assert status == HTTPStatus.CONFLICT
+    assert 'ANU K' in payload['error']
+    assert api.service.summary()['students'] == 1
+
+
+def test_post_with_bad_json_is_a_bad_request(api):
+    status, payload = _call(api, 'POST', '/admissions', b'{"Name": ')
+    assert status == HTTPStatus.BAD_REQUEST
+    assert payload == {'error': "Request body is not valid JSON"}
+
+
+def test_post_tc_removes_students(api):
+    _call(api, 'POST', '/admissions', [_student('ANU K', 'CS', 1), _student('BINU P', 'BIO', 2)])
+    request = {'Name': 'ANU K', 'Stream': 'CS', 'Rank': 1, 'TC_Reason': 'Moved'}
+    status, payload = _call(api, 'POST', '/tc', request)
+    assert status == HTTPStatus.OK
+    assert payload['issued'] == 1
+    assert api.service.students()['Name'].tolist() == ['BINU P']
+    assert api.service.tc_records()['TC_Reason'].tolist() == ['Moved']
+
+    status, _ = _call(api, 'POST', '/tc', request)
+    assert status == HTTPStatus.NOT_FOUND
+
+
+def test_changes_pages_follow_the_cursor(api):
+    for rank, name in enumerate(['ANU K', 'BINU P', 'CINU R', 'DIYA S', 'EBIN T'], 1):
+        _call(api, 'POST', '/admissions', _student(name, 'CS', rank))
+    seqs, cursor = [], 0
+    while True:
+        status, page = _call(api, 'GET', f'/changes?after={cursor}&limit=2')
+        assert status == HTTPStatus.OK
+        if not page['changes']:
+            break
+        seqs += [change['seq'] for change in page['changes']]
+        cursor = page['cursor']
+    assert seqs == list(range(1, 6))
+    assert cursor == page['latest'] == 5
+
+
+def test_serve_in_thread_reports_a_busy_port(api):
+    with socket.socket() as busy:
+        busy.bind(('127.0.0.1', 0))
+        busy.listen()
+        with pytest.raises(OSError):
+            serve_in_thread(api, '127.0.0.1', busy.getsockname()[1])
@@ -0,0 +1,19 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from admission.certificates import _value
+
+
+@pytest.mark.parametrize('value, text', [
+    (pd.Timestamp('2025-04-02'), '2025-04-02'),
+    (datetime.date(2025, 4, 2), '2025-04-02'),
+    (pd.NaT, '-'),
+    (None, '-'),
+    ('  ', '-'),
+    (12, '12'),
+    ('MOVED', 'MOVED'),
+])
+def test_value(value, text):
+    assert _value({'TC_Date': value}, 'TC_Date') == text
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from admission.changes import FORMATS, file_name, read_changes, replay, serialize
+from admission.constants import DATA_FILE, STUDENT_COLUMNS, TC_COLUMNS
+from admission.roster import RosterStore
+from admission.storage import get_backend
+
+
+def _student(i, stream='CS'):
+    return {'Name': f'STUDENT {i}', 'Rank': i, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+def _tc(i, stream='CS', reason=None):
+    tc = {**_student(i, stream), 'TC_Date': '2025-07-01'}
+    return {**tc, 'TC_Reason': reason} if reason else tc
+
+
+def _text(frame, columns):
+    # Stored and replayed tables compared as the text they hold
+    frame = frame.reindex(columns=columns)
+    return frame.astype(object).where(frame.notna(), '').astype(str).values.tolist()
+
+
+@pytest.fixture(params=['sqlite', 'csv'])
+def backend(request, tmp_path):
+    # Rows stored before the change log are its baseline events
+    pd.DataFrame([_student(i) for i in (1, 2)]).to_csv(tmp_path / DATA_FILE, index=False)
+    backend = get_backend(request.param, str(tmp_path))
+    yield backend
+    backend.close()
+
+
+def _export(path, changes_df, fmt):
+    path.write_bytes(serialize(changes_df, fmt))
+    return read_changes(str(path))
+
+
+@pytest.mark.parametrize('fmt', list(FORMATS))
+def test_exports_replay_to_the_stored_tables(backend, tmp_path, fmt):
+    roster = RosterStore(backend)
+    roster.admit(_student(3, 'BIO'))
+    first = backend.changes()
+    roster.admit_many(pd.DataFrame([_student(i, 'COM') for i in (4, 5, 6)]))
+    roster.issue_tc(_tc(1, reason='Moved'))
+    roster.issue_tcs(pd.DataFrame([{'Name': 'STUDENT 5', 'Stream': 'COM', 'Rank': 5}]),
+                     '2025-07-02')
+    last = int(first['seq'].iloc[-1])
+    second = backend.changes(last)
+
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    files = [exports / file_name(0, last, fmt),
+             exports / file_name(last, backend.last_change(), fmt)]
+    changes_df = pd.concat([_export(files[0], first, fmt), _export(files[1], second, fmt)],
+                           ignore_index=True)
+    students_df, tc_df = replay(changes_df)
+    assert _text(students_df, STUDENT_COLUMNS) == _text(backend.load_students(), STUDENT_COLUMNS)
+    assert _text(tc_df, TC_COLUMNS) == _text(backend.load_tc(), TC_COLUMNS)
+    assert _text(tc_df, ['Name', 'TC_Reason']) == [['STUDENT 1', 'Moved'], ['STUDENT 5', '']]
+
+
+def test_the_cursor_resumes_without_gaps(backend):
+    roster = RosterStore(backend)
+    seqs, cursor = [], 0
+    for i in range(3, 13):
+        roster.admit(_student(i))
+        if i % 3 == 0:
+            roster.issue_tc(_tc(i))
+        # A consumer syncing between writes, a page at a time
+        while True:
+            page = backend.changes(cursor, 2)
+            if page.empty:
+                break
+            seqs += page['seq'].tolist()
+            cursor = int(page['seq'].iloc[-1])
+    assert seqs == list(range(1, backend.last_change() + 1))
+    assert backend.changes(cursor).empty
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import pytest
+
+from admission.changes import baseline_events
+from admission.journal import OP_ADMIT, OP_TC, AdmissionJournal, JournalWriteError
+
+
+def _student(i):
+    return {'Name': f'STUDENT {i}', 'Rank': i, 'Stream': 'CS', 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+def _tc(i):
+    return {**_student(i), 'TC_Date': '2025-07-01'}
+
+
+def _names(frame):
+    return sorted(frame['Name'])
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = AdmissionJournal(str(tmp_path), compact_every=10_000)
+    journal.start_change_log(baseline_events)
+    yield journal
+    journal.close()
+
+
+def test_replay_skips_a_torn_last_line(tmp_path, journal):
+    for i in range(1, 4):
+        journal.append_admission(_student(i))
+    journal.close()
+    # A crash half way through the fourth write
+    with open(journal.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 4, "time": "2025-06-02T10:00:00", "op": "admit", "student": {"Na')
+
+    reopened = AdmissionJournal(str(tmp_path))
+    try:
+        students, _ = reopened.load()
+        assert _names(students) == ['STUDENT 1', 'STUDENT 2', 'STUDENT 3']
+        assert reopened.last_seq == 3
+        # The next record starts on a line of its own and is read back
+        assert reopened.append_admission(_student(5)) == 4
+        students, _ = reopened.load()
+        assert _names(students) == ['STUDENT 1', 'STUDENT 2', 'STUDENT 3', 'STUDENT 5']
+        assert [r['seq'] for r in reopened.changes()] == [1, 2, 3, 4]
+    finally:
+        reopened.close()
+
+
+def test_compaction_keeps_every_record(tmp_path, journal):
+    journal.append_admissions([_student(i) for i in range(1, 21)])
+    journal.append_tcs([_tc(i) for i in (3, 7)])
+    before = journal.load()
+    events = journal.changes()
+
+    journal.compact()
+    assert not os.path.exists(journal.compacting_path)
+    for frame, expected in zip(journal.load(), before):
+        assert _names(frame) == _names(expected)
+    assert journal.changes() == events
+
+    # Records written after a compaction survive the next one and a restart
+    journal.append_admission(_student(21))
+    journal.append_tc(_tc(1))
+    journal.compact()
+    journal.close()
+    reopened = AdmissionJournal(str(tmp_path))
+    try:
+        students, tc = reopened.load()
+        assert _names(students) == sorted(
+            f'STUDENT {i}' for i in range(2, 22) if i not in (3, 7))
+        assert _names(tc) == ['STUDENT 1', 'STUDENT 3', 'STUDENT 7']
+        assert [r['seq'] for r in reopened.changes()] == list(range(1, 25))
+        assert [r['op'] for r in reopened.changes(22)] == [OP_ADMIT, OP_TC]
+    finally:
+        reopened.close()
+
+
+def test_concurrent_appends_share_fsyncs(journal, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        # A disk flush takes a while; writers arriving meanwhile queue up
+        fsyncs.append(fd)
+        time.sleep(0.005)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', slow_fsync)
+    writers = 32
+    start = threading.Barrier(writers)
+    seqs = []
+
+    def admit(i):
+        start.wait()
+        seqs.append(journal.append_admission(_student(i)))
+
+    threads = [threading.Thread(target=admit, args=(i,)) for i in range(1, writers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(seqs) == list(range(1, writers + 1))
+    students, _ = journal.load()
+    assert _names(students) == sorted(f'STUDENT {i}' for i in range(1, writers + 1))
+    assert len(fsyncs) < writers
+
+
+def test_changes_after_a_cursor(journal):
+    journal.append_admissions([_student(i) for i in range(1, 6)])
+    journal.compact()
+    journal.append_tc(_tc(2))
+    journal.compact()
+    journal.append_admission(_student(6))
+    journal.append_tc(_tc(4))
+    last = journal.last_seq
+    assert last == 8
+    for after in range(last + 1):
+        assert [r['seq'] for r in journal.changes(after)] == list(range(after + 1, last + 1))
+    assert journal.changes(last) == []
+
+
+class _FailingFile:
+    # Writes half of the first batch it is given, then fails like a full disk
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, text):
+        self.file.write(text[:len(text) // 2])
+        self.file.flush()
+        raise OSError(28, 'No space left on device')
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_a_failed_write_is_cut_off_the_journal(tmp_path, journal):
+    journal.append_admission(_student(1))
+    journal._file = _FailingFile(journal._file)
+    with pytest.raises(JournalWriteError):
+        journal.append_admissions([_student(2), _student(3)])
+
+    journal.append_admission(_student(4))
+    students, _ = journal.load()
+    assert _names(students) == ['STUDENT 1', 'STUDENT 4']
+    journal.close()
+    reopened = AdmissionJournal(str(tmp_path))
+    try:
+        assert _names(reopened.load()[0]) == ['STUDENT 1', 'STUDENT 4']
+        with open(reopened.journal_path, encoding='utf-8') as f:
+            assert [line.count('"seq"') for line in f] == [1, 1]
+    finally:
+        reopened.close()
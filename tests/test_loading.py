@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+from admission.loading import load_clean
+from admission.storage import get_backend
+
+STORED = """Name,Rank,Stream,Second_Language,Caste,Admission_Status,Date_of_Admission
+APIN ,1,BIO,MAL,GEN,PERMANENT,2025-04-02
+bob,2,cs,HIN,SC,TEMPORARY,2025-04-03
+CAT,3,XX,MAL,SC,PERMANENT,2025-06-01
+"""
+
+
+@pytest.fixture
+def backend(tmp_path):
+    (tmp_path / 'admission_data.csv').write_text(STORED)
+    backend = get_backend('sqlite', str(tmp_path))
+    yield backend
+    backend.close()
+
+
+def test_cached_tables_match_a_fresh_load(backend):
+    fresh = load_clean(backend, cache=False)
+    load_clean(backend)
+    cached = load_clean(backend)
+    pd.testing.assert_frame_equal(cached.students, fresh.students)
+    pd.testing.assert_frame_equal(cached.tc, fresh.tc)
+    # The report's raw values: compared as text, missing values blank
+    pd.testing.assert_frame_equal(cached.quarantine.fillna('').astype(str),
+                                  fresh.quarantine.fillna('').astype(str))
+    assert cached.stored_keys == fresh.stored_keys == {
+        ('APIN', 'BIO', 1): ('APIN ', 'BIO'), ('BOB', 'CS', 2): ('bob', 'cs')}
+    assert cached.version == backend.data_version()
+
+
+def test_cache_is_not_a_pickle(backend):
+    load_clean(backend)
+    files = sorted(f for f in os.listdir(backend.directory) if f.startswith('admission_clean'))
+    assert files and all(f.endswith('.feather') for f in files)
+
+
+def test_cache_is_rebuilt_after_a_write(backend):
+    load_clean(backend)
+    backend.add_student({'Name': 'DAN', 'Rank': 4, 'Stream': 'HUM', 'Second_Language': 'MAL',
+                         'Caste': 'GEN', 'Admission_Status': 'PERMANENT',
+                         'Date_of_Admission': '2025-06-02'})
+    assert 'DAN' in load_clean(backend).students['Name'].tolist()
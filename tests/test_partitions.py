@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from admission.partitions import PartitionCatalog
+
+
+def _student(name, stream, rank):
+    return {'Name': name, 'Rank': rank, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+def _files(root):
+    # Every file under root, leaving out SQLite's own -wal/-shm companions
+    return sorted(os.path.relpath(os.path.join(d, f), root)
+                  for d, _, names in os.walk(root) for f in names
+                  if not f.endswith(('-wal', '-shm')))
+
+
+@pytest.mark.parametrize('kind', ['sqlite', 'csv'])
+def test_summaries_of_closed_partitions_write_nothing(tmp_path, kind):
+    writer = PartitionCatalog(str(tmp_path), kind=kind)
+    service = writer.create('GHSS TEST', 2025)
+    service.admit(_student('ANU K', 'CS', 1))
+    service.admit(_student('BINU P', 'BIO', 2))
+    writer.close()
+    before = _files(tmp_path)
+
+    reader = PartitionCatalog(str(tmp_path), kind=kind)
+    summaries = reader.summaries()
+    assert _files(tmp_path) == before
+    assert summaries[['School', 'Year', 'Students', 'TCs', 'BIO', 'CS']].values.tolist() == [
+        ['GHSS TEST', 2025, 2, 0, 1, 1]]
+
+
+def test_partitions_skip_files_beside_the_schools(tmp_path):
+    catalog = PartitionCatalog(str(tmp_path))
+    catalog.create('GHSS TEST', 2025).admit(_student('ANU K', 'CS', 1))
+    with open(tmp_path / 'schools' / 'notes.txt', 'w') as f:
+        f.write('shared notes')
+    assert catalog.partitions() == [('GHSS TEST', 2025)]
+    catalog.close()
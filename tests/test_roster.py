@@ -0,0 +1,187 @@
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from admission.core import AdmissionService
+from admission.roster import (DuplicateStudentError, RosterConflictError, RosterStore,
+                              StudentNotFoundError)
+from admission.storage import get_backend
+
+
+def _student(name, stream, rank):
+    return {'Name': name, 'Rank': rank, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+@pytest.fixture
+def roster(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    roster = RosterStore(backend)
+    for student in [_student('ARJUN SURESH K M', 'CS', 10),
+                    _student('MUHAMMED ASHIK', 'BIO', 4),
+                    _student('FATHIMA NASRIN', 'HUM', 7)]:
+        roster.admit(student)
+    yield roster
+    backend.close()
+
+
+@pytest.mark.parametrize('name, stream, rank', [
+    ('ARJUN SURESH K B', 'CS', 11),
+    ('ARJUN SURESH K B', 'BIO', 10),
+    ('MUHAMMED ASHIQ', 'BIO', 5),
+    ('FATHIMA NASRIN P', 'COM', 7),
+])
+def test_near_namesakes_are_not_possible_duplicates(roster, name, stream, rank):
+    assert roster.similar_names(name)
+    assert roster.possible_duplicates(name, stream, rank) == []
+    roster.admit(_student(name, stream, rank))
+
+
+def test_typo_with_same_stream_and_rank_is_a_possible_duplicate(roster):
+    assert roster.possible_duplicates('ARJUN SURESH KM', 'CS', 10) == [
+        ('ARJUN SURESH K M', 'CS', 10)]
+    assert roster.possible_duplicates('muhammed  ashiq', 'BIO', 4) == [
+        ('MUHAMMED ASHIK', 'BIO', 4)]
+
+
+def test_the_same_name_is_not_its_own_duplicate(roster):
+    assert roster.possible_duplicates('ARJUN SURESH K M', 'CS', 10) == []
+
+
+def test_a_write_against_an_old_version_conflicts(roster):
+    version = roster.version
+    roster.admit(_student('BINU P', 'COM', 3), expected_version=version)
+    with pytest.raises(RosterConflictError):
+        roster.admit(_student('CINU R', 'COM', 5), expected_version=version)
+
+
+def test_concurrent_admits_of_one_name_admit_it_once(tmp_path, monkeypatch):
+    service = AdmissionService(get_backend('sqlite', str(tmp_path)))
+    add_student = service.backend.add_student
+
+    def slow_add_student(student):
+        # Keeps the first write in flight while the second one starts
+        time.sleep(0.2)
+        add_student(student)
+
+    monkeypatch.setattr(service.backend, 'add_student', slow_add_student)
+    version = service.version
+    start = threading.Barrier(2)
+    outcomes = []
+
+    def admit(stream, rank):
+        start.wait()
+        try:
+            outcomes.append(service.admit(_student('ANU K', stream, rank), version))
+        except DuplicateStudentError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=admit, args=args) for args in [('CS', 1), ('BIO', 2)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.analytics.stop()
+
+    assert sorted(type(outcome).__name__ for outcome in outcomes) == [
+        'DuplicateStudentError', 'int']
+    assert service.students()['Name'].tolist() == ['ANU K']
+    assert service.backend.load_students()['Name'].tolist() == ['ANU K']
+    service.backend.close()
+
+
+def test_admit_many_commits_every_row(roster):
+    version = roster.version
+    assert roster.admit_many(pd.DataFrame([_student('ANU K', 'CS', 1),
+                                           _student('BINU P', 'COM', 2)])) == version + 1
+    assert roster.snapshot()[1]['Name'].tolist()[-2:] == ['ANU K', 'BINU P']
+    assert roster.aggregates.total == 5
+
+
+@pytest.mark.parametrize('batch', [
+    # A name on the roster, spelled as typed
+    [_student('ANU K', 'CS', 1), _student('fathima  nasrin', 'COM', 2)],
+    # The same name twice in the batch
+    [_student('ANU K', 'CS', 1), _student('BINU P', 'COM', 2), _student('Anu K', 'BIO', 3)],
+])
+def test_admit_many_admits_nothing_when_a_name_is_taken(roster, tmp_path, batch):
+    version = roster.version
+    with pytest.raises(DuplicateStudentError):
+        roster.admit_many(pd.DataFrame(batch))
+    assert roster.version == version
+    assert roster.aggregates.total == 3
+    assert roster.snapshot()[1]['Name'].tolist() == [
+        'ARJUN SURESH K M', 'MUHAMMED ASHIK', 'FATHIMA NASRIN']
+    stored = get_backend('sqlite', str(tmp_path))
+    assert len(stored.load_students()) == 3
+    stored.close()
+    # The rejected names are not left reserved
+    roster.admit(_student('ANU K', 'CS', 1))
+
+
+def _tc_requests(*keys):
+    return pd.DataFrame([{'Name': name, 'Stream': stream, 'Rank': rank}
+                         for name, stream, rank in keys])
+
+
+def _unchanged(roster, tmp_path, version):
+    assert roster.version == version
+    assert roster.snapshot()[1]['Name'].tolist() == [
+        'ARJUN SURESH K M', 'MUHAMMED ASHIK', 'FATHIMA NASRIN']
+    assert roster.tc_snapshot()[1].empty
+    stored = get_backend('sqlite', str(tmp_path))
+    assert len(stored.load_students()) == 3
+    assert stored.load_tc().empty
+    stored.close()
+
+
+def test_issue_tcs_removes_every_listed_student(roster):
+    requests_df = _tc_requests(('ARJUN SURESH K M', 'CS', 10), ('FATHIMA NASRIN', 'HUM', 7))
+    requests_df['TC_Reason'] = ['Moved', '']
+    roster.issue_tcs(requests_df, '2025-07-01')
+    assert roster.snapshot()[1]['Name'].tolist() == ['MUHAMMED ASHIK']
+    tc_df = roster.tc_snapshot()[1]
+    assert tc_df['Name'].tolist() == ['ARJUN SURESH K M', 'FATHIMA NASRIN']
+    assert tc_df['TC_Reason'].tolist()[0] == 'Moved'
+    assert pd.isna(tc_df['TC_Reason'].tolist()[1])
+    assert roster.aggregates.total == 1
+
+
+def test_issue_tcs_with_an_unknown_student_issues_none(roster, tmp_path):
+    version = roster.version
+    with pytest.raises(StudentNotFoundError, match='NOBODY'):
+        roster.issue_tcs(_tc_requests(('MUHAMMED ASHIK', 'BIO', 4), ('NOBODY', 'CS', 1),
+                                      ('FATHIMA NASRIN', 'COM', 7)), '2025-07-01')
+    _unchanged(roster, tmp_path, version)
+
+
+def test_issue_tcs_with_a_student_listed_twice_issues_none(roster, tmp_path):
+    version = roster.version
+    with pytest.raises(ValueError, match='more than once'):
+        roster.issue_tcs(_tc_requests(('MUHAMMED ASHIK', 'BIO', 4), ('FATHIMA NASRIN', 'HUM', 7),
+                                      ('muhammed  ashik', 'BIO', 4)), '2025-07-01')
+    _unchanged(roster, tmp_path, version)
+
+
+def test_issue_tcs_commits_all_or_nothing(roster, tmp_path):
+    version = roster.version
+    # The second TC record fails to store after the first was written
+    conn = sqlite3.connect(tmp_path / 'admission.db')
+    conn.execute("CREATE TRIGGER fail_tc BEFORE INSERT ON tc_records "
+                 "WHEN NEW.Name = 'FATHIMA NASRIN' BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+    conn.commit()
+    with pytest.raises(sqlite3.DatabaseError):
+        roster.issue_tcs(_tc_requests(('MUHAMMED ASHIK', 'BIO', 4), ('FATHIMA NASRIN', 'HUM', 7)),
+                         '2025-07-01')
+    _unchanged(roster, tmp_path, version)
+
+    # The students are not left reserved
+    conn.execute("DROP TRIGGER fail_tc")
+    conn.commit()
+    conn.close()
+    roster.issue_tcs(_tc_requests(('MUHAMMED ASHIK', 'BIO', 4), ('FATHIMA NASRIN', 'HUM', 7)),
+                     '2025-07-01')
+    assert roster.snapshot()[1]['Name'].tolist() == ['ARJUN SURESH K M']
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+
+from admission.constants import DATA_FILE, DB_FILE, TC_FILE
+from admission.storage import get_backend, migrate_csv_to_sqlite
+
+
+def _student(name, stream, rank):
+    return {'Name': name, 'Rank': rank, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02'}
+
+
+def test_csv_data_is_migrated_once(tmp_path):
+    pd.DataFrame([_student('ANU K', 'CS', 1), _student('BINU P', 'BIO', 2)]).to_csv(
+        tmp_path / DATA_FILE, index=False)
+    pd.DataFrame([{**_student('OLD STUDENT', 'HUM', 3), 'TC_Date': '2025-06-01'}]).to_csv(
+        tmp_path / TC_FILE, index=False)
+
+    backend = get_backend('sqlite', str(tmp_path))
+    assert os.path.exists(tmp_path / DB_FILE)
+    assert backend.load_students()['Name'].tolist() == ['ANU K', 'BINU P']
+    assert backend.load_tc()[['Name', 'TC_Date']].values.tolist() == [['OLD STUDENT', '2025-06-01']]
+    assert backend.get_meta('migrated_from_csv')
+    # The TC record is logged as an admission and its TC
+    assert backend.changes()['op'].tolist() == ['admit', 'admit', 'admit', 'tc']
+
+    # Students added after the migration are not imported a second time
+    (tmp_path / DATA_FILE).unlink()
+    pd.DataFrame([_student('CINU R', 'COM', 4)]).to_csv(tmp_path / DATA_FILE, index=False)
+    assert not migrate_csv_to_sqlite(backend, str(tmp_path))
+    assert backend.load_students()['Name'].tolist() == ['ANU K', 'BINU P']
+    backend.close()
+
+
+def test_nothing_to_migrate(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    assert backend.load_students().empty
+    assert backend.get_meta('migrated_from_csv') == 'nothing to migrate'
+    backend.close()
+
+
+def test_students_and_tcs_round_trip(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    backend.add_student(_student('ANU K', 'CS', 1))
+    backend.add_students(pd.DataFrame([_student('BINU P', 'BIO', 2), _student('CINU R', 'COM', 4)]))
+    backend.issue_tc({**_student('BINU P', 'BIO', 2), 'TC_Date': '2025-07-01',
+                      'TC_Reason': 'Moved'})
+    backend.close()
+
+    reopened = get_backend('sqlite', str(tmp_path))
+    students_df = reopened.load_students()
+    assert students_df.to_dict('records') == [_student('ANU K', 'CS', 1),
+                                              _student('CINU R', 'COM', 4)]
+    assert reopened.load_tc().to_dict('records') == [
+        {**_student('BINU P', 'BIO', 2), 'TC_Date': '2025-07-01', 'TC_Reason': 'Moved'}]
+    assert reopened.last_change() == 4
+    reopened.close()
+
+
+def test_tc_records_without_reasons_have_no_reason_column(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    backend.add_students(pd.DataFrame([_student('ANU K', 'CS', 1), _student('BINU P', 'BIO', 2)]))
+    backend.issue_tcs(pd.DataFrame([{**_student('ANU K', 'CS', 1), 'TC_Date': '2025-07-01'}]))
+    assert 'TC_Reason' not in backend.load_tc().columns
+    assert backend.load_students()['Name'].tolist() == ['BINU P']
+    backend.close()
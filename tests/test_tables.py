@@ -0,0 +1,29 @@
+import pytest
+
+from admission.roster import RosterStore
+from admission.storage import get_backend
+from admission.tables import matching_rows
+
+
+@pytest.fixture
+def roster(tmp_path):
+    backend = get_backend('sqlite', str(tmp_path))
+    roster = RosterStore(backend)
+    for rank, name in enumerate(['ARJUN SURESH K M', 'ARJUN SURESH K B', 'ARJUNA P', 'ÉMILE'], 1):
+        roster.admit({'Name': name, 'Rank': rank, 'Stream': 'CS', 'Second_Language': 'MAL',
+                      'Caste': 'GEN', 'Admission_Status': 'PERMANENT',
+                      'Date_of_Admission': '2025-06-02'})
+    yield roster
+    backend.close()
+
+
+@pytest.mark.parametrize('search, names', [
+    ('', ['ARJUN SURESH K B', 'ARJUN SURESH K M', 'ARJUNA P', 'ÉMILE']),
+    ('arjun suresh k', ['ARJUN SURESH K B', 'ARJUN SURESH K M']),
+    ('  Arjun   Suresh  K ', ['ARJUN SURESH K B', 'ARJUN SURESH K M']),
+    ('ARJUN\tSURESH K M', ['ARJUN SURESH K M']),
+    ('Émile', ['ÉMILE']),
+    ('ARJUNS', []),
+])
+def test_search_is_normalized_like_the_names(roster, search, names):
+    assert matching_rows(roster, 'students', search)['Name'].tolist() == names
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from admission.timeseries import BUCKETS, MAX_MARKS, bucket_counts, bucket_totals, choose_bucket
+
+
+def _daily(rows):
+    return pd.DataFrame({
+        'Date_of_Admission': pd.to_datetime([date for date, _, _ in rows]),
+        'Stream': pd.Categorical([stream for _, stream, _ in rows],
+                                 categories=['BIO', 'CS', 'HUM', 'COM']),
+        'Count': [count for _, _, count in rows],
+    })
+
+
+@pytest.mark.parametrize('start, end, series, bucket', [
+    ('2025-06-01', '2025-06-30', 4, 'Day'),
+    ('2025-01-01', '2025-12-31', 1, 'Day'),
+    ('2025-01-01', '2025-12-31', 4, 'Week'),
+    ('2021-01-01', '2025-12-31', 4, 'Month'),
+    ('2005-01-01', '2025-12-31', 4, 'Quarter'),
+    ('1950-01-01', '2025-12-31', 4, 'Year'),
+])
+def test_the_finest_bucket_within_max_marks_is_chosen(start, end, series, bucket):
+    assert choose_bucket(start, end, series) == bucket
+    # Every day in the range admitted someone: each bucket is a mark
+    days = pd.date_range(start, end)
+    daily = pd.DataFrame({'Date_of_Admission': days, 'Count': 1})
+    names = list(BUCKETS)
+    assert len(bucket_totals(daily, start, end, bucket)) * series <= MAX_MARKS
+    if bucket != 'Day':
+        finer = names[names.index(bucket) - 1]
+        assert len(bucket_totals(daily, start, end, finer)) * series > MAX_MARKS
+
+
+def test_the_coarsest_bucket_is_the_last_resort():
+    assert choose_bucket('1700-01-01', '2025-12-31', series=4) == 'Year'
+
+
+def test_no_bucket_finer_than_asked_for():
+    assert choose_bucket('2025-06-01', '2025-06-07', finest='Month') == 'Month'
+    assert choose_bucket('2025-06-01', '2025-06-07', max_marks=3) == 'Week'
+
+
+def test_bucket_counts_sum_days_and_drop_empty_buckets():
+    daily = _daily([
+        ('2025-06-02', 'CS', 1),   # Monday
+        ('2025-06-04', 'BIO', 2),
+        ('2025-06-08', 'CS', 3),   # Sunday, still the week of 2 June
+        ('2025-06-09', 'CS', 4),
+        ('2025-06-09', 'BIO', 0),
+        ('2025-06-30', 'BIO', 5),
+        ('2025-07-01', 'CS', 6),   # outside the range
+    ])
+    counts = bucket_counts(daily, '2025-06-01', '2025-06-30', 'Week')
+    assert counts.astype({'Stream': str}).values.tolist() == [
+        [pd.Timestamp('2025-06-02'), 'BIO', 2],
+        [pd.Timestamp('2025-06-02'), 'CS', 4],
+        [pd.Timestamp('2025-06-09'), 'CS', 4],
+        [pd.Timestamp('2025-06-30'), 'BIO', 5],
+    ]
+    # The weeks of 16 and 23 June, and the streams nobody joined, have no rows
+    assert (counts['Count'] > 0).all()
+    totals = bucket_totals(daily, '2025-06-01', '2025-06-30', 'Week')
+    assert totals['Total'].tolist() == [6, 4, 0, 0, 5]
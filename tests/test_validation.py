@@ -0,0 +1,72 @@
+import pandas as pd
+
+from admission.validation import validate_admissions, validate_tc_list
+
+
+def _row(name, stream, rank, **values):
+    return {'Name': name, 'Rank': rank, 'Stream': stream, 'Second_Language': 'MAL',
+            'Caste': 'GEN', 'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-02',
+            **values}
+
+
+def test_allotment_rows_are_cleaned():
+    upload = pd.DataFrame([_row(' anu  k ', 'cs', '1', Caste='sc', Date_of_Admission='')])
+    valid, errors = validate_admissions(upload, [], today='2025-06-10')
+    assert errors.empty
+    assert valid.to_dict('records') == [
+        {'Name': 'ANU K', 'Rank': 1, 'Stream': 'CS', 'Second_Language': 'MAL', 'Caste': 'SC',
+         'Admission_Status': 'PERMANENT', 'Date_of_Admission': '2025-06-10'}]
+
+
+def test_rejected_rows_are_reported_with_every_problem():
+    upload = pd.DataFrame([
+        _row('ANU K', 'CS', 1),
+        _row('', 'CS', 2),
+        _row('BINU P', 'ARTS', 'two', Date_of_Admission='02/06/2025'),
+        _row('CINU R', 'BIO', 0, Caste='XYZ'),
+        _row('DIYA S', 'HUM', 4),
+    ])
+    valid, errors = validate_admissions(upload, [])
+    assert valid['Name'].tolist() == ['ANU K', 'DIYA S']
+    # Spreadsheet rows: the header is row 1
+    assert errors['Row'].tolist() == [3, 4, 5]
+    assert errors['Name'].tolist() == ['', 'BINU P', 'CINU R']
+    assert errors['Error'].tolist() == [
+        "name is empty",
+        "rank must be a whole number of at least 1; date of admission must be YYYY-MM-DD; "
+        "stream must be one of BIO, CS, HUM, COM",
+        "rank must be a whole number of at least 1; caste must be one of "
+        "GEN, ETB, MUSLIM, SC, LSA, OBH, DV, VK, KN, KU, ST, OBCHRISTIAN",
+    ]
+
+
+def test_names_repeated_in_the_file_keep_the_first_row():
+    upload = pd.DataFrame([_row('ANU K', 'CS', 1), _row('BINU P', 'BIO', 2),
+                           _row('anu k', 'COM', 3)])
+    valid, errors = validate_admissions(upload, [])
+    assert valid['Name'].tolist() == ['ANU K', 'BINU P']
+    assert errors.to_dict('records') == [
+        {'Row': 4, 'Name': 'ANU K', 'Error': "appears more than once in the file"}]
+
+
+def test_names_on_the_roster_are_rejected():
+    upload = pd.DataFrame([_row('Anu K', 'CS', 1), _row('BINU P', 'BIO', 2)])
+    valid, errors = validate_admissions(upload, ['ANU K'])
+    assert valid['Name'].tolist() == ['BINU P']
+    assert errors.to_dict('records') == [{'Row': 2, 'Name': 'ANU K', 'Error': "already admitted"}]
+
+
+def test_tc_list_rows_are_checked_and_repeats_rejected():
+    upload = pd.DataFrame([
+        {'Name': ' anu k', 'Stream': 'cs', 'Rank': '1', 'TC_Reason': ' Moved '},
+        {'Name': 'BINU P', 'Stream': 'ARTS', 'Rank': 'x', 'TC_Reason': ''},
+        {'Name': 'ANU K', 'Stream': 'CS', 'Rank': 1, 'TC_Reason': 'Again'},
+    ])
+    valid, errors = validate_tc_list(upload)
+    assert valid.to_dict('records') == [
+        {'Name': 'ANU K', 'Stream': 'CS', 'Rank': 1, 'TC_Reason': 'Moved'}]
+    assert errors.to_dict('records') == [
+        {'Row': 3, 'Name': 'BINU P',
+         'Error': "rank must be a whole number; stream must be one of BIO, CS, HUM, COM"},
+        {'Row': 4, 'Name': 'ANU K', 'Error': "appears more than once in the file"},
+    ]